@@ -1,16 +1,32 @@
 
 from .admin_monitor import JanusAdminMonitorClient
 from .session import JanusSession, PluginAttachFail
+from .message_transaction import (
+    TransactionAborted,
+    TransportDisconnected,
+    SessionDestroyed,
+)
 
 from .plugin_base import JanusPlugin
 from .plugin_audiobridge import JanusAudioBridgePlugin
 from .plugin_echotest import JanusEchoTestPlugin
 from .plugin_video_call import JanusVideoCallPlugin
 from .plugin_video_room import JanusVideoRoomPlugin
+from .plugin_video_room_pool import JanusVideoRoomSubscriberPool
 
 from .transport import JanusTransport
+from .transport_pool import JanusTransportPool
 from .transport_http import JanusTransportHTTP
 from .transport_websocket import JanusTransportWebsocket
+from .transport_unix import JanusTransportUnix
+from .peer_connection import (
+    PeerConnectionConfig,
+    create_peer_connection,
+)
+from .codec import JanusCodec
+from .trace import configure_trace
+from .event_stream import EventSubscription, OverflowPolicy
+from .circuit_breaker import CircuitOpen, CircuitState
 
 from .media import MediaKind, MediaStreamTrack, MediaPlayer
 
@@ -4,11 +4,21 @@ import logging
 
 from .transport import JanusTransport
 from .transport_http import JanusTransportHTTP
-from .message_transaction import is_subset
+from .message_transaction import is_subset, compile_matcher, any_matcher
 
 
 logger = logging.getLogger(__name__)
 
+admin_error_matcher = compile_matcher(
+    {
+        "janus": "error",
+        "error": {
+            "code": None,
+            "reason": None,
+        },
+    }
+)
+
 
 """
 # Take note to enable admin API with websockets in Janus, for example:
@@ -74,20 +84,10 @@ class JanusAdminMonitorClient:
         message: dict,
         matcher: dict = {},
         jsep: dict = {},
-        timeout: Union[float, None] = 15,
+        timeout: Union[float, None] = None,
         authorize: bool = True,
     ) -> dict:
-        def function_matcher(message: dict):
-            return is_subset(message, matcher) or is_subset(
-                message,
-                {
-                    "janus": "error",
-                    "error": {
-                        "code": None,
-                        "reason": None,
-                    },
-                },
-            )
+        function_matcher = any_matcher(compile_matcher(matcher), admin_error_matcher)
 
         full_message = message
         if jsep:
@@ -96,14 +96,13 @@ class JanusAdminMonitorClient:
         if authorize:
             full_message["admin_secret"] = self.__admin_secret
 
-        message_transaction = await self.__transport.send(
+        async with await self.__transport.send(
             message=full_message,
-        )
-        response = await message_transaction.get(
-            matcher=function_matcher,
-            timeout=timeout,
-        )
-        await message_transaction.done()
+        ) as message_transaction:
+            response = await message_transaction.get(
+                matcher=function_matcher,
+                timeout=timeout if timeout is not None else message_transaction.timeout,
+            )
 
         return response
 
@@ -0,0 +1,165 @@
+import asyncio
+from collections import deque
+from enum import Enum
+import logging
+from typing import Awaitable, Callable, Deque, Dict, Optional, Tuple
+
+
+logger = logging.getLogger(__name__)
+
+
+class CircuitState(Enum):
+    CLOSED = "closed"
+    """Requests are sent normally"""
+    OPEN = "open"
+    """Server is failing. Requests fail immediately."""
+    HALF_OPEN = "half_open"
+    """Probing whether the server has recovered"""
+
+
+class CircuitOpen(Exception):
+    """Request not sent because the server is failing"""
+
+    def __init__(self, base_url: str) -> None:
+        super().__init__(f"Circuit open, not sending to: {base_url}")
+        self.base_url = base_url
+
+
+class CircuitBreaker:
+    """Stop sending requests to a failing server
+
+    Records the outcome of requests in a sliding time window. When enough
+    of them fail (send failed or timed out), the circuit opens and
+    :meth:`check` raises :class:`CircuitOpen` for open_duration seconds.
+    After that, the next :meth:`check` probes the server, and other calls
+    wait for the probe. The circuit closes if the probe succeeds and opens
+    again if it fails.
+    """
+
+    name: str
+    failure_rate: float
+    min_requests: int
+    window: float
+    open_duration: float
+    __probe: Callable[[], Awaitable]
+    __state: CircuitState
+    __outcomes: Deque[Tuple[float, bool]]
+    __failures: int
+    __opened_at: float
+    __probe_task: Optional[asyncio.Task]
+
+    def __init__(
+        self,
+        probe: Callable[[], Awaitable],
+        failure_rate: float = 0.5,
+        min_requests: int = 20,
+        window: float = 30,
+        open_duration: float = 5,
+        name: str = "",
+    ) -> None:
+        """
+        :param probe: Coroutine function checking the server. Should raise if
+            the server is not healthy.
+        :param failure_rate: Open when this fraction of requests in the window
+            failed, 0 to 1.
+        :param min_requests: Don't open with fewer requests in the window.
+        :param window: Seconds of request outcomes to consider.
+        :param open_duration: Seconds to stay open before probing.
+        :param name: Used in logs and exceptions
+        """
+        self.name = name
+        self.failure_rate = failure_rate
+        self.min_requests = min_requests
+        self.window = window
+        self.open_duration = open_duration
+        self.__probe = probe
+        self.__state = CircuitState.CLOSED
+        self.__outcomes = deque()
+        self.__failures = 0
+        self.__opened_at = 0
+        self.__probe_task = None
+
+    @property
+    def state(self) -> CircuitState:
+        return self.__state
+
+    def __trim(self, now: float) -> None:
+        while self.__outcomes and self.__outcomes[0][0] < now - self.window:
+            _, success = self.__outcomes.popleft()
+            if not success:
+                self.__failures -= 1
+
+    def record(self, success: bool) -> None:
+        """Record outcome of a request"""
+        now = asyncio.get_running_loop().time()
+        self.__trim(now)
+        self.__outcomes.append((now, success))
+        if not success:
+            self.__failures += 1
+
+        if (
+            self.__state == CircuitState.CLOSED
+            and len(self.__outcomes) >= self.min_requests
+            and self.__failures >= self.failure_rate * len(self.__outcomes)
+        ):
+            self.__open(now)
+
+    def __open(self, now: float) -> None:
+        logger.warning(
+            f"Circuit open ({self.name}): "
+            f"{self.__failures} of {len(self.__outcomes)} requests failed"
+        )
+        self.__state = CircuitState.OPEN
+        self.__opened_at = now
+
+    def __close(self) -> None:
+        logger.info(f"Circuit closed ({self.name})")
+        self.__state = CircuitState.CLOSED
+        self.__outcomes.clear()
+        self.__failures = 0
+
+    async def check(self) -> None:
+        """Raise :class:`CircuitOpen` if requests shouldn't be sent
+
+        While the server is probed, waits for the result of the probe.
+        """
+        if self.__state == CircuitState.CLOSED:
+            return
+
+        if self.__probe_task is None:
+            now = asyncio.get_running_loop().time()
+            if (
+                self.__state == CircuitState.OPEN
+                and now - self.__opened_at < self.open_duration
+            ):
+                raise CircuitOpen(self.name)
+
+            self.__state = CircuitState.HALF_OPEN
+            self.__probe_task = asyncio.create_task(self.__run_probe())
+
+        # Don't cancel the probe when a waiting caller is cancelled
+        exception = await asyncio.shield(self.__probe_task)
+        if exception is not None:
+            raise CircuitOpen(self.name) from exception
+
+    async def __run_probe(self) -> Optional[Exception]:
+        try:
+            await self.__probe()
+        except Exception as exception:
+            logger.warning(f"Circuit probe failed ({self.name}): {exception}")
+            self.__open(asyncio.get_running_loop().time())
+            return exception
+        finally:
+            self.__probe_task = None
+
+        self.__close()
+        return None
+
+    def stats(self) -> Dict:
+        now = asyncio.get_running_loop().time()
+        self.__trim(now)
+        return {
+            "state": self.__state.value,
+            "requests": len(self.__outcomes),
+            "failures": self.__failures,
+        }
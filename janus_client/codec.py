@@ -0,0 +1,112 @@
+from abc import ABC, abstractmethod
+import json
+from typing import Dict, List, Type, Union
+import logging
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+try:
+    import ujson
+except ImportError:  # pragma: no cover
+    ujson = None
+
+
+logger = logging.getLogger(__name__)
+
+
+class JanusCodec(ABC):
+    """Serialize and deserialize Janus messages
+
+    A transport serializes each message once with :meth:`dumps` and passes
+    the result down to the transport implementation.
+    """
+
+    name: str = "base"
+    """Name used to select the codec in transport configuration"""
+
+    @abstractmethod
+    def dumps(self, message: Dict) -> str:
+        """Serialize message into a JSON string"""
+        pass
+
+    @abstractmethod
+    def loads(self, message_raw: Union[str, bytes]) -> Dict:
+        """Deserialize a JSON string or bytes into message"""
+        pass
+
+
+class JanusCodecJSON(JanusCodec):
+    """Codec using standard library json"""
+
+    name = "json"
+
+    def dumps(self, message: Dict) -> str:
+        return json.dumps(message)
+
+    def loads(self, message_raw: Union[str, bytes]) -> Dict:
+        return json.loads(message_raw)
+
+
+class JanusCodecOrjson(JanusCodec):
+    """Codec using orjson. Requires orjson to be installed."""
+
+    name = "orjson"
+
+    def __init__(self) -> None:
+        if orjson is None:
+            raise Exception("orjson is not installed")
+
+    def dumps(self, message: Dict) -> str:
+        return orjson.dumps(message).decode()
+
+    def loads(self, message_raw: Union[str, bytes]) -> Dict:
+        return orjson.loads(message_raw)
+
+
+class JanusCodecUjson(JanusCodec):
+    """Codec using ujson. Requires ujson to be installed."""
+
+    name = "ujson"
+
+    def __init__(self) -> None:
+        if ujson is None:
+            raise Exception("ujson is not installed")
+
+    def dumps(self, message: Dict) -> str:
+        return ujson.dumps(message, ensure_ascii=False, escape_forward_slashes=False)
+
+    def loads(self, message_raw: Union[str, bytes]) -> Dict:
+        return ujson.loads(message_raw)
+
+
+_codec_implementation: List[Type[JanusCodec]] = [
+    JanusCodecJSON,
+    JanusCodecOrjson,
+    JanusCodecUjson,
+]
+
+
+def get_codec(codec: Union[str, JanusCodec, None] = None) -> JanusCodec:
+    """Get a codec instance
+
+    :param codec: Codec name ("json", "orjson" or "ujson") or a codec instance.
+        If not given, use the fastest codec installed.
+    """
+    if isinstance(codec, JanusCodec):
+        return codec
+
+    if codec is None:
+        if orjson is not None:
+            return JanusCodecOrjson()
+        if ujson is not None:
+            return JanusCodecUjson()
+        return JanusCodecJSON()
+
+    for codec_cls in _codec_implementation:
+        if codec_cls.name == codec:
+            return codec_cls()
+
+    raise Exception(f"Codec not found: {codec}")
@@ -0,0 +1,146 @@
+import asyncio
+from collections import deque
+import logging
+import traceback
+from typing import Awaitable, Callable, Deque, Dict
+
+from .trace import MessageTrace
+
+
+logger = logging.getLogger(__name__)
+
+CRITICAL_EVENTS = {"webrtcup", "media", "hangup", "detached"}
+"""Janus core events about the state of a handle, never dropped"""
+
+
+def is_critical(message: Dict) -> bool:
+    return message.get("janus") in CRITICAL_EVENTS
+
+
+class DispatchQueue:
+    """Deliver messages to a receiver in order, without blocking the sender
+
+    :meth:`put` never blocks. A worker task is started when there are
+    messages to deliver and ends when the queue is empty, so idle receivers
+    don't cost a task. When the queue is full, the oldest message that isn't
+    in :data:`CRITICAL_EVENTS` is dropped and counted in :attr:`dropped`.
+    Critical events are always queued, even over max_size.
+    """
+
+    name: str
+    max_size: int
+    dispatched: int
+    """Number of messages delivered"""
+    dropped: int
+    """Number of messages dropped because the queue is full"""
+    max_depth: int
+    """Highest number of messages waiting in the queue"""
+    __callback: Callable[[Dict], Awaitable]
+    __queue: Deque[Dict]
+    __task: asyncio.Task
+
+    def __init__(
+        self,
+        callback: Callable[[Dict], Awaitable],
+        max_size: int = 1000,
+        name: str = "",
+    ) -> None:
+        """
+        :param callback: Coroutine function receiving each message
+        :param max_size: Max number of messages waiting to be delivered
+        :param name: Used in logs
+        """
+        self.name = name
+        self.max_size = max_size
+        self.dispatched = 0
+        self.dropped = 0
+        self.max_depth = 0
+        self.__callback = callback
+        self.__queue = deque()
+        self.__task = None
+
+    @property
+    def depth(self) -> int:
+        """Number of messages waiting to be delivered"""
+        return len(self.__queue)
+
+    def put(self, message: Dict) -> bool:
+        """Queue message for delivery
+
+        :return: False if the message is dropped because the queue is full
+            and holds only critical events
+        """
+        if len(self.__queue) >= self.max_size:
+            position = next(
+                (
+                    position
+                    for position, queued in enumerate(self.__queue)
+                    if not is_critical(queued)
+                ),
+                None,
+            )
+            if position is not None:
+                self.__drop(self.__queue[position])
+                del self.__queue[position]
+            elif not is_critical(message):
+                self.__drop(message)
+                return False
+
+        self.__queue.append(message)
+        self.max_depth = max(self.max_depth, len(self.__queue))
+
+        if self.__task is None:
+            self.__task = asyncio.create_task(self.__run())
+        return True
+
+    def __drop(self, message: Dict) -> None:
+        self.dropped += 1
+        logger.warning(
+            "Dispatch queue full (%s). Message dropped: %s",
+            self.name,
+            MessageTrace(message),
+        )
+
+    async def __run(self) -> None:
+        try:
+            while self.__queue:
+                message = self.__queue.popleft()
+                try:
+                    await self.__callback(message)
+                except Exception as exception:
+                    logger.error(
+                        "".join(
+                            traceback.format_exception(
+                                type(exception),
+                                value=exception,
+                                tb=exception.__traceback__,
+                            )
+                        )
+                    )
+                self.dispatched += 1
+        finally:
+            if self.__task is asyncio.current_task():
+                self.__task = None
+
+    async def join(self) -> None:
+        """Wait until all queued messages are delivered"""
+        while self.__task is not None:
+            await asyncio.shield(self.__task)
+
+    def close(self) -> None:
+        """Drop queued messages and stop delivering
+
+        Can be called from the callback, which then isn't cancelled.
+        """
+        self.__queue.clear()
+        if self.__task is not None and self.__task is not asyncio.current_task():
+            self.__task.cancel()
+            self.__task = None
+
+    def stats(self) -> Dict:
+        return {
+            "depth": self.depth,
+            "max_depth": self.max_depth,
+            "dispatched": self.dispatched,
+            "dropped": self.dropped,
+        }
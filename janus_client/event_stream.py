@@ -0,0 +1,195 @@
+import asyncio
+from collections import deque
+from enum import Enum
+import logging
+from typing import Callable, Deque, Dict, List, Optional, Union
+
+from .message_transaction import compile_matcher
+
+
+logger = logging.getLogger(__name__)
+
+
+class OverflowPolicy(Enum):
+    """What to do when a subscriber's buffer is full"""
+
+    DROP_OLDEST = "drop_oldest"
+    """Drop the oldest buffered event to make room for the new one"""
+    BLOCK = "block"
+    """Wait for the subscriber to consume. This holds up delivery of further
+    events to the same handle, for every subscriber and the plugin itself."""
+
+
+class EventSubscription:
+    """Asynchronous iterator of events matching a filter
+
+    Get one from :meth:`janus_client.JanusSession.events` or
+    :meth:`janus_client.JanusPlugin.events`. Iteration ends when the
+    subscription is closed, either by :meth:`close` or by the session or
+    plugin handle going away.
+
+    .. code-block:: python
+
+        async with plugin.events(filter={"janus": "webrtcup"}) as events:
+            async for event in events:
+                ...
+    """
+
+    matcher: Callable[[Dict], bool]
+    buffer_size: int
+    policy: OverflowPolicy
+    dropped: int
+    """Number of events dropped because the buffer is full"""
+    __buffer: Deque[Dict]
+    __closed: bool
+    __readable: asyncio.Event
+    __writable: asyncio.Event
+    __on_close: Callable[["EventSubscription"], None]
+
+    def __init__(
+        self,
+        matcher: Callable[[Dict], bool],
+        buffer_size: int = 100,
+        policy: OverflowPolicy = OverflowPolicy.DROP_OLDEST,
+        on_close: Callable[["EventSubscription"], None] = None,
+    ) -> None:
+        self.matcher = matcher
+        self.buffer_size = buffer_size
+        self.policy = OverflowPolicy(policy)
+        self.dropped = 0
+        self.__buffer = deque()
+        self.__closed = False
+        self.__readable = asyncio.Event()
+        self.__writable = asyncio.Event()
+        self.__writable.set()
+        self.__on_close = on_close
+
+    @property
+    def closed(self) -> bool:
+        return self.__closed
+
+    def __len__(self) -> int:
+        return len(self.__buffer)
+
+    async def put(self, event: Dict) -> None:
+        """Buffer an event. Blocks if the buffer is full and policy is BLOCK."""
+        while not self.__closed and len(self.__buffer) >= self.buffer_size:
+            if self.policy == OverflowPolicy.DROP_OLDEST:
+                self.__buffer.popleft()
+                self.dropped += 1
+                continue
+
+            self.__writable.clear()
+            await self.__writable.wait()
+
+        if self.__closed:
+            return
+
+        self.__buffer.append(event)
+        self.__readable.set()
+
+    def close(self) -> None:
+        """Stop the subscription. Buffered events can still be iterated."""
+        if self.__closed:
+            return
+
+        self.__closed = True
+        self.__readable.set()
+        self.__writable.set()
+        if self.__on_close:
+            self.__on_close(self)
+
+    def __aiter__(self) -> "EventSubscription":
+        return self
+
+    async def __anext__(self) -> Dict:
+        while not self.__buffer:
+            if self.__closed:
+                raise StopAsyncIteration
+            self.__readable.clear()
+            await self.__readable.wait()
+
+        event = self.__buffer.popleft()
+        self.__writable.set()
+        return event
+
+    async def __aenter__(self) -> "EventSubscription":
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, exc_tb) -> None:
+        self.close()
+
+
+class EventBroadcaster:
+    """Deliver events to many subscriptions
+
+    Subscriptions are grouped by the "janus" type their filter requires, so
+    an event is only matched against subscriptions that can possibly want it.
+    """
+
+    __subscriptions: Dict[Optional[str], List[EventSubscription]]
+
+    def __init__(self) -> None:
+        self.__subscriptions = dict()
+
+    def __len__(self) -> int:
+        return sum(len(group) for group in self.__subscriptions.values())
+
+    def subscribe(
+        self,
+        filter: Union[Dict, Callable[[Dict], bool], None] = None,
+        buffer_size: int = 100,
+        policy: Union[OverflowPolicy, str] = OverflowPolicy.DROP_OLDEST,
+    ) -> EventSubscription:
+        """Create a subscription
+
+        :param filter: (optional) Dict pattern (see :func:`is_subset`) or
+            function returning True for wanted events. All events if not given.
+        :param buffer_size: (optional) Max number of events buffered for the
+            subscriber.
+        :param policy: (optional) :class:`OverflowPolicy` or its value.
+        """
+        if filter is None:
+            filter = {}
+        matcher = compile_matcher(filter) if isinstance(filter, dict) else filter
+
+        janus = getattr(matcher, "index_key", (None, None))[0]
+        subscription = EventSubscription(
+            matcher=matcher,
+            buffer_size=buffer_size,
+            policy=policy,
+            on_close=lambda subscription: self.__remove(janus, subscription),
+        )
+        self.__subscriptions.setdefault(janus, []).append(subscription)
+        return subscription
+
+    def __remove(self, janus: Optional[str], subscription: EventSubscription) -> None:
+        group = self.__subscriptions.get(janus, [])
+        if subscription in group:
+            group.remove(subscription)
+        if not group:
+            self.__subscriptions.pop(janus, None)
+
+    async def publish(self, event: Dict) -> None:
+        if not self.__subscriptions:
+            return
+
+        candidates = self.__subscriptions.get(event.get("janus"), []) + (
+            self.__subscriptions.get(None, [])
+        )
+        for subscription in candidates:
+            try:
+                matched = subscription.matcher(event)
+            except Exception as exception:
+                logger.warning(f"Event filter failed: {exception}")
+                continue
+
+            if matched:
+                await subscription.put(event)
+
+    def close(self) -> None:
+        """Close all subscriptions"""
+        for group in list(self.__subscriptions.values()):
+            for subscription in list(group):
+                subscription.close()
+        self.__subscriptions.clear()
@@ -0,0 +1,141 @@
+import asyncio
+import logging
+import math
+import random
+from typing import Awaitable, Callable, Dict, List, Set
+
+
+logger = logging.getLogger(__name__)
+
+
+class KeepaliveScheduler:
+    """Send keepalive for many sessions from one task
+
+    Sessions are placed in a timer wheel: a ring of slots, each holding the
+    sessions due in the same tick. Every tick only the sessions in the current
+    slot are checked. Sessions that had other traffic since their last
+    keepalive are rescheduled without sending anything.
+
+    Keepalive times are jittered so that sessions created together don't send
+    their keepalives together.
+    """
+
+    interval: float
+    jitter: float
+    resolution: float
+    __send_keepalive: Callable[[int], Awaitable]
+    __slots: List[Set[int]]
+    __slot_of: Dict[int, int]
+    __last_activity: Dict[int, float]
+    __tick: int
+    __task: asyncio.Task
+    __send_tasks: Set[asyncio.Task]
+
+    def __init__(
+        self,
+        send_keepalive: Callable[[int], Awaitable],
+        interval: float = 30,
+        jitter: float = 0.2,
+        resolution: float = 1,
+    ) -> None:
+        """
+        :param send_keepalive: Coroutine function sending keepalive for a session ID
+        :param interval: Seconds between keepalives of a session. Janus times out
+            sessions after 60 seconds of inactivity by default.
+        :param jitter: Randomize interval by this fraction, e.g. 0.2 means +/- 20%
+        :param resolution: Seconds per tick of the timer wheel
+        """
+        self.interval = interval
+        self.jitter = jitter
+        self.resolution = resolution
+        self.__send_keepalive = send_keepalive
+
+        slot_count = math.ceil(interval * (1 + jitter) / resolution) + 2
+        self.__slots = [set() for _ in range(slot_count)]
+        self.__slot_of = dict()
+        self.__last_activity = dict()
+        self.__tick = 0
+        self.__task = None
+        self.__send_tasks = set()
+
+    def __len__(self) -> int:
+        return len(self.__slot_of)
+
+    def __jittered_interval(self) -> float:
+        return self.interval * (1 + random.uniform(-self.jitter, self.jitter))
+
+    def __schedule(self, session_id: int, delay: float) -> None:
+        ticks = min(max(1, math.ceil(delay / self.resolution)), len(self.__slots) - 1)
+        slot_index = (self.__tick + ticks) % len(self.__slots)
+        self.__slots[slot_index].add(session_id)
+        self.__slot_of[session_id] = slot_index
+
+    def add(self, session_id: int) -> None:
+        """Start sending keepalive for a session"""
+        if session_id in self.__slot_of:
+            return
+
+        self.__last_activity[session_id] = asyncio.get_running_loop().time()
+        self.__schedule(session_id, self.__jittered_interval())
+        self.start()
+
+    def remove(self, session_id: int) -> None:
+        """Stop sending keepalive for a session"""
+        slot_index = self.__slot_of.pop(session_id, None)
+        if slot_index is not None:
+            self.__slots[slot_index].discard(session_id)
+        self.__last_activity.pop(session_id, None)
+
+        if not self.__slot_of:
+            self.stop()
+
+    def touch(self, session_id: int) -> None:
+        """Record traffic of a session. Its next keepalive will be postponed."""
+        if session_id in self.__last_activity:
+            self.__last_activity[session_id] = asyncio.get_running_loop().time()
+
+    def start(self) -> None:
+        """Start sending keepalives, if there are sessions and it's stopped"""
+        if self.__slot_of and (self.__task is None or self.__task.done()):
+            self.__task = asyncio.create_task(self.__run())
+
+    def stop(self) -> None:
+        """Stop sending keepalives. Sessions are kept for :meth:`start`."""
+        if self.__task is not None:
+            self.__task.cancel()
+            self.__task = None
+
+    async def __run(self) -> None:
+        loop = asyncio.get_running_loop()
+        next_tick_time = loop.time()
+
+        while True:
+            next_tick_time += self.resolution
+            await asyncio.sleep(max(0, next_tick_time - loop.time()))
+
+            self.__tick += 1
+            slot = self.__slots[self.__tick % len(self.__slots)]
+            due_session_ids = list(slot)
+            slot.clear()
+
+            now = loop.time()
+            for session_id in due_session_ids:
+                del self.__slot_of[session_id]
+                idle = now - self.__last_activity.get(session_id, 0)
+                interval = self.__jittered_interval()
+
+                if idle < interval:
+                    # Had traffic recently, no need to send keepalive yet
+                    self.__schedule(session_id, interval - idle)
+                    continue
+
+                self.__schedule(session_id, interval)
+                self.__last_activity[session_id] = now
+                task = asyncio.create_task(self.__send_keepalive(session_id))
+                task.add_done_callback(self.__send_done_cb)
+                self.__send_tasks.add(task)
+
+    def __send_done_cb(self, task: asyncio.Task) -> None:
+        self.__send_tasks.discard(task)
+        if not task.cancelled() and task.exception():
+            logger.warning(f"Fail to send keepalive: {task.exception()}")
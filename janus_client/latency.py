@@ -0,0 +1,110 @@
+from collections import deque
+import logging
+import math
+from typing import Deque, Dict, List, Optional
+
+
+logger = logging.getLogger(__name__)
+
+
+def request_type(message: Dict) -> str:
+    """Key to group latency of similar requests
+
+    The "janus" type, plus the plugin request for plugin messages,
+    e.g. "message:join".
+    """
+    janus = message.get("janus")
+    body = message.get("body")
+    if janus == "message" and isinstance(body, dict) and "request" in body:
+        return f"{janus}:{body['request']}"
+    return janus
+
+
+class LatencyTracker:
+    """Derive request timeouts from observed response times
+
+    Keeps a window of recent response times for each request type. The
+    timeout of a request is a percentile of its type's response times
+    multiplied by a factor, clamped between a floor and a ceiling. Until
+    there are enough samples of a type, the ceiling is used. Response times
+    of other types are not used, since e.g. fast pings say nothing about
+    requests waiting on plugin work.
+    """
+
+    factor: float
+    floor: float
+    ceiling: float
+    percentile: float
+    window: int
+    min_samples: int
+    __samples: Dict[str, Deque[float]]
+    __sorted: Dict[str, List[float]]
+
+    def __init__(
+        self,
+        factor: float = 3.0,
+        floor: float = 0.2,
+        ceiling: float = 15.0,
+        percentile: float = 0.99,
+        window: int = 256,
+        min_samples: int = 20,
+    ) -> None:
+        """
+        :param factor: Multiply the percentile by this
+        :param floor: Min timeout in seconds
+        :param ceiling: Max timeout in seconds. Also the timeout until there
+            are enough samples.
+        :param percentile: Percentile of response times to use, 0 to 1
+        :param window: Number of recent samples to keep for each request type
+        :param min_samples: Number of samples needed before they are trusted
+        """
+        self.factor = factor
+        self.floor = floor
+        self.ceiling = ceiling
+        self.percentile = percentile
+        self.window = window
+        self.min_samples = min_samples
+        self.__samples = dict()
+        self.__sorted = dict()
+
+    def record(self, request_type: str, response_time: float) -> None:
+        """Record response time of a request in seconds"""
+        samples = self.__samples.get(request_type)
+        if samples is None:
+            samples = self.__samples[request_type] = deque(maxlen=self.window)
+        samples.append(response_time)
+        self.__sorted.pop(request_type, None)
+
+    def __percentile(self, key: str, percentile: float) -> Optional[float]:
+        samples = self.__samples.get(key)
+        if not samples or len(samples) < self.min_samples:
+            return None
+
+        sorted_samples = self.__sorted.get(key)
+        if sorted_samples is None:
+            sorted_samples = self.__sorted[key] = sorted(samples)
+
+        index = min(
+            len(sorted_samples) - 1, math.ceil(percentile * len(sorted_samples)) - 1
+        )
+        return sorted_samples[max(0, index)]
+
+    def timeout(self, request_type: str = None) -> float:
+        """Timeout in seconds for a request of the type"""
+        value = self.__percentile(request_type, self.percentile)
+        if value is None:
+            return self.ceiling
+
+        return min(self.ceiling, max(self.floor, value * self.factor))
+
+    def stats(self) -> Dict[str, Dict]:
+        """Sample count, p50, p99 and timeout of each request type"""
+        return {
+            key: {
+                "count": len(samples),
+                "p50": self.__percentile(key, 0.5),
+                "p99": self.__percentile(key, 0.99),
+                "timeout": self.timeout(key),
+            }
+            for key, samples in self.__samples.items()
+        }
@@ -1,6 +1,8 @@
 import asyncio
+import functools
+import itertools
 import uuid
-from typing import Dict, List, Union, Callable
+from typing import Dict, List, Union, Callable, Optional, Tuple
 
 
 def is_subset(dict_1: Dict, dict_2: Dict) -> bool:
@@ -49,57 +51,411 @@ def is_subset(dict_1: Dict, dict_2: Dict) -> bool:
     return True
 
 
+def _index_key(message: Dict) -> Tuple[str, Optional[str]]:
+    """Key used to index messages in a transaction
+
+    (janus type, plugin name). Plugin name is None if message has no plugindata.
+    """
+    plugindata = message.get("plugindata")
+    plugin = plugindata.get("plugin") if isinstance(plugindata, dict) else None
+    return (message.get("janus"), plugin)
+
+
+def _matcher_index_key(matcher: Dict) -> Tuple[Optional[str], Optional[str]]:
+    """Derive the index key from a dict matcher
+
+    Only str values can be used to narrow down the candidates, anything else
+    is returned as None to mean "any".
+    """
+    janus = matcher.get("janus")
+    plugindata = matcher.get("plugindata")
+    plugin = plugindata.get("plugin") if isinstance(plugindata, dict) else None
+    return (
+        janus if isinstance(janus, str) else None,
+        plugin if isinstance(plugin, str) else None,
+    )
+
+
+def _predicate_source(pattern: Dict, node: str, constants: Dict) -> List[str]:
+    """Flatten a dict pattern into a list of Python boolean expressions
+
+    Expressions on a parent dict always come before expressions on its
+    children, so when a child is checked its parents are known to be
+    dictionaries.
+    """
+    conditions = []
+    for key, val in pattern.items():
+        key_name = f"c{len(constants)}"
+        constants[key_name] = key
+        child = f"{node}[{key_name}]"
+
+        if isinstance(val, dict):
+            conditions.append(f"isinstance({node}.get({key_name}), dict)")
+            conditions.extend(_predicate_source(val, child, constants))
+        elif isinstance(val, (str, int)):
+            val_name = f"c{len(constants)}"
+            constants[val_name] = val
+            conditions.append(f"{node}.get({key_name}) == {val_name}")
+        else:
+            conditions.append(f"{key_name} in {node}")
+    return conditions
+
+
+def _compile(pattern: Dict) -> Callable[[Dict], bool]:
+    constants = dict()
+    conditions = _predicate_source(pattern, "message", constants)
+    source = " and ".join(conditions) if conditions else "True"
+
+    compiled_matcher = eval(f"lambda message: {source}", constants)
+    compiled_matcher.index_key = _matcher_index_key(pattern)
+    return compiled_matcher
+
+
+_compiled_matchers: Dict[str, Callable[[Dict], bool]] = dict()
+_COMPILED_MATCHERS_MAX = 1024
+
+
+def compile_matcher(pattern: Dict) -> Callable[[Dict], bool]:
+    """Compile a dict pattern into a matcher function
+
+    The matcher returns the same result as ``is_subset(message, pattern)``,
+    but the pattern is only walked once at compile time and the result is a
+    single boolean expression. Compiled matchers are cached, so compiling
+    the same pattern again is cheap.
+
+    :param pattern: Same as dict_2 of :func:`is_subset`
+    :return: A function taking a message and returning True if it matches
+    """
+    if not isinstance(pattern, dict):
+        raise TypeError(f"pattern must be a dictionary: {pattern}")
+
+    cache_key = repr(pattern)
+    compiled_matcher = _compiled_matchers.get(cache_key)
+    if compiled_matcher is None:
+        if len(_compiled_matchers) >= _COMPILED_MATCHERS_MAX:
+            # Patterns often contain IDs, don't let the cache grow forever
+            _compiled_matchers.clear()
+
+        compiled_matcher = _compile(pattern)
+        _compiled_matchers[cache_key] = compiled_matcher
+
+    return compiled_matcher
+
+
+def any_matcher(*matchers: Callable[[Dict], bool]) -> Callable[[Dict], bool]:
+    """Combine matchers. The result matches if any of the matchers match.
+
+    The result has the index key of the matchers if they all share one, and
+    the index keys of all of them, so :meth:`MessageTransaction.get` only
+    checks messages that one of the matchers can match.
+    """
+
+    def combined_matcher(message: Dict) -> bool:
+        for matcher in matchers:
+            if matcher(message):
+                return True
+        return False
+
+    index_keys = []
+    for matcher in matchers:
+        for index_key in getattr(
+            matcher, "index_keys", [getattr(matcher, "index_key", (None, None))]
+        ):
+            if index_key not in index_keys:
+                index_keys.append(index_key)
+
+    combined_matcher.index_key = (
+        index_keys[0] if len(index_keys) == 1 else (None, None)
+    )
+    if all(janus is not None for janus, _ in index_keys):
+        combined_matcher.index_keys = tuple(index_keys)
+    return combined_matcher
+
+
+janus_error_matcher = compile_matcher({"janus": "error", "error": {}})
+"""Matches Janus core error response"""
+
+
+@functools.lru_cache(maxsize=None)
+def plugin_error_matcher(plugin_name: str, data_key: str) -> Callable[[Dict], bool]:
+    """Get matcher for plugin error response
+
+    Matches both synchronous ("success") and asynchronous ("event") errors.
+
+    :param plugin_name: Plugin name, e.g. janus.plugin.videoroom
+    :param data_key: Key in plugin data holding the response type, e.g. videoroom
+    """
+    data = {data_key: "event", "error_code": None, "error": None}
+    return any_matcher(
+        compile_matcher(
+            {"janus": "success", "plugindata": {"plugin": plugin_name, "data": data}}
+        ),
+        compile_matcher(
+            {"janus": "event", "plugindata": {"plugin": plugin_name, "data": data}}
+        ),
+    )
+
+
+class TransactionAborted(Exception):
+    """Transaction can't get more responses"""
+
+    pass
+
+
+class TransportDisconnected(TransactionAborted):
+    """Transport disconnected or lost connection while waiting for responses"""
+
+    pass
+
+
+class SessionDestroyed(TransactionAborted):
+    """Session destroyed while waiting for responses"""
+
+    def __init__(self, session_id: int) -> None:
+        super().__init__(f"Session destroyed: {session_id}")
+        self.session_id = session_id
+
+
 class MessageTransaction:
+    """Collect responses to a request sent to Janus
+
+    Received messages are indexed by their "janus" type and plugin name so
+    that dict matchers only need to check messages that can possibly match.
+    Pending :meth:`get` calls are resolved directly through futures when a
+    matching message arrives, so a message is only matched once per waiter.
+
+    Use it as an async context manager to make sure :meth:`done` is called:
+
+    .. code-block:: python
+
+        async with await transport.send(message) as message_transaction:
+            response = await message_transaction.get(matcher)
+    """
+
     __id: str
+    max_messages: int
+    """Max number of messages saved. Oldest messages are dropped first."""
+    deadline: Optional[float]
+    """Event loop time after which the transaction can be reaped"""
+    session_id: Optional[int]
+    """Session the request is sent in. None for requests without session."""
+    timeout: Optional[float]
+    """Suggested timeout in seconds for :meth:`get`, given by the transport
+    from observed response times. None to wait forever."""
     __msg_all: List[Dict]
-    __msg_in: asyncio.Queue
+    __msg_by_janus: Dict[str, List[Dict]]
+    __msg_by_plugin: Dict[Tuple[str, Optional[str]], List[Dict]]
+    __waiters: List[Tuple[Callable, asyncio.Future]]
+    __exception: Optional[BaseException]
+    __done: bool
+    __sent_at: Optional[float]
+    __arrived_at: Dict[int, float]
+    """Event loop time each saved message arrived, by id of the message"""
+    __order: Dict[int, int]
+    """Position of each saved message in arrival order, by id of the message"""
+    __counter: "itertools.count[int]"
 
-    def __init__(self) -> None:
+    def __init__(
+        self,
+        max_messages: int = 100,
+        ttl: float = None,
+        session_id: int = None,
+        timeout: float = None,
+    ) -> None:
+        """
+        :param max_messages: (optional) Max number of messages saved
+        :param ttl: (optional) Seconds until the transaction can be reaped.
+            Never if None.
+        :param session_id: (optional) Session the request is sent in
+        :param timeout: (optional) Suggested timeout for :meth:`get`
+        """
         self.__id = uuid.uuid4().hex
+        self.session_id = session_id
+        self.timeout = timeout
+        self.__sent_at = None
+        self.max_messages = max_messages
+        self.deadline = None
+        if ttl is not None:
+            self.deadline = asyncio.get_running_loop().time() + ttl
+        self.__exception = None
+        self.__done = False
         self.__msg_all = []
-        self.__msg_in = asyncio.Queue()
+        self.__arrived_at = dict()
+        self.__order = dict()
+        self.__counter = itertools.count()
+        self.__msg_by_janus = dict()
+        self.__msg_by_plugin = dict()
+        self.__waiters = []
 
     @property
     def id(self) -> str:
         return self.__id
 
+    @property
+    def is_done(self) -> bool:
+        return self.__done
+
+    def mark_sent(self) -> None:
+        """Start measuring response time"""
+        self.__sent_at = asyncio.get_running_loop().time()
+
+    def on_response(self, message: Dict, response_time: float) -> None:
+        """Called once with the first message returned by :meth:`get` and the
+        seconds from :meth:`mark_sent` until that message arrived"""
+        pass
+
+    def on_timeout(self) -> None:
+        """Called when :meth:`get` times out"""
+        pass
+
+    def __record_response(self, message: Dict) -> None:
+        if self.__sent_at is not None:
+            # Measure until the message arrived, not until the caller got it
+            arrived_at = self.__arrived_at.get(
+                id(message), asyncio.get_running_loop().time()
+            )
+            response_time = arrived_at - self.__sent_at
+            self.__sent_at = None
+            self.on_response(message, response_time)
+
+    def expired(self, now: float) -> bool:
+        return self.deadline is not None and now >= self.deadline
+
     def put_msg(self, message: Dict) -> None:
-        # Queue is never full
-        self.__msg_in.put_nowait(message)
+        # Always save received messages
+        self.__msg_all.append(message)
+        self.__arrived_at[id(message)] = asyncio.get_running_loop().time()
+        self.__order[id(message)] = next(self.__counter)
+
+        key = _index_key(message)
+        self.__msg_by_janus.setdefault(key[0], []).append(message)
+        self.__msg_by_plugin.setdefault(key, []).append(message)
+
+        if len(self.__msg_all) > self.max_messages:
+            self.__drop_oldest()
+
+        # Resolve waiters. Usually there is only one.
+        for matcher, future in self.__waiters:
+            if future.done():
+                continue
+
+            # This runs in the receive loop of the transport. A failing
+            # matcher only fails its own get() call.
+            try:
+                matched = matcher is None or matcher(message)
+            except Exception as exception:
+                future.set_exception(exception)
+                continue
+
+            if matched:
+                future.set_result(message)
+
+    def __drop_oldest(self) -> None:
+        message = self.__msg_all.pop(0)
+        self.__arrived_at.pop(id(message), None)
+        self.__order.pop(id(message), None)
+        key = _index_key(message)
+        for index, index_key in [
+            (self.__msg_by_janus, key[0]),
+            (self.__msg_by_plugin, key),
+        ]:
+            messages = index[index_key]
+            for position, indexed_message in enumerate(messages):
+                if indexed_message is message:
+                    del messages[position]
+                    break
+            if not messages:
+                del index[index_key]
+
+    def fail(self, exception: BaseException) -> None:
+        """Raise exception in pending and future :meth:`get` calls
+
+        Messages already received can still be found.
+        """
+        self.__exception = exception
+        for _, future in self.__waiters:
+            if not future.done():
+                future.set_exception(exception)
+
+    def __find(self, matcher: Optional[Callable]) -> Optional[Dict]:
+        """Find the first saved message that matches"""
+
+        if matcher is None:
+            return self.__msg_all[0] if self.__msg_all else None
+
+        index_keys = getattr(matcher, "index_keys", None)
+        if index_keys is not None and len(index_keys) > 1:
+            candidates = self.__indexed_union(index_keys)
+        else:
+            candidates = self.__indexed(getattr(matcher, "index_key", (None, None)))
+
+        for msg in candidates:
+            if matcher(msg):
+                return msg
+        return None
+
+    def __indexed(self, index_key: Tuple[Optional[str], Optional[str]]) -> List[Dict]:
+        janus, plugin = index_key
+        if janus is None:
+            return self.__msg_all
+        if plugin is None:
+            return self.__msg_by_janus.get(janus, [])
+        return self.__msg_by_plugin.get((janus, plugin), [])
+
+    def __indexed_union(self, index_keys: Tuple) -> List[Dict]:
+        """Messages under any of the index keys, in arrival order"""
+        messages = dict()
+        for index_key in index_keys:
+            for message in self.__indexed(index_key):
+                messages[id(message)] = message
+        return sorted(
+            messages.values(), key=lambda message: self.__order[id(message)]
+        )
 
     async def get(
         self,
-        matcher: Union[Dict, Callable] = lambda *args, **kwargs: True,
+        matcher: Union[Dict, Callable, None] = None,
         timeout: Union[float, None] = None,
     ) -> Dict:
-        if not (isinstance(matcher, dict) or callable(matcher)):
+        """Get a message matching matcher
+
+        :param matcher: A dictionary pattern (see :func:`is_subset`) or a function
+            that returns True for the wanted message. Dictionary patterns are
+            compiled with :func:`compile_matcher`. If not given, the first
+            message received is returned.
+        :param timeout: Seconds to wait for the message. Wait forever if None.
+        """
+
+        if not (matcher is None or isinstance(matcher, dict) or callable(matcher)):
             raise TypeError(f"matcher must be callable or dictionary: {matcher}")
 
-        _matcher: Callable
-        if callable(matcher):
-            # matcher is a function
+        _matcher: Optional[Callable]
+        if matcher is None or callable(matcher):
             _matcher = matcher
         else:
-            # matcher is a dict
-            def dict_matcher(msg: dict) -> bool:
-                return is_subset(msg, matcher)
-
-            _matcher = dict_matcher
+            _matcher = compile_matcher(matcher)
 
         # Try to find message in saved messages
-        for msg in self.__msg_all:
-            if _matcher(msg):
-                return msg
+        msg = self.__find(_matcher)
+        if msg is not None:
+            self.__record_response(msg)
+            return msg
 
-        # Wait in queue until a matching message is found
-        msg = await asyncio.wait_for(self.__msg_in.get(), timeout=timeout)
-        # Always save received messages
-        self.__msg_all.append(msg)
+        if self.__exception is not None:
+            raise self.__exception
 
-        while not _matcher(msg):
-            msg = await asyncio.wait_for(self.__msg_in.get(), timeout=timeout)
-            self.__msg_all.append(msg)
+        # Wait until a matching message is put
+        waiter = (_matcher, asyncio.get_running_loop().create_future())
+        self.__waiters.append(waiter)
+        try:
+            msg = await asyncio.wait_for(waiter[1], timeout=timeout)
+        except asyncio.TimeoutError:
+            self.on_timeout()
+            raise
+        finally:
+            self.__waiters.remove(waiter)
 
+        self.__record_response(msg)
         return msg
 
     async def on_done(self) -> None:
@@ -107,4 +463,14 @@ class MessageTransaction:
 
     async def done(self) -> None:
         """Must call this when finish using to release resources"""
+        if self.__done:
+            return
+
+        self.__done = True
         await self.on_done()
+
+    async def __aenter__(self) -> "MessageTransaction":
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, exc_tb) -> None:
+        await self.done()
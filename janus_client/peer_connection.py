@@ -0,0 +1,146 @@
+from dataclasses import dataclass, field, replace
+from fnmatch import fnmatch
+import ipaddress
+import logging
+from typing import Dict, List, Optional, Set
+
+from aiortc import RTCConfiguration, RTCPeerConnection
+import ifaddr
+
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class PeerConnectionConfig:
+    """How PeerConnections created by the library gather candidates
+
+    Interfaces are given as interface names, which may contain wildcards
+    (``"docker*"``, ``"br-*"``), or as IP networks (``"10.0.0.0/8"``).
+
+    aiortc has no option to choose interfaces, so it still gathers on all of
+    them. Candidates on other interfaces are removed from the SDP sent to
+    Janus, see :meth:`filter_sdp`.
+
+    .. code-block:: python
+
+        # Janus on the same LAN: no STUN, only the LAN interface
+        config = PeerConnectionConfig(interfaces=["eth0"], host_only=True)
+        session = JanusSession(base_url=..., peer_connection_config=config)
+    """
+
+    configuration: Optional[RTCConfiguration] = None
+    """ICE servers and bundle policy. aiortc queries a public STUN server if
+    not given."""
+    interfaces: Optional[List[str]] = None
+    """Only send candidates on these interfaces. All if None."""
+    exclude_interfaces: List[str] = field(default_factory=list)
+    """Never send candidates on these interfaces"""
+    host_only: bool = False
+    """Only gather host candidates, without STUN or TURN. For Janus reachable
+    directly, e.g. on the same host or LAN."""
+
+    def rtc_configuration(self) -> Optional[RTCConfiguration]:
+        """RTCConfiguration to create PeerConnections with"""
+        if self.host_only:
+            return replace(self.configuration or RTCConfiguration(), iceServers=[])
+        return self.configuration
+
+    @property
+    def filters_interfaces(self) -> bool:
+        return self.interfaces is not None or bool(self.exclude_interfaces)
+
+    @staticmethod
+    def __matches(patterns: List[str], address: str, names: Set[str]) -> bool:
+        for pattern in patterns:
+            try:
+                network = ipaddress.ip_network(pattern, strict=False)
+            except ValueError:
+                if any(fnmatch(name, pattern) for name in names):
+                    return True
+                continue
+
+            try:
+                if ipaddress.ip_address(address) in network:
+                    return True
+            except ValueError:
+                # Host name, e.g. mDNS candidate
+                pass
+        return False
+
+    def filter_addresses(self, addresses: List[str]) -> List[str]:
+        """Local addresses allowed to gather candidates on"""
+        if not self.filters_interfaces:
+            return addresses
+
+        address_names: Dict[str, Set[str]] = dict()
+        for adapter in ifaddr.get_adapters():
+            for ip in adapter.ips:
+                address = ip.ip if isinstance(ip.ip, str) else ip.ip[0]
+                address_names.setdefault(address, set()).update(
+                    {adapter.name, adapter.nice_name}
+                )
+
+        allowed = []
+        for address in addresses:
+            names = address_names.get(address, set())
+            if self.interfaces is not None and not self.__matches(
+                self.interfaces, address, names
+            ):
+                continue
+            if self.__matches(self.exclude_interfaces, address, names):
+                continue
+            allowed.append(address)
+        return allowed
+
+    @staticmethod
+    def __candidate_address(line: str) -> Optional[str]:
+        """Local address a candidate line was gathered on
+
+        Host candidates have it as address, server reflexive ones as related
+        address. None for other candidates, which aren't filtered.
+        """
+        # a=candidate:foundation component transport priority address port
+        # typ type [raddr address rport port] ...
+        parts = line.split()
+        if len(parts) < 8:
+            return None
+        if parts[7] == "host":
+            return parts[4]
+        if parts[7] == "srflx" and "raddr" in parts[8:-1]:
+            return parts[parts.index("raddr") + 1]
+        return None
+
+    def filter_sdp(self, sdp: str) -> str:
+        """SDP without the candidates on interfaces that aren't allowed"""
+        if not self.filters_interfaces:
+            return sdp
+
+        lines = sdp.splitlines(keepends=True)
+        addresses = dict()
+        for line in lines:
+            if line.startswith("a=candidate:"):
+                addresses[line] = self.__candidate_address(line)
+
+        allowed = set(
+            self.filter_addresses(
+                list({address for address in addresses.values() if address})
+            )
+        )
+        return "".join(
+            line
+            for line in lines
+            if addresses.get(line) is None or addresses[line] in allowed
+        )
+
+
+default_peer_connection_config = PeerConnectionConfig()
+"""Config of plugins when neither the plugin nor its session has one"""
+
+
+def create_peer_connection(configuration: RTCConfiguration = None) -> RTCPeerConnection:
+    """Create a RTCPeerConnection
+
+    Used for all PeerConnections created by this library.
+    """
+    return RTCPeerConnection(configuration=configuration)
@@ -1,7 +1,15 @@
 import asyncio, logging
 
 from .plugin_base import JanusPlugin
-from .message_transaction import is_subset
+from .peer_connection import PeerConnectionConfig
+from .trace import MessageTrace
+from .message_transaction import (
+    is_subset,
+    compile_matcher,
+    any_matcher,
+    janus_error_matcher,
+    plugin_error_matcher,
+)
 from aiortc import RTCPeerConnection, MediaStreamTrack
 
 logger = logging.getLogger(__name__)
@@ -27,8 +35,9 @@ class JanusAudioBridgePlugin(JanusPlugin):
         on_media_receive_callback=None,
         on_track_created_callback=None,
         on_stream_ended_callback=None,
+        peer_connection_config: PeerConnectionConfig = None,
     ):
-        super().__init__()
+        super().__init__(peer_connection_config=peer_connection_config)
 
         self.__state = self.State.IDLE
         self.__webrtcup_event = asyncio.Event()
@@ -73,8 +82,7 @@ class JanusAudioBridgePlugin(JanusPlugin):
     async def __on_stream_ended(self):
         logger.info("Client Stream ended")
         # Stream ended. Ok to close PC multiple times.
-        if self._pc:
-            await self._pc.close()
+        await self._close_pc()
 
         if self.__on_stream_ended_callback:
             # If the callback is async, await it; otherwise, just call it
@@ -92,14 +100,10 @@ class JanusAudioBridgePlugin(JanusPlugin):
         """
         Handle asynchronous messages
         """
-        logger.info(f"on_receive: {response}")
+        logger.info("on_receive: %s", MessageTrace(response))
 
         if "jsep" in response:
-            logger.info(
-                "Received SDP (%s):\n%s",
-                response["jsep"].type,
-                response["jsep"].sdp.replace("\r\n", "\n"),
-            )
+            logger.debug("Received JSEP (%s)", response["jsep"]["type"])
             await self.on_receive_jsep(jsep=response["jsep"])
 
         janus_code = response["janus"]
@@ -123,7 +127,7 @@ class JanusAudioBridgePlugin(JanusPlugin):
 
             if plugin_data["audiobridge"] != "event":
                 # This plugin will only get events
-                logger.error(f"Invalid response: {response}")
+                logger.error("Invalid response: %s", MessageTrace(response))
                 return
 
             if "result" in plugin_data:
@@ -132,58 +136,32 @@ class JanusAudioBridgePlugin(JanusPlugin):
                     pass
 
             if "error_code" in plugin_data:
-                logger.error(f"Plugin Error: {response}")
+                logger.error("Plugin Error: %s", MessageTrace(response))
         else:
-            logger.info(f"Unimplemented response handle: {response}")
+            logger.info("Unimplemented response handle: %s", MessageTrace(response))
 
     async def __send_wrapper(
-        self, message: dict, matcher: dict, jsep: dict = {}
+        self, message: dict, matcher: dict, jsep: dict = {}, timeout: float = None
     ) -> dict:
-        def function_matcher(message: dict):
-            return (
-                is_subset(message, matcher)
-                or is_subset(
-                    message,
-                    {
-                        "janus": "success",
-                        "plugindata": {
-                            "plugin": self.name,
-                            "data": {
-                                "videoroom": "event",
-                                "error_code": None,
-                                "error": None,
-                            },
-                        },
-                    },
-                )
-                or is_subset(
-                    message,
-                    {
-                        "janus": "event",
-                        "plugindata": {
-                            "plugin": self.name,
-                            "data": {
-                                "videoroom": "event",
-                                "error_code": None,
-                                "error": None,
-                            },
-                        },
-                    },
-                )
-                or is_subset(message, {"janus": "error", "error": {}})
-            )
+        function_matcher = any_matcher(
+            compile_matcher(matcher),
+            plugin_error_matcher(self.name, "audiobridge"),
+            janus_error_matcher,
+        )
 
         full_message = message
         if jsep:
             full_message = {**message, "jsep": jsep}
 
-        message_transaction = await self.send(
+        async with await self.send(
             message=full_message,
-        )
-        response = await message_transaction.get(matcher=function_matcher, timeout=15)
-        await message_transaction.done()
+        ) as message_transaction:
+            response = await message_transaction.get(
+                matcher=function_matcher,
+                timeout=timeout if timeout is not None else message_transaction.timeout,
+            )
 
-        if is_subset(response, {"janus": "error", "error": {}}):
+        if janus_error_matcher(response):
             raise Exception(f"Janus error: {response}")
 
         return response
@@ -283,25 +261,32 @@ class JanusAudioBridgePlugin(JanusPlugin):
             matcher=success_matcher,
         )
 
-        await self._pc.close()
+        await self._close_pc()
 
         return is_subset(response, success_matcher)
 
-    async def configure_pc_and_create_offer(self, track: MediaStreamTrack = None):
+    async def configure_pc_and_create_offer(
+        self, track: MediaStreamTrack = None, trickle: bool = False
+    ) -> dict:
         """
         Configure a PeerConnection with media tracks.
+
+        :param trickle: (optional) Don't wait for candidate gathering. The
+            candidates are trickled.
+        :return: JSEP of the offer
         """
 
-        if not self._pc:
-            raise Exception("PeerConnection not available")
         if not track:
             raise Exception("No media track provided to configure PeerConnection")
 
         # Add track to the PeerConnection
-        self._pc.addTrack(track=track)
+        pc = self._get_pc()
+        pc.addTrack(track=track)
 
         # Create & set offer
-        await self._pc.setLocalDescription(await self._pc.createOffer())
+        jsep = await self.create_local_jsep(
+            pc=pc, description=await pc.createOffer(), trickle=trickle
+        )
         # logger.info(
         #     "Generated Client SDP (%s):\n%s",
         #     self._pc.localDescription.type,
@@ -310,15 +295,19 @@ class JanusAudioBridgePlugin(JanusPlugin):
         self.__state = self.State.STREAMING_OUT_MEDIA
 
         # Must configure on track event before setRemoteDescription
-        self._pc.on("track")(self.__on_track_created)
-        self._pc.on("connectionstatechange")(self.__on_state_changed)
+        pc.on("track")(self.__on_track_created)
+        pc.on("connectionstatechange")(self.__on_state_changed)
+
+        return jsep
 
-    async def configure(self, pc: RTCPeerConnection) -> bool:
+    async def configure(self, pc: RTCPeerConnection, jsep: dict = None) -> bool:
         """
         Configure participant in the room.
 
         Should already have joined a room before this.
 
+        :param jsep: (optional) JSEP of the offer. Created from the local
+            description of pc if not given.
         :return: True if successful.
         """
 
@@ -342,7 +331,7 @@ class JanusAudioBridgePlugin(JanusPlugin):
                 "body": body,
             },
             matcher=success_matcher,
-            jsep=await self.create_jsep(pc=pc),
+            jsep=jsep or await self.create_jsep(pc=pc),
         )
 
         if is_subset(response, success_matcher):
@@ -361,12 +350,17 @@ class JanusAudioBridgePlugin(JanusPlugin):
         else:
             return False
 
-    async def publish_stream(self, track: MediaStreamTrack = None) -> bool:
+    async def publish_stream(
+        self, track: MediaStreamTrack = None, trickle: bool = False
+    ) -> bool:
         """
         Stream audio to the room
 
         Should already have joined a room before this.
+
+        :param trickle: (optional) Send the offer without waiting for candidate
+            gathering and trickle the candidates.
         """
 
-        await self.configure_pc_and_create_offer(track=track)
-        return await self.configure(self._pc)
+        jsep = await self.configure_pc_and_create_offer(track=track, trickle=trickle)
+        return await self.configure(self._pc, jsep=jsep)
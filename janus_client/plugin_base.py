@@ -1,5 +1,7 @@
+import asyncio
 import logging
 from abc import ABC, abstractmethod
+from typing import Callable, Dict, Optional, Union
 
 from aiortc import (
     RTCPeerConnection,
@@ -7,7 +9,14 @@ from aiortc import (
 )
 
 from .session import JanusSession
+from .peer_connection import (
+    PeerConnectionConfig,
+    create_peer_connection,
+    default_peer_connection_config,
+)
 from .message_transaction import MessageTransaction
+from .event_stream import EventBroadcaster, EventSubscription, OverflowPolicy
+from .trickle import TrickleBatcher, sdp_candidates
 
 
 logger = logging.getLogger(__name__)
@@ -30,17 +39,45 @@ class JanusPlugin(ABC):
 
     _pc: RTCPeerConnection
     """A WebRTC PeerConnection. A plugin handle is expected to have
-    only 1 PC.
+    only 1 PC. None until media is negotiated, see :meth:`_get_pc`.
     """
 
-    def __init__(self) -> None:
+    __event_broadcaster: EventBroadcaster
+    """Subscriptions from :meth:`events`"""
+
+    __trickle_batcher: TrickleBatcher
+    __gathering_task: asyncio.Task
+    """Gathering and trickling candidates of the local description"""
+
+    __peer_connection_config: PeerConnectionConfig
+
+    def __init__(self, peer_connection_config: PeerConnectionConfig = None) -> None:
+        """
+        :param peer_connection_config: (optional) RTCConfiguration and interfaces
+            of the PeerConnections of this handle. Defaults to the config of the
+            session.
+        """
         self.__id = None
-        self._pc = RTCPeerConnection()
+        self.__session = None
+        self.__peer_connection_config = peer_connection_config
+        self._pc = None
+        self.__event_broadcaster = EventBroadcaster()
+        self.__trickle_batcher = TrickleBatcher(send=self.__send_trickle)
+        self.__gathering_task = None
 
     @property
     def id(self) -> int:
         return self.__id
 
+    @property
+    def peer_connection_config(self) -> PeerConnectionConfig:
+        """Config of this handle, else of its session, else the default"""
+        if self.__peer_connection_config is not None:
+            return self.__peer_connection_config
+        if self.__session and self.__session.peer_connection_config is not None:
+            return self.__session.peer_connection_config
+        return default_peer_connection_config
+
     async def attach(self, session: JanusSession):
         if self.__id:
             raise Exception(f"Plugin already attached to session ({self.__session})")
@@ -51,10 +88,13 @@ class JanusPlugin(ABC):
     async def destroy(self):
         """Destroy plugin handle"""
 
-        message_transaction = await self.send({"janus": "detach"})
-        await message_transaction.get()
-        await message_transaction.done()
+        async with await self.send({"janus": "detach"}) as message_transaction:
+            await message_transaction.get()
         self.__session.detach_plugin(self)
+        self.__event_broadcaster.close()
+        self.__trickle_batcher.close()
+        if self.__gathering_task:
+            self.__gathering_task.cancel()
 
     def __sanitize_message(self, message: dict) -> None:
         if "handle_id" in message:
@@ -84,41 +124,170 @@ class JanusPlugin(ABC):
         """Handle asynchronous events from Janus"""
         pass
 
+    def events(
+        self,
+        filter: Union[Dict, Callable[[Dict], bool], None] = None,
+        buffer_size: int = 100,
+        policy: Union[OverflowPolicy, str] = OverflowPolicy.DROP_OLDEST,
+    ) -> EventSubscription:
+        """Subscribe to asynchronous events of this plugin handle
+
+        ``async for event in plugin.events(filter={"janus": "webrtcup"}):``
+
+        :param filter: (optional) Dict pattern matched like
+            :func:`janus_client.message_transaction.is_subset`, or a function
+            returning True for wanted events. All events if not given.
+        :param buffer_size: (optional) Max number of events buffered for this
+            subscriber.
+        :param policy: (optional) What to do when the buffer is full. Drop the
+            oldest event by default.
+        """
+        return self.__event_broadcaster.subscribe(
+            filter=filter, buffer_size=buffer_size, policy=policy
+        )
+
+    async def _dispatch_event(self, response: dict) -> None:
+        """Deliver an asynchronous event to subscribers and :meth:`on_receive`"""
+        await self.__event_broadcaster.publish(response)
+        await self.on_receive(response)
+
+    def _get_pc(self) -> RTCPeerConnection:
+        """PeerConnection of this handle. Created if there is none or it's closed.
+
+        PCs are created lazily, so handles only used for requests don't pay
+        for one.
+        """
+        if self._pc is None or self._pc.signalingState == "closed":
+            self._pc = self._new_pc()
+        return self._pc
+
+    def _new_pc(self) -> RTCPeerConnection:
+        """Create a PeerConnection with the config of this handle"""
+        return create_peer_connection(
+            configuration=self.peer_connection_config.rtc_configuration()
+        )
+
+    def _local_sdp(self, pc: RTCPeerConnection) -> str:
+        """Local SDP of pc with only the candidates the config allows"""
+        return self.peer_connection_config.filter_sdp(pc.localDescription.sdp)
+
+    def prepare_pc(self) -> None:
+        """Create the PeerConnection ahead of negotiation
+
+        Saves the construction time when media is negotiated later.
+        """
+        self._get_pc()
+
+    def _unused_pc(self) -> Optional[RTCPeerConnection]:
+        """PeerConnection of this handle if nothing was negotiated on it yet"""
+        pc = self._pc
+        if (
+            pc is not None
+            and pc.signalingState == "stable"
+            and pc.localDescription is None
+            and pc.remoteDescription is None
+            and not pc.getTransceivers()
+        ):
+            return pc
+        return None
+
+    async def _set_pc(self, pc: RTCPeerConnection) -> None:
+        """Use another PeerConnection. The replaced one is closed."""
+        if self._pc is not None and self._pc is not pc:
+            await self._pc.close()
+        self._pc = pc
+
+    async def _close_pc(self) -> None:
+        """Close the PeerConnection, if any. Ok to call multiple times."""
+        if self._pc is not None:
+            await self._pc.close()
+
     async def create_jsep(self, pc: RTCPeerConnection, trickle: bool = False) -> dict:
         return {
-            "sdp": pc.localDescription.sdp,
+            "sdp": self._local_sdp(pc),
             "trickle": trickle,
             "type": pc.localDescription.type,
         }
 
+    async def create_local_jsep(
+        self,
+        pc: RTCPeerConnection,
+        description: RTCSessionDescription,
+        trickle: bool = False,
+    ) -> dict:
+        """Set the local description of pc and create JSEP to send to Janus
+
+        Without trickle, waits until all candidates are gathered and the JSEP
+        contains them. With trickle, the JSEP is returned right away and the
+        candidates are trickled to Janus when gathered, so signaling doesn't
+        wait for gathering.
+
+        :param description: Offer or answer created by pc
+        :param trickle: (optional) Trickle candidates.
+        """
+        if not trickle:
+            await pc.setLocalDescription(description)
+            return await self.create_jsep(pc=pc)
+
+        await self.wait_gathering()
+        self.__gathering_task = asyncio.create_task(
+            self.__gather_and_trickle(pc, description)
+        )
+        return {"sdp": description.sdp, "trickle": True, "type": description.type}
+
+    async def __gather_and_trickle(
+        self, pc: RTCPeerConnection, description: RTCSessionDescription
+    ) -> None:
+        await pc.setLocalDescription(description)
+        for candidate in sdp_candidates(self._local_sdp(pc)):
+            self.__trickle_batcher.add(candidate)
+        await self.__trickle_batcher.end()
+
+    async def wait_gathering(self) -> None:
+        """Wait until candidates from :meth:`create_local_jsep` are trickled"""
+        task = self.__gathering_task
+        if task:
+            try:
+                await task
+            finally:
+                if self.__gathering_task is task:
+                    self.__gathering_task = None
+
     async def on_receive_jsep(self, jsep: dict):
         if self._pc:
             if self._pc.signalingState == "closed":
                 raise Exception("Received JSEP when PeerConnection is closed")
 
+            # Local description must be set first
+            await self.wait_gathering()
             await self._pc.setRemoteDescription(
                 RTCSessionDescription(sdp=jsep["sdp"], type=jsep["type"])
             )
 
+    async def __send_trickle(self, message: dict) -> None:
+        async with await self.send(message) as message_transaction:
+            await message_transaction.get()
+
     async def trickle(self, sdpMLineIndex, candidate):
         """Send WebRTC candidates to Janus
 
-        :param sdpMLineIndex: (I don't know what is this)
-        :param candidate: Candidate payload. (I got it from WebRTC instance callback)
+        Candidates trickled within a short window are sent in one message.
+
+        :param sdpMLineIndex: Index of the m-line in the SDP the candidate
+            belongs to.
+        :param candidate: Candidate attribute, e.g. "candidate:1 1 udp ...".
+            None to notify the end of the candidates, which also sends the
+            candidates waiting to be sent.
         """
 
-        candidate_payload = dict()
         if candidate:
-            candidate_payload = {
-                "sdpMLineIndex": sdpMLineIndex,
-                "candidate": candidate,
-            }
+            self.__trickle_batcher.add(
+                {
+                    "sdpMLineIndex": sdpMLineIndex,
+                    "candidate": candidate,
+                }
+            )
         else:
             # Reference: https://janus.conf.meetecho.com/docs/rest.html
             # - a null candidate or a completed JSON object to notify the end of the candidates.
-            # TODO: test it
-            candidate_payload = None
-
-        # await self.send({"janus": "trickle", "candidate": candidate_payload})
-        await self.send({"janus": "trickle", "candidate": candidate_payload})
-        # TODO: Implement sending an array of candidates
+            await self.__trickle_batcher.end()
@@ -2,7 +2,9 @@ import asyncio
 import logging
 
 from .plugin_base import JanusPlugin
-from aiortc import RTCPeerConnection, RTCSessionDescription, VideoStreamTrack
+from .peer_connection import PeerConnectionConfig
+from .trace import MessageTrace
+from aiortc import RTCSessionDescription, VideoStreamTrack
 from aiortc.contrib.media import MediaPlayer, MediaRecorder
 
 logger = logging.getLogger(__name__)
@@ -12,13 +14,13 @@ class JanusEchoTestPlugin(JanusPlugin):
     """Janus EchoTest plugin implementation"""
 
     name = "janus.plugin.echotest"
-    __pc: RTCPeerConnection
     __recorder: MediaRecorder
     __webrtcup_event: asyncio.Event
 
-    def __init__(self) -> None:
-        super().__init__()
+    def __init__(self, peer_connection_config: PeerConnectionConfig = None) -> None:
+        super().__init__(peer_connection_config=peer_connection_config)
 
+        self.__recorder = None
         self.__webrtcup_event = asyncio.Event()
 
     async def on_receive(self, response: dict):
@@ -41,7 +43,7 @@ class JanusEchoTestPlugin(JanusPlugin):
 
             if plugin_data["echotest"] != "event":
                 # This plugin will only get events
-                logger.error(f"Invalid response: {response}")
+                logger.error("Invalid response: %s", MessageTrace(response))
                 return
 
             if "result" in plugin_data:
@@ -51,43 +53,52 @@ class JanusEchoTestPlugin(JanusPlugin):
 
                 if plugin_data["result"] == "done":
                     # Stream ended. Ok to close PC multiple times.
-                    if self.__pc:
-                        await self.__pc.close()
+                    await self._close_pc()
                     # Ok to stop recording multiple times.
                     if self.__recorder:
                         await self.__recorder.stop()
 
             if "errorcode" in plugin_data:
-                logger.error(f"Plugin Error: {response}")
+                logger.error("Plugin Error: %s", MessageTrace(response))
 
     async def wait_webrtcup(self) -> None:
         await self.__webrtcup_event.wait()
         self.__webrtcup_event.clear()
 
     async def on_receive_jsep(self, jsep: dict):
-        if self.__pc and self.__pc.signalingState != "closed":
-            await self.__pc.setRemoteDescription(
+        if self._pc and self._pc.signalingState != "closed":
+            # Local description must be set first
+            await self.wait_gathering()
+            await self._pc.setRemoteDescription(
                 RTCSessionDescription(sdp=jsep["sdp"], type=jsep["type"])
             )
 
-    async def start(self, play_from: str, record_to: str = ""):
-        self.__pc = RTCPeerConnection()
+    async def start(self, play_from: str, record_to: str = "", trickle: bool = False):
+        """Start echoing media
+
+        :param play_from: Media file or device to send, opened by MediaPlayer
+        :param record_to: (optional) Record the echoed media to this file
+        :param trickle: (optional) Send the offer without waiting for candidate
+            gathering and trickle the candidates.
+        """
+        pc = self._unused_pc() or self._new_pc()
+        await self._set_pc(pc)
 
         player = MediaPlayer(play_from)
 
         # configure media
         if player and player.audio:
-            self.__pc.addTrack(player.audio)
+            pc.addTrack(player.audio)
 
         if player and player.video:
-            self.__pc.addTrack(player.video)
+            pc.addTrack(player.video)
         else:
-            self.__pc.addTrack(VideoStreamTrack())
+            pc.addTrack(VideoStreamTrack())
 
         if record_to:
             self.__recorder = MediaRecorder(record_to)
 
-            @self.__pc.on("track")
+            @pc.on("track")
             async def on_track(track):
                 logger.info("Track %s received" % track.kind)
                 if track.kind == "video":
@@ -96,7 +107,9 @@ class JanusEchoTestPlugin(JanusPlugin):
                     self.__recorder.addTrack(track)
 
         # send offer
-        await self.__pc.setLocalDescription(await self.__pc.createOffer())
+        jsep = await self.create_local_jsep(
+            pc=pc, description=await pc.createOffer(), trickle=trickle
+        )
 
         message = {"janus": "message"}
         body = {
@@ -115,15 +128,10 @@ class JanusEchoTestPlugin(JanusPlugin):
             # "temporal_layer" : <temporal layers to receive (0-2), in case SVC is enabled>
         }
         message["body"] = body
-        message["jsep"] = {
-            "sdp": self.__pc.localDescription.sdp,
-            "trickle": False,
-            "type": self.__pc.localDescription.type,
-        }
+        message["jsep"] = jsep
 
-        message_transaction = await self.send(message)
-        response = await message_transaction.get()
-        await message_transaction.done()
+        async with await self.send(message) as message_transaction:
+            response = await message_transaction.get()
 
         # Immediately apply answer if it's found
         if "jsep" in response:
@@ -134,8 +142,7 @@ class JanusEchoTestPlugin(JanusPlugin):
 
         This should cause the stream to stop and a done event to be received.
         """
-        if self.__pc:
-            await self.__pc.close()
+        await self._close_pc()
 
         if self.__recorder:
             await self.__recorder.stop()
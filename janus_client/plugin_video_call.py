@@ -9,7 +9,14 @@ from aiortc import (
 from aiortc.contrib.media import MediaPlayer, MediaRecorder
 
 from .plugin_base import JanusPlugin
-from .message_transaction import is_subset
+from .peer_connection import PeerConnectionConfig
+from .trace import MessageTrace
+from .message_transaction import (
+    is_subset,
+    compile_matcher,
+    any_matcher,
+    plugin_error_matcher,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -19,15 +26,13 @@ class JanusVideoCallPlugin(JanusPlugin):
 
     name = "janus.plugin.videocall"  #: Plugin name
     __username: str
-    __pc: RTCPeerConnection
     __player: MediaPlayer
     __recorder: MediaRecorder
 
-    def __init__(self) -> None:
-        super().__init__()
+    def __init__(self, peer_connection_config: PeerConnectionConfig = None) -> None:
+        super().__init__(peer_connection_config=peer_connection_config)
 
         self.__username = ""
-        self.__pc = None
         self.__player = None
         self.__recorder = None
 
@@ -45,11 +50,11 @@ class JanusVideoCallPlugin(JanusPlugin):
                 await self.__recorder.start()
 
         if janus_code == "event":
-            logger.info(f"Event response: {response}")
+            logger.info("Event response: %s", MessageTrace(response))
             if "plugindata" in response:
                 if response["plugindata"]["data"]["videocall"] == "event":
                     event_result = response["plugindata"]["data"]["result"]
-                    logger.info(f"Event result: {event_result}")
+                    logger.info("Event result: %s", event_result)
                     if (
                         "event" in event_result
                         and event_result["event"] == "incomingcall"
@@ -58,18 +63,18 @@ class JanusVideoCallPlugin(JanusPlugin):
                             self.on_incoming_call(plugin=self, jsep=response["jsep"])
                         )
         else:
-            logger.info(f"Unimplemented response handle: {response}")
+            logger.info("Unimplemented response handle: %s", MessageTrace(response))
 
     async def on_receive_jsep(self, jsep: dict):
-        if self.__pc and self.__pc.signalingState != "closed":
-            await self.__pc.setRemoteDescription(
+        if self._pc and self._pc.signalingState != "closed":
+            await self._pc.setRemoteDescription(
                 RTCSessionDescription(sdp=jsep["sdp"], type=jsep["type"])
             )
 
     async def create_pc(
         self, player: MediaPlayer, recorder: MediaRecorder = None, jsep: dict = {}
     ) -> RTCPeerConnection:
-        pc = RTCPeerConnection()
+        pc = self._new_pc()
 
         # configure media
         if player.audio:
@@ -102,46 +107,34 @@ class JanusVideoCallPlugin(JanusPlugin):
         # # self.__player = MediaPlayer("./Into.the.Wild.2007.mp4")
         # self.__player = MediaPlayer("http://download.tsi.telecom-paristech.fr/gpac/dataset/dash/uhd/mux_sources/hevcds_720p30_2M.mp4")
         # self.__recorder = MediaRecorder("./videocall_in_record.mp4")
-        # self.__pc = await self.create_pc(
+        # pc = await self.create_pc(
         #     player=self.__player,
         #     recorder=self.__recorder,
         #     jsep=jsep,
         # )
 
-        # await self.__pc.setLocalDescription(await self.__pc.createAnswer())
+        # await pc.setLocalDescription(await pc.createAnswer())
         # jsep = {
-        #     "sdp": self.__pc.localDescription.sdp,
+        #     "sdp": pc.localDescription.sdp,
         #     "trickle": False,
-        #     "type": self.__pc.localDescription.type,
+        #     "type": pc.localDescription.type,
         # }
         # await self.accept(jsep=jsep)
 
     async def send_wrapper(self, message: dict, matcher: dict, jsep: dict = {}) -> dict:
-        def function_matcher(message: dict):
-            return is_subset(message, matcher) or is_subset(
-                message,
-                {
-                    "janus": "event",
-                    "plugindata": {
-                        "plugin": "janus.plugin.videocall",
-                        "data": {
-                            "videocall": "event",
-                            "error_code": None,
-                            "error": None,
-                        },
-                    },
-                },
-            )
+        function_matcher = any_matcher(
+            compile_matcher(matcher),
+            plugin_error_matcher(self.name, "videocall"),
+        )
 
         full_message = message
         if jsep:
             full_message = {**message, "jsep": jsep}
 
-        message_transaction = await self.send(
+        async with await self.send(
             message=full_message,
-        )
-        response = await message_transaction.get(matcher=function_matcher)
-        await message_transaction.done()
+        ) as message_transaction:
+            response = await message_transaction.get(matcher=function_matcher)
 
         return response
 
@@ -206,17 +199,18 @@ class JanusVideoCallPlugin(JanusPlugin):
     ) -> bool:
         if not self.__username:
             raise Exception("Register a username first")
-        self.__pc = await self.create_pc(player=player, recorder=recorder)
+        pc = await self.create_pc(player=player, recorder=recorder)
+        await self._set_pc(pc)
         self.__player = player
         self.__recorder = recorder
 
         # send offer
-        await self.__pc.setLocalDescription(await self.__pc.createOffer())
+        await pc.setLocalDescription(await pc.createOffer())
 
         jsep = {
-            "sdp": self.__pc.localDescription.sdp,
+            "sdp": self._local_sdp(pc),
             "trickle": True,
-            "type": self.__pc.localDescription.type,
+            "type": pc.localDescription.type,
         }
 
         matcher_success = {
@@ -252,7 +246,7 @@ class JanusVideoCallPlugin(JanusPlugin):
         player: MediaPlayer,
         recorder: MediaRecorder = None,
     ) -> bool:
-        self.__pc = pc
+        await self._set_pc(pc)
         self.__player = player
         self.__recorder = recorder
 
@@ -340,9 +334,8 @@ class JanusVideoCallPlugin(JanusPlugin):
         )
 
         # Stream ended. Ok to close PC multiple times.
-        if self.__pc:
-            await self.__pc.close()
-            self.__pc = None
+        await self._close_pc()
+        self._pc = None
         # Ok to stop recording multiple times.
         if self.__recorder:
             await self.__recorder.stop()
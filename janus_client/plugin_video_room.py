@@ -9,7 +9,14 @@ from aiortc import (
 )
 
 from .plugin_base import JanusPlugin
-from .message_transaction import is_subset
+from .trace import MessageTrace
+from .message_transaction import (
+    is_subset,
+    compile_matcher,
+    any_matcher,
+    janus_error_matcher,
+    plugin_error_matcher,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -82,7 +89,7 @@ class JanusVideoRoomPlugin(JanusPlugin):
                     raise Exception("Media streaming when idle")
 
         if janus_code == "event":
-            logger.info(f"Event response: {response}")
+            logger.info("Event response: %s", MessageTrace(response))
             # if "plugindata" in response:
             #     if response["plugindata"]["data"]["videoroom"] == "attached":
             #         # Subscriber attached
@@ -91,56 +98,37 @@ class JanusVideoRoomPlugin(JanusPlugin):
             #         # Participant joined (joined as publisher but may not publish)
             #         self.joined_event.set()
         else:
-            logger.info(f"Unimplemented response handle: {response}")
+            logger.info("Unimplemented response handle: %s", MessageTrace(response))
 
         # VideoRoom plugin doesn't send JSEP asynchronously
 
-    async def send_wrapper(self, message: dict, matcher: dict, jsep: dict = {}) -> dict:
-        def function_matcher(message: dict):
-            return (
-                is_subset(message, matcher)
-                or is_subset(
-                    message,
-                    {
-                        "janus": "success",
-                        "plugindata": {
-                            "plugin": self.name,
-                            "data": {
-                                "videoroom": "event",
-                                "error_code": None,
-                                "error": None,
-                            },
-                        },
-                    },
-                )
-                or is_subset(
-                    message,
-                    {
-                        "janus": "event",
-                        "plugindata": {
-                            "plugin": self.name,
-                            "data": {
-                                "videoroom": "event",
-                                "error_code": None,
-                                "error": None,
-                            },
-                        },
-                    },
-                )
-                or is_subset(message, {"janus": "error", "error": {}})
-            )
+    async def send_wrapper(
+        self, message: dict, matcher: dict, jsep: dict = {}, timeout: float = None
+    ) -> dict:
+        """Send message and wait for the response matching matcher
+
+        :param timeout: (optional) Seconds to wait for the response. Derived from
+            observed response times if not given.
+        """
+        function_matcher = any_matcher(
+            compile_matcher(matcher),
+            plugin_error_matcher(self.name, "videoroom"),
+            janus_error_matcher,
+        )
 
         full_message = message
         if jsep:
             full_message = {**message, "jsep": jsep}
 
-        message_transaction = await self.send(
+        async with await self.send(
             message=full_message,
-        )
-        response = await message_transaction.get(matcher=function_matcher, timeout=15)
-        await message_transaction.done()
+        ) as message_transaction:
+            response = await message_transaction.get(
+                matcher=function_matcher,
+                timeout=timeout if timeout is not None else message_transaction.timeout,
+            )
 
-        if is_subset(response, {"janus": "error", "error": {}}):
+        if janus_error_matcher(response):
             raise Exception(f"Janus error: {response}")
 
         return response
@@ -520,7 +508,7 @@ class JanusVideoRoomPlugin(JanusPlugin):
             matcher=success_matcher,
         )
 
-        await self._pc.close()
+        await self._close_pc()
 
         return is_subset(response, success_matcher)
 
@@ -529,7 +517,8 @@ class JanusVideoRoomPlugin(JanusPlugin):
         stream_track: List[MediaStreamTrack] = [],
         jsep: dict = {},
     ) -> RTCPeerConnection:
-        pc = RTCPeerConnection()
+        # Use the PC created ahead by prepare_pc, if any
+        pc = self._unused_pc() or self._new_pc()
 
         for track in stream_track:
             pc.addTrack(track=track)
@@ -559,16 +548,22 @@ class JanusVideoRoomPlugin(JanusPlugin):
         self,
         stream_track: List[MediaStreamTrack],
         configuration: dict = {},
+        trickle: bool = False,
     ) -> None:
         """Publish video stream to the room
 
         Should already have joined a room before this.
+
+        :param trickle: (optional) Send the offer without waiting for candidate
+            gathering and trickle the candidates.
         """
 
-        self._pc = await self.create_pc(stream_track=stream_track)
+        await self._set_pc(await self.create_pc(stream_track=stream_track))
 
         # send offer
-        await self._pc.setLocalDescription(await self._pc.createOffer())
+        jsep = await self.create_local_jsep(
+            pc=self._pc, description=await self._pc.createOffer(), trickle=trickle
+        )
         self.__state = self.State.STREAMING_OUT_MEDIA
 
         body = {
@@ -604,7 +599,7 @@ class JanusVideoRoomPlugin(JanusPlugin):
                 "body": body,
             },
             matcher=success_matcher,
-            jsep=await self.create_jsep(pc=self._pc),
+            jsep=jsep,
         )
 
         if is_subset(response, success_matcher):
@@ -639,7 +634,7 @@ class JanusVideoRoomPlugin(JanusPlugin):
             matcher=success_matcher,
         )
 
-        await self._pc.close()
+        await self._close_pc()
 
         return is_subset(response, success_matcher)
 
@@ -654,6 +649,7 @@ class JanusVideoRoomPlugin(JanusPlugin):
         autoupdate: bool = True,
         private_id: int = None,
         # streams: List = [],
+        trickle: bool = False,
     ) -> bool:
         """Subscribe to a feed. Only supporting subscribe to 1 stream.
 
@@ -666,6 +662,8 @@ class JanusVideoRoomPlugin(JanusPlugin):
         :param use_msid: whether subscriptions should include an msid that references the publisher; false by default.
         :param autoupdate: whether a new SDP offer is sent automatically when a subscribed publisher leaves; true by default.
         :param private_id: unique ID of the publisher that originated this request; optional, unless mandated by the room configuration.
+        :param trickle: (optional) Send the answer without waiting for candidate
+            gathering and trickle the candidates.
         """
 
         self.__state = self.State.STREAMING_IN_MEDIA
@@ -702,13 +700,15 @@ class JanusVideoRoomPlugin(JanusPlugin):
 
         # Successfully attached. Create PeerConnection then start.
         self.__on_track_created = on_track_created
-        self._pc = await self.create_pc(
-            jsep=response["jsep"],
+        await self._set_pc(
+            await self.create_pc(
+                jsep=response["jsep"],
+            )
         )
-        await self._pc.setLocalDescription(await self._pc.createAnswer())
-
         return await self.start(
-            jsep=await self.create_jsep(self._pc),
+            jsep=await self.create_local_jsep(
+                pc=self._pc, description=await self._pc.createAnswer(), trickle=trickle
+            ),
         )
 
     async def unsubscribe(self) -> None:
@@ -735,7 +735,7 @@ class JanusVideoRoomPlugin(JanusPlugin):
             matcher=success_matcher,
         )
 
-        await self._pc.close()
+        await self._close_pc()
 
         return is_subset(response, success_matcher)
 
@@ -764,16 +764,15 @@ class JanusVideoRoomPlugin(JanusPlugin):
     async def pause(self) -> None:
         """Pause media streaming"""
 
-        message_transaction = await self.send(
+        async with await self.send(
             {
                 "janus": "message",
                 "body": {
                     "request": "pause",
                 },
             }
-        )
-        await message_transaction.get()
-        await message_transaction.done()
+        ) as message_transaction:
+            await message_transaction.get()
 
     # async def handle_jsep(self, jsep):
     #     logger.info(jsep)
@@ -0,0 +1,177 @@
+import asyncio
+from collections import deque
+import logging
+import traceback
+from typing import Callable, Deque
+
+from .session import JanusSession
+from .plugin_video_room import JanusVideoRoomPlugin
+
+
+logger = logging.getLogger(__name__)
+
+
+class JanusVideoRoomSubscriberPool:
+    """Keep VideoRoom handles attached and ready for subscribers
+
+    Each idle handle is attached to the session and already has a
+    PeerConnection, so a new subscriber only waits for signaling with Janus.
+    Taken handles are replaced in the background. Taken handles belong to
+    the caller, who destroys them when done.
+
+    .. code-block:: python
+
+        pool = JanusVideoRoomSubscriberPool(session=session, size=4)
+        await pool.start()
+
+        subscriber = await pool.subscribe_and_start(
+            room_id=1234, on_track_created=on_track_created, stream={"feed": 1}
+        )
+        ...
+        await subscriber.unsubscribe()
+        await subscriber.destroy()
+
+        await pool.close()
+    """
+
+    session: JanusSession
+    size: int
+    __plugin_factory: Callable[[], JanusVideoRoomPlugin]
+    __idle: Deque[JanusVideoRoomPlugin]
+    __refill_task: asyncio.Task
+    __closed: bool
+
+    def __init__(
+        self,
+        session: JanusSession,
+        size: int = 2,
+        plugin_factory: Callable[[], JanusVideoRoomPlugin] = JanusVideoRoomPlugin,
+    ) -> None:
+        """
+        :param session: Session to attach the handles to
+        :param size: (optional) Number of idle handles to keep ready
+        :param plugin_factory: (optional) Creates the handles. Use it to get
+            subclasses of JanusVideoRoomPlugin.
+        """
+        self.session = session
+        self.size = size
+        self.__plugin_factory = plugin_factory
+        self.__idle = deque()
+        self.__refill_task = None
+        self.__closed = False
+
+    @property
+    def available(self) -> int:
+        """Number of idle handles ready to be taken"""
+        return len(self.__idle)
+
+    async def start(self) -> None:
+        """Fill the pool and wait until it's full
+
+        Shares the background refill, so the pool doesn't grow beyond size.
+        """
+        self.__refill()
+        task = self.__refill_task
+        if task is None:
+            return
+
+        await asyncio.wait([task])
+        if not task.cancelled() and task.exception():
+            raise task.exception()
+
+    async def wait_filled(self) -> None:
+        """Wait until the background refill is done"""
+        if self.__refill_task:
+            await asyncio.wait([self.__refill_task])
+
+    def __refill(self) -> None:
+        if self.__closed or self.__refill_task is not None:
+            return
+        if len(self.__idle) >= self.size:
+            return
+
+        self.__refill_task = asyncio.create_task(self.__fill())
+        self.__refill_task.add_done_callback(self.__refill_done_cb)
+
+    def __refill_done_cb(self, task: asyncio.Task) -> None:
+        self.__refill_task = None
+        if not task.cancelled() and task.exception():
+            exception = task.exception()
+            logger.error(
+                "".join(
+                    traceback.format_exception(
+                        type(exception),
+                        value=exception,
+                        tb=exception.__traceback__,
+                    )
+                )
+            )
+
+    async def __create_handle(self) -> JanusVideoRoomPlugin:
+        plugin = self.__plugin_factory()
+        try:
+            await plugin.attach(session=self.session)
+        except asyncio.CancelledError:
+            # Attached before the cancellation was delivered
+            if plugin.id is not None:
+                await self.__destroy_handle(plugin)
+            raise
+
+        plugin.prepare_pc()
+        return plugin
+
+    @staticmethod
+    async def __destroy_handle(plugin: JanusVideoRoomPlugin) -> None:
+        await plugin._close_pc()
+        await plugin.destroy()
+
+    async def __fill(self) -> None:
+        while not self.__closed and len(self.__idle) < self.size:
+            # Nothing is awaited between creating the handle and adding it,
+            # so close() finds every handle attached here
+            plugin = await self.__create_handle()
+            self.__idle.append(plugin)
+
+    async def acquire(self) -> JanusVideoRoomPlugin:
+        """Take an attached handle with a PeerConnection ready
+
+        Attaches a new one if the pool is empty.
+        """
+        if self.__closed:
+            raise Exception("Subscriber pool is closed")
+
+        if self.__idle:
+            plugin = self.__idle.popleft()
+        else:
+            plugin = await self.__create_handle()
+
+        self.__refill()
+        return plugin
+
+    async def subscribe_and_start(self, **kwargs) -> JanusVideoRoomPlugin:
+        """Subscribe to a feed with a handle from the pool
+
+        Keyword arguments are the same as
+        :meth:`JanusVideoRoomPlugin.subscribe_and_start`.
+
+        :return: The subscribed handle.
+        """
+        plugin = await self.acquire()
+        try:
+            if not await plugin.subscribe_and_start(**kwargs):
+                raise Exception("Fail to start subscription.")
+        except BaseException:
+            await self.__destroy_handle(plugin)
+            raise
+
+        return plugin
+
+    async def close(self) -> None:
+        """Stop refilling and destroy idle handles"""
+        self.__closed = True
+        if self.__refill_task:
+            self.__refill_task.cancel()
+            await asyncio.wait([self.__refill_task])
+
+        while self.__idle:
+            await self.__destroy_handle(self.__idle.popleft())
@@ -0,0 +1,192 @@
+import asyncio
+from enum import IntEnum
+import heapq
+import itertools
+import logging
+from typing import Dict, List, Tuple
+
+
+logger = logging.getLogger(__name__)
+
+
+class SendPriority(IntEnum):
+    """Priority class of an outgoing message. Lower value is sent first."""
+
+    HIGH = 0
+    """Keepalive, trickle, hangup and other messages keeping sessions healthy"""
+    NORMAL = 1
+    BULK = 2
+    """Room management, listing and admin requests"""
+
+
+_HIGH_PRIORITY_JANUS = {"keepalive", "trickle", "hangup", "detach", "claim"}
+_NORMAL_PRIORITY_JANUS = {"create", "attach", "destroy", "message", "info", "ping"}
+_BULK_REQUESTS = {
+    "create",
+    "edit",
+    "destroy",
+    "list",
+    "listparticipants",
+    "listforwarders",
+    "exists",
+    "allowed",
+    "kick",
+    "moderate",
+    "enable_recording",
+}
+
+
+def message_priority(message: Dict) -> SendPriority:
+    """Guess priority class of a message from its content"""
+    janus = message.get("janus")
+    if janus in _HIGH_PRIORITY_JANUS:
+        return SendPriority.HIGH
+
+    if janus == "message":
+        body = message.get("body")
+        if isinstance(body, dict) and body.get("request") in _BULK_REQUESTS:
+            return SendPriority.BULK
+        return SendPriority.NORMAL
+
+    if janus in _NORMAL_PRIORITY_JANUS:
+        return SendPriority.NORMAL
+
+    # Admin API requests
+    return SendPriority.BULK
+
+
+class OutboundScheduler:
+    """Rate limit outgoing messages with a token bucket
+
+    Senders call :meth:`acquire` before sending. When no token is available,
+    senders wait and are let through in priority order, then in order of
+    arrival.
+    """
+
+    rate: float
+    """Tokens added per second"""
+    burst: float
+    """Max number of tokens, i.e. messages that can be sent at once"""
+    __tokens: float
+    __last_refill: float
+    __waiters: List[Tuple[int, int, asyncio.Future]]
+    __sequence: "itertools.count[int]"
+    __task: asyncio.Task
+    __sent: Dict[SendPriority, int]
+    __wait_total: Dict[SendPriority, float]
+    __wait_max: Dict[SendPriority, float]
+
+    def __init__(self, rate: float, burst: float = None) -> None:
+        """
+        :param rate: Messages per second
+        :param burst: (optional) Messages that can be sent at once after being
+            idle. Defaults to rate, at least 1.
+        """
+        if rate <= 0:
+            raise Exception(f"Rate must be positive: {rate}")
+
+        self.rate = rate
+        self.burst = burst if burst is not None else max(1, rate)
+        self.__tokens = self.burst
+        self.__last_refill = None
+        self.__waiters = []
+        self.__sequence = itertools.count()
+        self.__task = None
+        self.__sent = {priority: 0 for priority in SendPriority}
+        self.__wait_total = {priority: 0.0 for priority in SendPriority}
+        self.__wait_max = {priority: 0.0 for priority in SendPriority}
+
+    @property
+    def depth(self) -> int:
+        """Number of senders waiting"""
+        return sum(1 for _, _, future in self.__waiters if not future.done())
+
+    def __refill(self, now: float) -> None:
+        if self.__last_refill is not None:
+            elapsed = now - self.__last_refill
+            self.__tokens = min(self.burst, self.__tokens + elapsed * self.rate)
+        self.__last_refill = now
+
+    def __record(self, priority: SendPriority, wait_time: float) -> None:
+        self.__sent[priority] += 1
+        self.__wait_total[priority] += wait_time
+        self.__wait_max[priority] = max(self.__wait_max[priority], wait_time)
+
+    async def acquire(self, priority: SendPriority = SendPriority.NORMAL) -> None:
+        """Wait until the message is allowed to be sent"""
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        self.__refill(start)
+
+        if not self.__waiters and self.__tokens >= 1:
+            self.__tokens -= 1
+            self.__record(priority, 0.0)
+            return
+
+        future = loop.create_future()
+        heapq.heappush(self.__waiters, (priority, next(self.__sequence), future))
+        if self.__task is None:
+            self.__task = asyncio.create_task(self.__release_waiters())
+
+        await future
+        self.__record(priority, loop.time() - start)
+
+    async def __release_waiters(self) -> None:
+        loop = asyncio.get_running_loop()
+        try:
+            while self.__waiters:
+                self.__refill(loop.time())
+
+                while self.__waiters and self.__tokens >= 1:
+                    _, _, future = heapq.heappop(self.__waiters)
+                    if future.done():
+                        # Sender gave up waiting
+                        continue
+                    self.__tokens -= 1
+                    future.set_result(None)
+
+                if self.__waiters:
+                    await asyncio.sleep((1 - self.__tokens) / self.rate)
+        finally:
+            # close() may have replaced this task by a newer one already
+            if self.__task is asyncio.current_task():
+                self.__task = None
+
+    def stats(self) -> Dict:
+        """Queue depth and wait times
+
+        ``wait_avg`` and ``wait_max`` are in seconds, keyed by priority name.
+        """
+        return {
+            "depth": self.depth,
+            "sent": {priority.name: self.__sent[priority] for priority in SendPriority},
+            "wait_avg": {
+                priority.name: (
+                    self.__wait_total[priority] / self.__sent[priority]
+                    if self.__sent[priority]
+                    else 0.0
+                )
+                for priority in SendPriority
+            },
+            "wait_max": {
+                priority.name: self.__wait_max[priority] for priority in SendPriority
+            },
+        }
+
+    def close(self, exception: BaseException = None) -> None:
+        """Stop releasing waiters. Can be used again afterwards.
+
+        :param exception: (optional) Raised to waiting senders. They are
+            cancelled if not given.
+        """
+        if self.__task is not None:
+            self.__task.cancel()
+            self.__task = None
+        for _, _, future in self.__waiters:
+            if future.done():
+                continue
+            if exception is None:
+                future.cancel()
+            else:
+                future.set_exception(exception)
+        self.__waiters.clear()
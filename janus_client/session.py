@@ -1,10 +1,15 @@
 import asyncio
-from typing import Dict, TYPE_CHECKING
+from typing import Callable, Dict, TYPE_CHECKING, Union
 import logging
 import traceback
 
 from .transport import JanusTransport
+from .transport_pool import JanusTransportPool, default_transport_pool
 from .message_transaction import MessageTransaction
+from .dispatch import DispatchQueue
+from .event_stream import EventBroadcaster, EventSubscription, OverflowPolicy
+from .peer_connection import PeerConnectionConfig
+from .trace import MessageTrace
 
 if TYPE_CHECKING:
     from .plugin_base import JanusPlugin
@@ -25,6 +30,12 @@ class JanusSession:
     transport: JanusTransport
     __create_lock: asyncio.Lock
     created: bool
+    __transport_pool: JanusTransportPool
+    __transport_acquired: bool
+    dispatch_queue_size: int
+    peer_connection_config: PeerConnectionConfig
+    __dispatch_queues: Dict[int, DispatchQueue]
+    __event_broadcaster: EventBroadcaster
 
     def __init__(
         self,
@@ -32,20 +43,63 @@ class JanusSession:
         api_secret: str = None,
         token: str = None,
         transport: JanusTransport = None,
+        shared_transport: bool = False,
+        dispatch_queue_size: int = 1000,
+        transport_config: Dict = None,
+        peer_connection_config: PeerConnectionConfig = None,
     ):
+        """Create session instance
+
+        :param base_url: Janus server address. Not used if transport is given.
+        :param api_secret: (optional) API key for shared static secret authentication
+        :param token: (optional) Token for shared token based authentication
+        :param transport: (optional) Use this transport instead of creating one.
+        :param shared_transport: (optional) Share the created transport with other
+            sessions connecting to the same server, through the default
+            JanusTransportPool. The pool disconnects it 10 seconds after the
+            last session releases it, see ``default_transport_pool.idle_linger``.
+            Defaults to False.
+        :param dispatch_queue_size: (optional) Max number of events waiting to be
+            delivered to each plugin handle. The oldest events are dropped when
+            it's full, except webrtcup, media, hangup and detached.
+        :param transport_config: (optional) Extra arguments of the created
+            transport, e.g. ``{"compression": None, "max_size": 4 << 20}`` for
+            websockets. Not used if transport is given.
+        :param peer_connection_config: (optional) RTCConfiguration and interfaces
+            of the PeerConnections of plugin handles attached to this session.
+        """
         self.__id = None
         self.__create_lock = asyncio.Lock()
         self.created = False
         self.plugin_handles: Dict[int, JanusPlugin] = dict()
+        self.dispatch_queue_size = dispatch_queue_size
+        self.peer_connection_config = peer_connection_config
+        self.__dispatch_queues: Dict[int, DispatchQueue] = dict()
+        self.__event_broadcaster = EventBroadcaster()
+        self.__transport_pool = None
+        self.__transport_acquired = False
+        self.__transport_args = dict(
+            base_url=base_url,
+            api_secret=api_secret,
+            token=token,
+            config=transport_config or {},
+        )
 
         if transport:
             self.transport = transport
+        elif shared_transport:
+            self.__transport_pool = default_transport_pool
+            self.__acquire_transport()
         else:
-            self.transport = JanusTransport.create_transport(
-                base_url=base_url,
-                api_secret=api_secret,
-                token=token,
-            )
+            self.transport = JanusTransport.create_transport(**self.__transport_args)
+
+    def __acquire_transport(self) -> None:
+        self.transport = self.__transport_pool.acquire(**self.__transport_args)
+        self.__transport_acquired = True
+
+    async def __release_transport(self) -> None:
+        self.__transport_acquired = False
+        await self.__transport_pool.release(self.transport)
 
     def __str__(self):
         return f"Session ({self.__id}) {self}"
@@ -60,16 +114,22 @@ class JanusSession:
         if self.created:
             await self.destroy()
 
-        await self.transport.disconnect()
+        # Shared transport is disconnected by the pool when it's not used
+        if not self.__transport_pool:
+            await self.transport.disconnect()
+        elif self.__transport_acquired:
+            await self.__release_transport()
 
     async def _create(self) -> None:
+        if self.__transport_pool and not self.__transport_acquired:
+            self.__acquire_transport()
+
         if not self.transport.connected:
             await self.transport.connect()
 
         if not self.__id:
             self.__id = await self.transport.create_session(self)
 
-        self.keepalive_task = asyncio.create_task(self.keepalive())
         self.created = True
 
     async def create(self) -> None:
@@ -82,11 +142,12 @@ class JanusSession:
 
     async def _destroy(self) -> None:
         try:
-            message_transaction = await self.send(
+            async with await self.send(
                 {"janus": "destroy"},
-            )
-            await message_transaction.get(matcher={"janus": "success"}, timeout=15)
-            await message_transaction.done()
+            ) as message_transaction:
+                await message_transaction.get(
+                    matcher={"janus": "success"}, timeout=message_transaction.timeout
+                )
         except Exception as exception:
             logger.error(
                 "".join(
@@ -98,12 +159,18 @@ class JanusSession:
                 )
             )
 
-        self.keepalive_task.cancel()
-
         await self.transport.destroy_session(self.__id)
 
         self.__id = None
 
+        for dispatch_queue in self.__dispatch_queues.values():
+            dispatch_queue.close()
+        self.__dispatch_queues.clear()
+        self.__event_broadcaster.close()
+
+        if self.__transport_pool:
+            await self.__release_transport()
+
     async def destroy(self) -> None:
         """Release resources
 
@@ -139,32 +206,74 @@ class JanusSession:
             handle_id=handle_id,
         )
 
-    # TODO: This is not required if using HTTP REST API, though it
-    #       doesn't hurt to still send it.
-    async def keepalive(self) -> None:
-        # Reference: https://janus.conf.meetecho.com/docs/rest.html
-        # A Janus session is kept alive as long as there's no inactivity for 60 seconds
-        while True:
-            await asyncio.sleep(30)
-            message_transaction = await self.send({"janus": "keepalive"})
-            await message_transaction.done()
-
     async def on_receive(self, response: dict):
         if "sender" not in response:
             # This is response for self
-            logger.info(f"Async event for session: {response}")
+            logger.info("Async event for session: %s", MessageTrace(response))
+            if len(self.__event_broadcaster):
+                self.__dispatch_queue(None).put(response)
             return
 
         # This is response for plugin handle
         plugin_id = response["sender"]
         if plugin_id not in self.plugin_handles:
             logger.info(
-                f"Got response for plugin handle but handle not found. Handle ID: {plugin_id}"
+                "Got response for plugin handle but handle not found. Handle ID: %s",
+                plugin_id,
             )
-            logger.info(f"Unhandeled response: {response}")
+            logger.info("Unhandeled response: %s", MessageTrace(response))
             return
 
-        await self.plugin_handles[plugin_id].on_receive(response)
+        # Deliver in the handle's own task, so a slow handle won't hold up
+        # receiving for the others
+        self.__dispatch_queue(plugin_id).put(response)
+
+    def __dispatch_queue(self, handle_id: int) -> DispatchQueue:
+        """Get dispatch queue of a plugin handle. None for the session itself."""
+        if handle_id not in self.__dispatch_queues:
+            if handle_id is None:
+                callback = self.__event_broadcaster.publish
+            else:
+                plugin = self.plugin_handles[handle_id]
+
+                async def callback(response: dict) -> None:
+                    await self.__event_broadcaster.publish(response)
+                    await plugin._dispatch_event(response)
+
+            self.__dispatch_queues[handle_id] = DispatchQueue(
+                callback=callback,
+                max_size=self.dispatch_queue_size,
+                name=f"handle {handle_id}" if handle_id else f"session {self.__id}",
+            )
+        return self.__dispatch_queues[handle_id]
+
+    def events(
+        self,
+        filter: Union[Dict, Callable[[Dict], bool], None] = None,
+        buffer_size: int = 100,
+        policy: Union[OverflowPolicy, str] = OverflowPolicy.DROP_OLDEST,
+    ) -> EventSubscription:
+        """Subscribe to asynchronous events of this session and its plugin handles
+
+        ``async for event in session.events(filter={"janus": "hangup"}):``
+
+        Parameters are the same as :meth:`janus_client.JanusPlugin.events`.
+        """
+        return self.__event_broadcaster.subscribe(
+            filter=filter, buffer_size=buffer_size, policy=policy
+        )
+
+    @property
+    def dispatch_stats(self) -> Dict[int, Dict]:
+        """Event dispatch metrics of each plugin handle
+
+        Keyed by handle ID, None for events of the session itself. Each value has ``depth``, ``max_depth``,
+        ``dispatched`` and ``dropped``.
+        """
+        return {
+            handle_id: dispatch_queue.stats()
+            for handle_id, dispatch_queue in self.__dispatch_queues.items()
+        }
 
     async def attach_plugin(self, plugin: "JanusPlugin") -> int:
         """Create plugin handle for the given plugin type
@@ -175,11 +284,10 @@ class JanusSession:
         def matcher(res):
             return res["janus"] in ["error", "success"]
 
-        message_transaction = await self.send(
+        async with await self.send(
             {"janus": "attach", "plugin": plugin.name},
-        )
-        response = await message_transaction.get(matcher=matcher)
-        await message_transaction.done()
+        ) as message_transaction:
+            response = await message_transaction.get(matcher=matcher)
 
         if response["janus"] == "error":
             raise PluginAttachFail(response=response)
@@ -194,3 +302,6 @@ class JanusSession:
 
     def detach_plugin(self, plugin_handle: "JanusPlugin"):
         del self.plugin_handles[plugin_handle.id]
+        dispatch_queue = self.__dispatch_queues.pop(plugin_handle.id, None)
+        if dispatch_queue:
+            dispatch_queue.close()
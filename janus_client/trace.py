@@ -0,0 +1,91 @@
+import logging
+import random
+from dataclasses import dataclass
+from typing import Dict
+
+
+trace_logger = logging.getLogger("janus_client.trace")
+"""Logger of every message sent and received, at DEBUG level.
+
+Enable it with ``logging.getLogger("janus_client.trace").setLevel(logging.DEBUG)``.
+Each record has ``janus``, ``transaction``, ``session_id`` and ``handle_id``
+attributes for structured log handlers.
+"""
+
+
+@dataclass
+class TraceConfig:
+    sdp_max_length: int = 128
+    """Truncate SDP to this many characters when formatting. Negative to never
+    truncate."""
+    sdp_sample_rate: float = 0.0
+    """Fraction (0 to 1) of messages that will have their SDP formatted in full."""
+
+
+trace_config = TraceConfig()
+
+
+def configure_trace(sdp_max_length: int = None, sdp_sample_rate: float = None):
+    """Configure how messages are formatted in logs
+
+    :param sdp_max_length: Truncate SDP to this many characters. Negative to
+        never truncate.
+    :param sdp_sample_rate: Fraction (0 to 1) of messages that will have their
+        SDP formatted in full.
+    """
+    if sdp_max_length is not None:
+        trace_config.sdp_max_length = sdp_max_length
+    if sdp_sample_rate is not None:
+        trace_config.sdp_sample_rate = sdp_sample_rate
+
+
+def format_message(message: Dict) -> str:
+    """Format message for logging, truncating SDP according to trace_config"""
+    jsep = message.get("jsep")
+    sdp_max_length = trace_config.sdp_max_length
+
+    if (
+        not isinstance(jsep, dict)
+        or not isinstance(jsep.get("sdp"), str)
+        or sdp_max_length < 0
+        or len(jsep["sdp"]) <= sdp_max_length
+        or random.random() < trace_config.sdp_sample_rate
+    ):
+        return str(message)
+
+    sdp = jsep["sdp"]
+    sdp = f"{sdp[:sdp_max_length]}...({len(sdp)} chars)"
+    return str({**message, "jsep": {**jsep, "sdp": sdp}})
+
+
+class MessageTrace:
+    """Format message only when the log record is emitted
+
+    Use it as a logging argument: ``logger.info("Event: %s", MessageTrace(msg))``
+    """
+
+    __slots__ = ("message",)
+
+    def __init__(self, message: Dict) -> None:
+        self.message = message
+
+    def __str__(self) -> str:
+        return format_message(self.message)
+
+
+def trace_message(direction: str, message: Dict) -> None:
+    """Log a message sent or received. Costs nothing if trace is disabled."""
+    if not trace_logger.isEnabledFor(logging.DEBUG):
+        return
+
+    trace_logger.debug(
+        "%s: %s",
+        direction,
+        MessageTrace(message),
+        extra={
+            "janus": message.get("janus"),
+            "transaction": message.get("transaction"),
+            "session_id": message.get("session_id"),
+            "handle_id": message.get("handle_id"),
+        },
+    )
@@ -1,12 +1,21 @@
 from abc import ABC, abstractmethod
 import asyncio
-from typing import TYPE_CHECKING, List, Dict
+import heapq
+from typing import TYPE_CHECKING, Collection, List, Dict, Tuple, Union
 import logging
 
-# import uuid
-import json
-
-from .message_transaction import MessageTransaction
+from .message_transaction import (
+    MessageTransaction,
+    TransactionAborted,
+    TransportDisconnected,
+    SessionDestroyed,
+)
+from .codec import JanusCodec, get_codec
+from .trace import MessageTrace, trace_message
+from .keepalive import KeepaliveScheduler
+from .scheduler import OutboundScheduler, SendPriority, message_priority
+from .latency import LatencyTracker, request_type
+from .circuit_breaker import CircuitBreaker, CircuitState
 
 if TYPE_CHECKING:
     from .session import JanusSession
@@ -30,10 +39,35 @@ class JanusTransport(ABC):
     __connect_lock: asyncio.Lock
     connected: bool
     """Must set this property when connected or disconnected"""
+    codec: JanusCodec
+    """Serialize and deserialize messages. Use this when receiving messages."""
+    idle_linger: float
+    """Seconds to stay connected after the last session is destroyed"""
+    pooled: bool
+    """Set by JanusTransportPool. Pooled transports are disconnected by the
+    pool when no one holds them, not when their last session is destroyed."""
+    __idle_disconnect_task: asyncio.Task
+    __keepalive: KeepaliveScheduler
+    transaction_ttl: float
+    """Seconds until an unfinished transaction is reaped"""
+    transaction_max_messages: int
+    __transaction_reaper_task: asyncio.Task
+    __transaction_reaper_wakeup: asyncio.Future
+    __transaction_deadlines: List[Tuple[float, str]]
+    """Heap of (deadline, transaction ID). May hold finished transactions."""
+    __outbound_scheduler: OutboundScheduler
+    latency: LatencyTracker
+    """Response times of requests. Gives the timeout of new transactions."""
+    circuit_breaker: CircuitBreaker
+    """Fails requests fast when the server is failing. None if disabled."""
 
     @abstractmethod
-    async def _send(self, message: Dict) -> None:
-        """Really sends the message. Doesn't return a response"""
+    async def _send(self, message: Dict, message_raw: str) -> None:
+        """Really sends the message. Doesn't return a response
+
+        :param message: Message to send
+        :param message_raw: The same message, already serialized by codec
+        """
         pass
 
     @abstractmethod
@@ -46,19 +80,23 @@ class JanusTransport(ABC):
 
     async def info(self) -> Dict:
         """Get info of Janus server. Will be overridden for HTTP."""
-        message_transaction = await self.send({"janus": "info"})
-        response = await message_transaction.get()
-        await message_transaction.done()
-        return response
+        async with await self.send({"janus": "info"}) as message_transaction:
+            return await message_transaction.get()
 
-    async def ping(self) -> Dict:
-        message_transaction = await self.send(
+    async def ping(self, timeout: float = None) -> Dict:
+        """Ping server
+
+        :param timeout: (optional) Seconds to wait for pong. Derived from
+            observed response times if not given.
+        """
+        async with await self.send(
             {"janus": "ping"},
             # response_handler=lambda res: res if res["janus"] == "pong" else None,
-        )
-        response = await message_transaction.get(matcher={"janus": "pong"}, timeout=15)
-        await message_transaction.done()
-        return response
+        ) as message_transaction:
+            return await message_transaction.get(
+                matcher={"janus": "pong"},
+                timeout=timeout if timeout is not None else message_transaction.timeout,
+            )
 
     async def dispatch_session_created(self, session_id: int) -> None:
         """Override this method to get session created event"""
@@ -69,13 +107,72 @@ class JanusTransport(ABC):
         pass
 
     def __init__(
-        self, base_url: str, api_secret: str = None, token: str = None, **kwargs: dict
+        self,
+        base_url: str,
+        api_secret: str = None,
+        token: str = None,
+        codec: Union[str, JanusCodec] = None,
+        idle_linger: float = 0,
+        keepalive_interval: float = 30,
+        keepalive_jitter: float = 0.2,
+        transaction_ttl: float = 120,
+        transaction_max_messages: int = 100,
+        rate_limit: float = None,
+        rate_limit_burst: float = None,
+        timeout_factor: float = 3.0,
+        timeout_floor: float = 0.2,
+        timeout_ceiling: float = 15.0,
+        timeout_percentile: float = 0.99,
+        circuit_breaker: bool = False,
+        circuit_failure_rate: float = 0.5,
+        circuit_min_requests: int = 20,
+        circuit_window: float = 30,
+        circuit_open_duration: float = 5,
+        **kwargs: dict,
     ):
         """Create connection instance
 
         :param base_url: Janus server address
         :param api_secret: (optional) API key for shared static secret authentication
         :param token: (optional) Token for shared token based authentication
+        :param codec: (optional) JSON codec name or instance. Defaults to the
+            fastest one installed (orjson, ujson, then json).
+        :param idle_linger: (optional) Seconds to stay connected after the last
+            session is destroyed, so a new session can reuse the connection.
+            Defaults to 0, disconnect immediately.
+        :param keepalive_interval: (optional) Seconds between keepalives of idle
+            sessions. Sessions sending other requests don't send keepalive.
+            Receiving events doesn't count, since it doesn't keep the session
+            alive in Janus. 0 to never send keepalive.
+        :param keepalive_jitter: (optional) Randomize keepalive interval by this
+            fraction to spread out keepalives of many sessions.
+        :param transaction_ttl: (optional) Seconds until an unfinished transaction
+            is reaped. Pending :meth:`MessageTransaction.get` calls will raise
+            asyncio.TimeoutError. None to never reap.
+        :param transaction_max_messages: (optional) Max number of messages saved
+            in each transaction.
+        :param rate_limit: (optional) Max messages per second sent to the server.
+            When exceeded, messages wait and are sent in priority order. Not
+            limited if None.
+        :param rate_limit_burst: (optional) Messages that can be sent at once
+            after being idle. Defaults to rate_limit.
+        :param timeout_factor: (optional) Request timeouts are the
+            timeout_percentile of observed response times of the same request
+            type, multiplied by this.
+        :param timeout_floor: (optional) Min request timeout in seconds.
+        :param timeout_ceiling: (optional) Max request timeout in seconds. Also
+            used until enough response times are observed.
+        :param timeout_percentile: (optional) Percentile of response times, 0 to 1.
+        :param circuit_breaker: (optional) Fail requests immediately with
+            CircuitOpen when too many requests fail. Defaults to False.
+        :param circuit_failure_rate: (optional) Fraction of requests in the window
+            that fail (send failed or timed out) to open the circuit. Error
+            responses from Janus don't count as failures.
+        :param circuit_min_requests: (optional) Don't open the circuit with fewer
+            requests in the window.
+        :param circuit_window: (optional) Seconds of requests to consider.
+        :param circuit_open_duration: (optional) Seconds before probing the server
+            with ping.
         """
 
         self.__base_url = base_url.rstrip("/")
@@ -85,6 +182,45 @@ class JanusTransport(ABC):
         self.__sessions = dict()
         self.__connect_lock = asyncio.Lock()
         self.connected = False
+        self.codec = get_codec(codec)
+        self.idle_linger = idle_linger
+        self.pooled = False
+        self.__idle_disconnect_task = None
+        self.__keepalive = None
+        self.transaction_ttl = transaction_ttl
+        self.transaction_max_messages = transaction_max_messages
+        self.__transaction_reaper_task = None
+        self.__transaction_reaper_wakeup = None
+        self.__transaction_deadlines = []
+        self.latency = LatencyTracker(
+            factor=timeout_factor,
+            floor=timeout_floor,
+            ceiling=timeout_ceiling,
+            percentile=timeout_percentile,
+        )
+        self.circuit_breaker = None
+        if circuit_breaker:
+            self.circuit_breaker = CircuitBreaker(
+                probe=self.ping,
+                failure_rate=circuit_failure_rate,
+                min_requests=circuit_min_requests,
+                window=circuit_window,
+                open_duration=circuit_open_duration,
+                name=self.__base_url,
+            )
+        self.__outbound_scheduler = None
+        if rate_limit:
+            self.__outbound_scheduler = OutboundScheduler(
+                rate=rate_limit, burst=rate_limit_burst
+            )
+        if keepalive_interval:
+            self.__keepalive = KeepaliveScheduler(
+                send_keepalive=self.__send_keepalive,
+                interval=keepalive_interval,
+                jitter=keepalive_jitter,
+                # Short intervals need a finer timer wheel
+                resolution=min(1.0, keepalive_interval / 4),
+            )
 
     # def __del__(self):
     #     asyncio.run(asyncio.create_task(self.disconnect()))
@@ -93,6 +229,41 @@ class JanusTransport(ABC):
     def base_url(self) -> str:
         return self.__base_url
 
+    @property
+    def session_count(self) -> int:
+        """Number of sessions created through this transport"""
+        return len(self.__sessions)
+
+    @property
+    def circuit_state(self) -> CircuitState:
+        """State of the circuit breaker. Always CLOSED if disabled."""
+        if self.circuit_breaker is None:
+            return CircuitState.CLOSED
+        return self.circuit_breaker.state
+
+    @property
+    def outbound_stats(self) -> Dict:
+        """Queue depth and wait times of rate limited messages
+
+        Empty if there is no rate limit. See :meth:`OutboundScheduler.stats`.
+        """
+        if self.__outbound_scheduler is None:
+            return dict()
+        return self.__outbound_scheduler.stats()
+
+    @property
+    def transaction_count(self) -> int:
+        """Number of transactions in flight"""
+        return len(self.__message_transaction)
+
+    @property
+    def idle_disconnect_pending(self) -> bool:
+        """True if waiting for idle_linger before disconnecting"""
+        return (
+            self.__idle_disconnect_task is not None
+            and not self.__idle_disconnect_task.done()
+        )
+
     # async def put_response(self, transaction_id: int, response: dict) -> None:
     #     logger.info(f"Received: {response}")
     #     await self.__transactions[transaction_id].put(response)
@@ -105,14 +276,35 @@ class JanusTransport(ABC):
 
                 self.connected = True
 
+        # Resume keepalives of sessions that outlived a disconnection
+        if self.__keepalive is not None:
+            self.__keepalive.start()
+
     async def disconnect(self) -> None:
         """Release resources"""
+        self.__cancel_idle_disconnect()
+
         async with self.__connect_lock:
             if self.connected:
                 await self._disconnect()
 
                 self.connected = False
 
+        if self.__keepalive is not None:
+            self.__keepalive.stop()
+
+        exception = TransportDisconnected(f"Disconnected: {self.base_url}")
+        if self.__outbound_scheduler is not None:
+            self.__outbound_scheduler.close(exception)
+        self.abort_transactions(exception)
+
+    def connection_lost(self) -> None:
+        """Called by implementations when the connection is lost and won't be
+        reestablished. Marks the transport disconnected and stops keepalives."""
+        self.connected = False
+        if self.__keepalive is not None:
+            self.__keepalive.stop()
+
     def __sanitize_message(self, message: Dict) -> None:
         if "janus" not in message:
             raise Exception('Must set "janus" field')
@@ -128,10 +320,15 @@ class JanusTransport(ABC):
         message: Dict,
         session_id: int = None,
         handle_id: int = None,
+        priority: SendPriority = None,
     ) -> MessageTransaction:
         """Send message to server
 
         :param message: JSON serializable dictionary to send
+        :param priority: (optional) Priority when rate limited. Guessed from the
+            message if not given.
+        :raises CircuitOpen: The server is failing. Ping is always sent, to
+            allow checking the server.
 
         :returns: Synchronous response from Janus server
 
@@ -139,16 +336,42 @@ class JanusTransport(ABC):
 
         self.__sanitize_message(message=message)
 
+        if self.circuit_breaker and message["janus"] != "ping":
+            await self.circuit_breaker.check()
+
         # Create transaction
-        message_transaction = MessageTransaction()
+        message_type = request_type(message)
+        message_transaction = MessageTransaction(
+            max_messages=self.transaction_max_messages,
+            ttl=self.transaction_ttl,
+            session_id=session_id,
+            timeout=self.latency.timeout(message_type),
+        )
+
+        def message_transaction_on_response(response: Dict, response_time: float):
+            self.latency.record(message_type, response_time)
+            # Error responses are about the request, the server still works
+            if self.circuit_breaker:
+                self.circuit_breaker.record(success=True)
+
+        def message_transaction_on_timeout():
+            if self.circuit_breaker:
+                self.circuit_breaker.record(success=False)
+
+        message_transaction.on_response = message_transaction_on_response
+        message_transaction.on_timeout = message_transaction_on_timeout
         self.__message_transaction[message_transaction.id] = message_transaction
         message["transaction"] = message_transaction.id
 
         # Delete itself if done is called
         async def message_transaction_on_done():
-            del self.__message_transaction[message_transaction.id]
+            self.__message_transaction.pop(message_transaction.id, None)
+            if not self.__message_transaction:
+                self.__stop_transaction_reaper()
 
         message_transaction.on_done = message_transaction_on_done
+        if message_transaction.deadline is not None:
+            self.__schedule_reap(message_transaction)
 
         # Authentication
         if self.__api_secret is not None:
@@ -159,18 +382,131 @@ class JanusTransport(ABC):
         # IDs
         if session_id is not None:
             message["session_id"] = session_id
+            if self.__keepalive is not None:
+                self.__keepalive.touch(session_id)
         if handle_id is not None:
             message["handle_id"] = handle_id
 
-        # Send the message
-        message_json = json.dumps(message)
-        logger.info(f"Send: {message_json}")
-        await self._send(message=message)
+        # Send the message. Only serialize it once.
+        try:
+            if self.__outbound_scheduler:
+                await self.__outbound_scheduler.acquire(
+                    message_priority(message) if priority is None else priority
+                )
+
+            message_raw = self.codec.dumps(message)
+            trace_message("Send", message)
+            message_transaction.mark_sent()
+            try:
+                await self._send(message=message, message_raw=message_raw)
+            except Exception:
+                if self.circuit_breaker:
+                    self.circuit_breaker.record(success=False)
+                raise
+        except (Exception, asyncio.CancelledError):
+            # Not on GeneratorExit, the coroutine may be closed without a
+            # running loop. The reaper finishes the transaction then.
+            await message_transaction.done()
+            raise
 
         return message_transaction
 
+    def abort_transactions(
+        self,
+        exception: TransactionAborted,
+        session_id: int = None,
+        transaction_ids: Collection[str] = None,
+    ) -> None:
+        """Fail pending transactions now instead of waiting for their timeout
+
+        Pending and future :meth:`MessageTransaction.get` calls will raise
+        the exception.
+
+        :param exception: Exception to raise in waiters
+        :param session_id: (optional) Only abort transactions of this session.
+        :param transaction_ids: (optional) Only abort transactions with these IDs.
+            If neither session_id nor transaction_ids is given, abort all
+            transactions.
+        """
+        abort_all = session_id is None and transaction_ids is None
+        for message_transaction in list(self.__message_transaction.values()):
+            if not (
+                abort_all
+                or (
+                    session_id is not None
+                    and message_transaction.session_id == session_id
+                )
+                or (
+                    transaction_ids is not None
+                    and message_transaction.id in transaction_ids
+                )
+            ):
+                continue
+
+            message_transaction.fail(exception)
+            del self.__message_transaction[message_transaction.id]
+
+        if not self.__message_transaction:
+            self.__stop_transaction_reaper()
+
+    def __schedule_reap(self, message_transaction: MessageTransaction) -> None:
+        deadlines = self.__transaction_deadlines
+        heapq.heappush(deadlines, (message_transaction.deadline, message_transaction.id))
+
+        if self.__transaction_reaper_task is None:
+            self.__transaction_reaper_task = asyncio.create_task(
+                self.__reap_transactions()
+            )
+        elif deadlines[0][1] == message_transaction.id:
+            # Expires before the one the reaper is waiting for
+            wakeup = self.__transaction_reaper_wakeup
+            if wakeup is not None and not wakeup.done():
+                wakeup.set_result(None)
+
+    def __stop_transaction_reaper(self) -> None:
+        self.__transaction_deadlines.clear()
+        task = self.__transaction_reaper_task
+        if task is not None and task is not asyncio.current_task():
+            task.cancel()
+            self.__transaction_reaper_task = None
+
+    async def __reap_transactions(self) -> None:
+        """Finish transactions that are past their deadline
+
+        Sleep until the earliest deadline, or until a transaction with an
+        earlier one is sent, then reap every transaction whose deadline
+        passed. Transactions finished meanwhile are skipped.
+        """
+        loop = asyncio.get_running_loop()
+        deadlines = self.__transaction_deadlines
+        try:
+            while deadlines:
+                deadline, transaction_id = deadlines[0]
+                if deadline > loop.time():
+                    self.__transaction_reaper_wakeup = loop.create_future()
+                    await asyncio.wait(
+                        [self.__transaction_reaper_wakeup],
+                        timeout=deadline - loop.time(),
+                    )
+                    continue
+
+                heapq.heappop(deadlines)
+                message_transaction = self.__message_transaction.get(transaction_id)
+                if message_transaction is None:
+                    continue
+
+                logger.warning(f"Transaction expired: {transaction_id}")
+                message_transaction.fail(
+                    asyncio.TimeoutError(f"Transaction expired: {transaction_id}")
+                )
+                await message_transaction.done()
+        finally:
+            self.__transaction_reaper_wakeup = None
+            if self.__transaction_reaper_task is asyncio.current_task():
+                self.__transaction_reaper_task = None
+
     async def receive(self, response: dict) -> None:
-        logger.info(f"Received: {response}")
+        trace_message("Received", response)
         # First try transaction handlers
         if "transaction" in response:
             transaction_id = response["transaction"]
@@ -182,24 +518,34 @@ class JanusTransport(ABC):
         # If the response was not "eaten" by the transaction, then dispatch it
         if "session_id" in response:
             session_id = response["session_id"]
+            # Events don't reset Janus' session timeout, so don't touch
+            # keepalive here. Only requests sent by us do.
+            if response.get("janus") == "timeout":
+                # Janus destroyed the session, no more responses will come
+                self.abort_transactions(
+                    SessionDestroyed(session_id), session_id=session_id
+                )
             # This is response for session or plugin handle
             if session_id in self.__sessions:
                 await self.__sessions[session_id].on_receive(response)
             else:
                 logger.warning(
-                    f"Got response for session but session not found."
-                    f"Session ID: {session_id} Unhandeled response: {response}"
+                    "Got response for session but session not found. "
+                    "Session ID: %s Unhandeled response: %s",
+                    session_id,
+                    MessageTrace(response),
                 )
         else:
             # No handler found for response
-            logger.info(f"Response dropped: {response}")
+            logger.info("Response dropped: %s", MessageTrace(response))
 
     async def create_session(self, session: "JanusSession") -> int:
         """Create Janus Session"""
 
-        message_transaction = await self.send({"janus": "create"})
-        response = await message_transaction.get()
-        await message_transaction.done()
+        self.__cancel_idle_disconnect()
+
+        async with await self.send({"janus": "create"}) as message_transaction:
+            response = await message_transaction.get()
 
         if "janus" in response and response["janus"] != "success":
             raise Exception(
@@ -211,6 +557,8 @@ class JanusTransport(ABC):
 
         # Register session
         self.__sessions[session_id] = session
+        if self.__keepalive is not None:
+            self.__keepalive.add(session_id)
 
         await self.dispatch_session_created(session_id=session_id)
 
@@ -222,13 +570,80 @@ class JanusTransport(ABC):
             del self.__sessions[session_id]
         else:
             logger.warning(f"Session ID not found: {session_id}")
+        if self.__keepalive is not None:
+            self.__keepalive.remove(session_id)
+
+        self.abort_transactions(SessionDestroyed(session_id), session_id=session_id)
 
         await self.dispatch_session_destroyed(session_id=session_id)
 
-        # Also release transport resources if this is the last session
+        # Also release transport resources if this is the last session.
+        # Other holders of a pooled transport may be creating sessions.
+        if len(self.__sessions) == 0 and not self.pooled:
+            if self.idle_linger > 0:
+                self.__cancel_idle_disconnect()
+                self.__idle_disconnect_task = asyncio.create_task(
+                    self.__idle_disconnect()
+                )
+            else:
+                await self.disconnect()
+
+    async def claim_sessions(self, session_ids: Collection[int] = None) -> None:
+        """Claim sessions of this transport on the current connection
+
+        Janus keeps a session alive for a while after its connection is lost.
+        Claiming it from a new connection makes Janus send its events there,
+        so plugin handles and their media survive the reconnection.
+
+        :param session_ids: (optional) Sessions to claim. All sessions if not given.
+        """
+        if session_ids is None:
+            session_ids = list(self.__sessions)
+
+        async def claim(session_id: int) -> None:
+            try:
+                async with await self.send(
+                    {"janus": "claim"}, session_id=session_id
+                ) as message_transaction:
+                    response = await message_transaction.get(
+                        matcher=lambda res: res["janus"] in ["success", "error"],
+                        timeout=message_transaction.timeout,
+                    )
+            except Exception as exception:
+                logger.warning(f"Fail to claim session ({session_id}): {exception}")
+                return
+
+            if response["janus"] == "success":
+                logger.info(f"Session claimed ({session_id})")
+            else:
+                logger.warning(
+                    f"Fail to claim session ({session_id}): {response.get('error')}"
+                )
+
+        await asyncio.gather(*[claim(session_id) for session_id in session_ids])
+
+    async def __send_keepalive(self, session_id: int) -> None:
+        # Reference: https://janus.conf.meetecho.com/docs/rest.html
+        # A Janus session is kept alive as long as there's no inactivity for 60 seconds
+        message_transaction = await self.send(
+            {"janus": "keepalive"}, session_id=session_id
+        )
+        await message_transaction.done()
+
+    async def __idle_disconnect(self) -> None:
+        await asyncio.sleep(self.idle_linger)
+
+        # Don't get cancelled halfway through disconnecting
+        self.__idle_disconnect_task = None
+
         if len(self.__sessions) == 0:
             await self.disconnect()
 
+    def __cancel_idle_disconnect(self) -> None:
+        if self.__idle_disconnect_task is not None:
+            self.__idle_disconnect_task.cancel()
+            self.__idle_disconnect_task = None
+
     @staticmethod
     def register_transport(protocol_matcher, transport_cls: "JanusTransport") -> None:
         """
@@ -1,11 +1,13 @@
 import logging
 import asyncio
 from dataclasses import dataclass
-from typing import Dict
+import ssl
+from typing import Dict, Union
 
 import aiohttp
 
 from .transport import JanusTransport
+from .message_transaction import TransportDisconnected
 
 
 logger = logging.getLogger(__name__)
@@ -23,22 +25,106 @@ class JanusTransportHTTP(JanusTransport):
     __receive_response_task_map: Dict[int, ReceiverTask]
     __api_secret: str
     __token: str
+    __http_session: aiohttp.ClientSession
+    __disconnected: bool
+    __connector_config: Dict
+    long_poll_max_events: int
 
     def __init__(
-        self, base_url: str, api_secret: str = None, token: str = None, **kwargs: dict
+        self,
+        base_url: str,
+        api_secret: str = None,
+        token: str = None,
+        connection_limit: int = 0,
+        connection_limit_per_host: int = 0,
+        keepalive_timeout: float = 60,
+        dns_cache_ttl: Union[int, None] = 300,
+        ssl_context: Union[ssl.SSLContext, bool, None] = None,
+        long_poll_max_events: int = 10,
+        keepalive_interval: float = 0,
+        **kwargs: dict,
     ):
-        super().__init__(base_url=base_url, api_secret=api_secret, token=token)
+        """Create HTTP transport
+
+        All requests, including long polls, go through one pooled
+        aiohttp.ClientSession. Each session's long poll holds one connection.
+
+        :param connection_limit: (optional) Max number of connections. 0 for no limit.
+        :param connection_limit_per_host: (optional) Max number of connections to
+            the same host. 0 for no limit.
+        :param keepalive_timeout: (optional) Seconds to keep idle connections open
+            for reuse, avoiding new TCP/TLS handshakes.
+        :param dns_cache_ttl: (optional) Seconds to cache DNS results. None to
+            cache forever.
+        :param ssl_context: (optional) SSL context shared by all connections, or
+            False to skip certificate verification. Certificates are verified
+            with aiohttp's default context if not given.
+        :param long_poll_max_events: (optional) Max number of events Janus can
+            return in one long poll (maxev). 1 to get one event per request.
+        :param keepalive_interval: (optional) Long polls already keep sessions
+            alive, so keepalive is not sent by default.
+        """
+        super().__init__(
+            base_url=base_url,
+            api_secret=api_secret,
+            token=token,
+            keepalive_interval=keepalive_interval,
+            **kwargs,
+        )
 
         self.__receive_response_task_map = dict()
         # HTTP transport needs these for long polling
         self.__api_secret = api_secret
         self.__token = token
+        self.__http_session = None
+        self.__disconnected = False
+        self.long_poll_max_events = long_poll_max_events
+        self.__connector_config = dict(
+            limit=connection_limit,
+            limit_per_host=connection_limit_per_host,
+            keepalive_timeout=keepalive_timeout,
+            ttl_dns_cache=dns_cache_ttl,
+        )
+        if ssl_context is not None:
+            self.__connector_config["ssl"] = ssl_context
+
+    @property
+    def http_session(self) -> aiohttp.ClientSession:
+        """Pooled HTTP session. Created on first use.
+
+        :raises TransportDisconnected: Used after disconnect, until connected
+            again.
+        """
+        if self.__disconnected:
+            raise TransportDisconnected(f"Disconnected: {self.base_url}")
+        return self.__get_http_session()
+
+    def __get_http_session(self) -> aiohttp.ClientSession:
+        if self.__http_session is None or self.__http_session.closed:
+            self.__http_session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(**self.__connector_config)
+            )
+        return self.__http_session
 
     async def _connect(self):
-        pass
+        self.__disconnected = False
+        self.__get_http_session()
 
     async def _disconnect(self):
-        pass
+        self.__disconnected = True
+
+        # Stop long polls, or they keep polling with a new HTTP session
+        receiver_tasks = list(self.__receive_response_task_map.values())
+        self.__receive_response_task_map.clear()
+        for receiver_task in receiver_tasks:
+            receiver_task.destroyed_event.set()
+            receiver_task.task.cancel()
+        if receiver_tasks:
+            await asyncio.wait([receiver_task.task for receiver_task in receiver_tasks])
+
+        if self.__http_session is not None:
+            await self.__http_session.close()
+            self.__http_session = None
 
     def __build_url(self, session_id: int = None, handle_id: int = None) -> str:
         url = f"{self.base_url}"
@@ -52,39 +138,39 @@ class JanusTransportHTTP(JanusTransport):
         return url
 
     async def info(self) -> Dict:
-        async with aiohttp.ClientSession() as http_session:
-            async with http_session.get(f"{self.base_url}/info") as response:
-                return await response.json()
+        async with self.http_session.get(f"{self.base_url}/info") as response:
+            return await response.json(loads=self.codec.loads)
 
     async def _send(
         self,
         message: Dict,
+        message_raw: str,
     ) -> None:
         session_id = message.get("session_id")
         handle_id = message.get("handle_id")
 
-        async with aiohttp.ClientSession() as http_session:
-            async with http_session.post(
-                url=self.__build_url(session_id=session_id, handle_id=handle_id),
-                json=message,
-            ) as response:
-                response.raise_for_status()
+        async with self.http_session.post(
+            url=self.__build_url(session_id=session_id, handle_id=handle_id),
+            data=message_raw,
+            headers={"Content-Type": "application/json"},
+        ) as response:
+            response.raise_for_status()
 
-                response_dict = await response.json()
+            response_dict = await response.json(loads=self.codec.loads)
 
-                # if "error" in response_dict:
-                #     raise Exception(response_dict)
+        # if "error" in response_dict:
+        #     raise Exception(response_dict)
 
-                # # There must be a transaction ID
-                # response_transaction_id = response_dict["transaction"]
+        # # There must be a transaction ID
+        # response_transaction_id = response_dict["transaction"]
 
-                # Fake receive
-                # # We will immediately get a response in the HTTP response, so need
-                # # to put this into the queue
-                # await self.put_response(
-                #     transaction_id=response_transaction_id, response=response_dict
-                # )
-                await self.receive(response=response_dict)
+        # Fake receive
+        # # We will immediately get a response in the HTTP response, so need
+        # # to put this into the queue
+        # await self.put_response(
+        #     transaction_id=response_transaction_id, response=response_dict
+        # )
+        await self.receive(response=response_dict)
 
     def session_receive_response_done_cb(
         self, task: asyncio.Task, context=None
@@ -107,28 +193,34 @@ class JanusTransportHTTP(JanusTransport):
             url_params["apisecret"] = self.__api_secret
         if self.__token:
             url_params["token"] = self.__token
+        if self.long_poll_max_events > 1:
+            # Janus will return an array of events
+            url_params["maxev"] = self.long_poll_max_events
+
+        while not destroyed_event.is_set():
+            async with self.http_session.get(
+                url=self.__build_url(session_id=session_id),
+                params=url_params,
+            ) as response:
+                # Maybe session is destroyed during http request
+                if destroyed_event.is_set():
+                    break
 
-        async with aiohttp.ClientSession() as http_session:
-            while not destroyed_event.is_set():
-                async with http_session.get(
-                    url=self.__build_url(session_id=session_id),
-                    params=url_params,
-                ) as response:
-                    # Maybe session is destroyed during http request
-                    if destroyed_event.is_set():
-                        break
+                response.raise_for_status()
 
-                    response.raise_for_status()
+                response_json = await response.json(loads=self.codec.loads)
 
-                    response_dict = await response.json()
+            if isinstance(response_json, dict):
+                response_json = [response_json]
 
-                    if "error" in response_dict:
-                        raise Exception(response_dict)
+            for response_dict in response_json:
+                if "error" in response_dict:
+                    raise Exception(response_dict)
 
-                    if response_dict["janus"] == "keepalive":
-                        continue
+                if response_dict["janus"] == "keepalive":
+                    continue
 
-                    await self.receive(response=response_dict)
+                await self.receive(response=response_dict)
 
     async def dispatch_session_created(self, session_id: str) -> None:
         logger.info(f"Create session_receive_response task ({session_id})")
@@ -146,15 +238,17 @@ class JanusTransportHTTP(JanusTransport):
     async def dispatch_session_destroyed(self, session_id: int) -> None:
         if session_id not in self.__receive_response_task_map:
             logger.warn(f"Session receive response task not found for {session_id}")
+            return
 
         logger.info(f"Destroy session_receive_response task ({session_id})")
-        receiver_task = self.__receive_response_task_map[session_id]
-        # Don't use task.cancel() to avoid
-        # Exception ignored in: <function _ProactorBasePipeTransport.__del__ at 0x0000027A269465F0>
+        receiver_task = self.__receive_response_task_map.pop(session_id)
         receiver_task.destroyed_event.set()
 
-        # Destroying sessions could cost some time because it needs to
-        # wait for the long-poll request to complete
+        # Don't wait for the long-poll request to complete, it can take up to
+        # 30 seconds. Cancelling it makes aiohttp close its connection properly,
+        # and the pooled HTTP session is closed on disconnect, so there is no
+        # "Exception ignored in: <function _ProactorBasePipeTransport.__del__>"
+        receiver_task.task.cancel()
         await asyncio.wait([receiver_task.task])
 
 
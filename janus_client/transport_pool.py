@@ -0,0 +1,199 @@
+import asyncio
+from dataclasses import dataclass
+import logging
+from typing import Dict, Optional, Tuple
+import weakref
+
+from .transport import JanusTransport
+
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class PoolEntry:
+    transport: JanusTransport
+    ref_count: int = 0
+    linger_task: Optional[asyncio.Task] = None
+
+    @property
+    def lingering(self) -> bool:
+        return self.linger_task is not None and not self.linger_task.done()
+
+    def cancel_linger(self) -> None:
+        if self.linger_task is not None:
+            self.linger_task.cancel()
+            self.linger_task = None
+
+
+class JanusTransportPool:
+    """Share transports between sessions connecting to the same server
+
+    Transports are keyed by (base_url, api_secret, token, config) and
+    reference counted, so sessions asking for differently configured
+    transports don't share one. The pool disconnects a transport, not the
+    transport itself when its last session is destroyed, since other holders
+    may be creating sessions on it. When it's released by its last holder, it
+    stays connected for idle_linger seconds, so the next session doesn't need
+    to reconnect.
+
+    Transports are bound to an event loop, so each event loop has its own pool.
+    Call :meth:`close` before the event loop stops to disconnect lingering
+    transports.
+    """
+
+    idle_linger: float
+    __entries: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict]"
+
+    def __init__(self, idle_linger: float = 0) -> None:
+        """
+        :param idle_linger: (optional) Seconds to stay connected after a
+            transport is released by its last holder. Disconnect right away
+            if 0.
+        """
+        self.idle_linger = idle_linger
+        self.__entries = weakref.WeakKeyDictionary()
+
+    @staticmethod
+    def key(
+        base_url: str, api_secret: str = None, token: str = None, config: Dict = {}
+    ) -> Tuple:
+        return (
+            base_url.rstrip("/"),
+            api_secret,
+            token,
+            tuple(sorted((name, repr(value)) for name, value in config.items())),
+        )
+
+    def __loop_entries(self) -> Dict[Tuple, PoolEntry]:
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return None
+
+        if loop not in self.__entries:
+            self.__entries[loop] = dict()
+        return self.__entries[loop]
+
+    def acquire(
+        self,
+        base_url: str,
+        api_secret: str = None,
+        token: str = None,
+        config: Dict = {},
+    ) -> JanusTransport:
+        """Get a shared transport. Call :meth:`release` when done with it.
+
+        Parameters are the same as :meth:`JanusTransport.create_transport`.
+        """
+        entries = self.__loop_entries()
+        if entries is None:
+            # Can't tell which event loop the transport will be used in
+            logger.info("No running event loop. Creating a transport without pool.")
+            return JanusTransport.create_transport(
+                base_url=base_url, api_secret=api_secret, token=token, config=config
+            )
+
+        self.__sweep(entries)
+
+        key = self.key(base_url, api_secret, token, config)
+        entry = entries.get(key)
+        if entry is None:
+            transport = JanusTransport.create_transport(
+                base_url=base_url, api_secret=api_secret, token=token, config=config
+            )
+            transport.pooled = True
+            entry = PoolEntry(transport=transport)
+            entries[key] = entry
+
+        entry.cancel_linger()
+        entry.ref_count += 1
+        return entry.transport
+
+    async def release(self, transport: JanusTransport) -> None:
+        """Give back a transport from :meth:`acquire`
+
+        Disconnects it if it's not held anymore, after idle_linger seconds.
+        """
+        entry = self.__find(transport)
+        if entry is None:
+            # Created without pool, so nobody else holds it
+            await transport.disconnect()
+            return
+
+        if entry.ref_count <= 0:
+            logger.warning(f"Transport released too many times: {transport.base_url}")
+            return
+
+        entry.ref_count -= 1
+        if entry.ref_count > 0:
+            return
+
+        if self.idle_linger > 0:
+            entry.cancel_linger()
+            entry.linger_task = asyncio.create_task(self.__linger(entry))
+        else:
+            self.__remove(entry)
+            await transport.disconnect()
+
+    async def close(self) -> None:
+        """Disconnect all transports of the current event loop and forget them
+
+        Transports still held by sessions are disconnected too.
+        """
+        entries = self.__loop_entries()
+        if entries is None:
+            return
+
+        for entry in entries.values():
+            entry.cancel_linger()
+        transports = [entry.transport for entry in entries.values()]
+        entries.clear()
+        await asyncio.gather(*[transport.disconnect() for transport in transports])
+
+    def ref_count(self, transport: JanusTransport) -> int:
+        """Number of holders of a shared transport. 0 if not in pool."""
+        entry = self.__find(transport)
+        return entry.ref_count if entry else 0
+
+    def __find(self, transport: JanusTransport) -> PoolEntry:
+        entries = self.__loop_entries()
+        if entries is None:
+            return None
+
+        for entry in entries.values():
+            if entry.transport is transport:
+                return entry
+        return None
+
+    async def __linger(self, entry: PoolEntry) -> None:
+        await asyncio.sleep(self.idle_linger)
+
+        # Don't get cancelled halfway through disconnecting
+        entry.linger_task = None
+
+        if entry.ref_count == 0:
+            self.__remove(entry)
+            await entry.transport.disconnect()
+
+    def __remove(self, entry: PoolEntry) -> None:
+        entries = self.__loop_entries()
+        for key in [key for key, value in entries.items() if value is entry]:
+            del entries[key]
+
+    @staticmethod
+    def __sweep(entries: Dict[Tuple, PoolEntry]) -> None:
+        """Forget transports that nobody holds and are disconnected"""
+        for key in [
+            key
+            for key, entry in entries.items()
+            if entry.ref_count == 0
+            and not entry.transport.connected
+            and not entry.lingering
+        ]:
+            del entries[key]
+
+
+default_transport_pool = JanusTransportPool(idle_linger=10)
+"""Pool used by JanusSession with shared_transport. Transports stay connected
+for 10 seconds after their last session is destroyed."""
@@ -0,0 +1,162 @@
+import asyncio
+import logging
+import os
+import socket
+import tempfile
+import traceback
+import uuid
+
+from .transport import JanusTransport
+from .message_transaction import TransportDisconnected
+
+
+logger = logging.getLogger(__name__)
+
+
+class JanusTransportUnix(JanusTransport):
+    """Janus transport through Unix domain socket
+
+    For Janus running on the same host with the janus.transport.pfunix
+    plugin. Use ``unix:///path/to/janus.sock`` as base_url. Each message is
+    one packet, so there is no TCP, TLS or websocket framing.
+    """
+
+    path: str
+    socket_type: str
+    sock: socket.socket
+    receive_message_task: asyncio.Task
+    __buffer: bytearray
+    __local_path: str
+
+    def __init__(
+        self,
+        socket_type: str = "seqpacket",
+        max_message_size: int = 1 << 20,
+        **kwargs: dict,
+    ):
+        """
+        :param socket_type: (optional) "seqpacket" or "dgram". Must match the
+            type configured in janus.transport.pfunix.jcfg.
+        :param max_message_size: (optional) Max bytes of a received message.
+        """
+        super().__init__(**kwargs)
+
+        if socket_type not in ["seqpacket", "dgram"]:
+            raise Exception(f"Unsupported socket type: {socket_type}")
+
+        self.path = self.base_url[len("unix://") :]
+        self.socket_type = socket_type
+        self.sock = None
+        self.receive_message_task = None
+        self.__buffer = bytearray(max_message_size)
+        self.__local_path = None
+
+    async def _connect(self) -> None:
+        logger.info(f"Connecting to: {self.base_url}")
+
+        if self.socket_type == "seqpacket":
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_SEQPACKET)
+        else:
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+            # Janus replies to the address of the sender
+            self.__local_path = os.path.join(
+                tempfile.gettempdir(), f"janus-client-{uuid.uuid4().hex}.sock"
+            )
+            sock.bind(self.__local_path)
+        sock.setblocking(False)
+
+        try:
+            await asyncio.get_running_loop().sock_connect(sock, self.path)
+        except BaseException:
+            sock.close()
+            self.__remove_local_path()
+            raise
+
+        self.sock = sock
+        self.receive_message_task = asyncio.create_task(self.receive_message())
+        self.receive_message_task.add_done_callback(self.receive_message_done_cb)
+
+        self.connected = True
+        logger.info("Connected")
+
+    async def _disconnect(self) -> None:
+        logger.info("Disconnecting")
+        if self.receive_message_task:
+            self.receive_message_task.cancel()
+            await asyncio.wait([self.receive_message_task])
+        self.__close_socket()
+        self.connected = False
+        logger.info("Disconnected")
+
+    def __close_socket(self) -> None:
+        if self.sock:
+            self.sock.close()
+            self.sock = None
+        self.__remove_local_path()
+
+    def __remove_local_path(self) -> None:
+        if self.__local_path:
+            try:
+                os.unlink(self.__local_path)
+            except FileNotFoundError:
+                pass
+            self.__local_path = None
+
+    def receive_message_done_cb(self, task: asyncio.Task, context=None) -> None:
+        if not task.cancelled() and task.exception():
+            exception = task.exception()
+            logger.error(
+                "".join(
+                    traceback.format_exception(
+                        type(exception),
+                        value=exception,
+                        tb=exception.__traceback__,
+                    )
+                )
+            )
+
+        if not task.cancelled():
+            # Connection closed by Janus
+            self.__close_socket()
+            self.connection_lost()
+
+        # Nothing will answer pending transactions anymore
+        self.abort_transactions(
+            TransportDisconnected(f"Connection lost: {self.base_url}")
+        )
+
+    async def receive_message(self) -> None:
+        loop = asyncio.get_running_loop()
+        buffer = memoryview(self.__buffer)
+
+        while True:
+            size = await loop.sock_recv_into(self.sock, buffer)
+            if size == 0 and self.socket_type == "seqpacket":
+                logger.info("Connection closed by server")
+                return
+
+            if size == len(buffer):
+                logger.warning("Message may be truncated. Increase max_message_size.")
+
+            response = self.codec.loads(bytes(buffer[:size]))
+
+            await self.receive(response)
+
+    async def _send(
+        self,
+        message: dict,
+        message_raw: str,
+    ) -> None:
+        if not self.connected or not self.sock:
+            raise Exception("Must connect before any communication.")
+
+        await asyncio.get_running_loop().sock_sendall(self.sock, message_raw.encode())
+
+
+def protocol_matcher(base_url: str):
+    return base_url.startswith("unix://")
+
+
+JanusTransport.register_transport(
+    protocol_matcher=protocol_matcher, transport_cls=JanusTransportUnix
+)
@@ -1,73 +1,89 @@
 import logging
-from typing import Any
+from typing import Any, Dict, List, Optional, Set, Union
 import asyncio
-import json
+import random
 import traceback
 
 import websockets
+from websockets.extensions.permessage_deflate import ClientPerMessageDeflateFactory
 
 from .transport import JanusTransport
-
+from .message_transaction import TransportDisconnected
 
 logger = logging.getLogger(__name__)
 
 
-class JanusTransportWebsocket(JanusTransport):
-    """Janus transport through HTTP
+class WebsocketConnection:
+    """One websocket connection of JanusTransportWebsocket
 
-    Manage Sessions and Transactions
+    Receives messages in its own task and reconnects by itself when the
+    connection is lost, claiming the sessions pinned to it.
     """
 
+    index: int
     ws: websockets.WebSocketClientProtocol
-    subprotocol: str
-    connected: bool
     receiving_message: bool
     receive_message_task: asyncio.Task
     receive_message_task_started: asyncio.Event
+    session_ids: Set[int]
+    """Sessions pinned to this connection"""
+    pending_transactions: Dict[str, str]
+    """Transaction ID to "janus" type of requests without session, waiting for
+    a response on this connection"""
+    closed: bool
+    """True if the connection is lost and won't be reconnected"""
+    __transport: "JanusTransportWebsocket"
+    __reconnect_task: asyncio.Task
 
-    def __init__(self, **kwargs: dict):
-        super().__init__(**kwargs)
-
-        self.connected = False
+    def __init__(self, transport: "JanusTransportWebsocket", index: int = 0) -> None:
+        self.index = index
+        self.ws = None
         self.receiving_message = False
         self.receive_message_task = None
         self.receive_message_task_started = asyncio.Event()
+        self.session_ids = set()
+        self.pending_transactions = dict()
+        self.closed = True
+        self.__transport = transport
+        self.__reconnect_task = None
 
-        if "subprotocol" in kwargs:
-            self.subprotocol = kwargs["subprotocol"]
-        else:
-            self.subprotocol = "janus-protocol"
-
-    async def _connect(self, **kwargs: Any) -> None:
-        """Connect to server
+    @property
+    def reconnecting(self) -> bool:
+        return self.__reconnect_task is not None
 
-        All extra keyword arguments will be passed to websockets.connect
-        """
+    @property
+    def load(self) -> int:
+        return len(self.session_ids) + len(self.pending_transactions)
 
-        logger.info(f"Connecting to: {self.base_url}")
+    async def open(self) -> None:
+        transport = self.__transport
+        logger.info(f"Connecting to: {transport.base_url} ({self.index})")
 
         self.ws = await websockets.connect(
-            self.base_url,
-            subprotocols=[websockets.Subprotocol(self.subprotocol)],
-            **kwargs,
+            transport.base_url,
+            subprotocols=[websockets.Subprotocol(transport.subprotocol)],
+            **transport.connect_kwargs,
         )
+        self.receive_message_task_started.clear()
         self.receive_message_task = asyncio.create_task(self.receive_message())
         self.receive_message_task.add_done_callback(self.receive_message_done_cb)
         await self.receive_message_task_started.wait()
+        self.closed = False
 
-        self.connected = True
-        logger.info("Connected")
-
-    async def _disconnect(self) -> None:
-        logger.info("Disconnecting")
-        self.receive_message_task.cancel()
-        await asyncio.wait([self.receive_message_task])
-        await self.ws.close()
-        self.connected = False
-        logger.info("Disconnected")
+    async def close(self) -> None:
+        self.closed = True
+        if self.__reconnect_task:
+            self.__reconnect_task.cancel()
+            self.__reconnect_task = None
+        if self.receive_message_task:
+            self.receive_message_task.cancel()
+            await asyncio.wait([self.receive_message_task])
+        if self.ws:
+            await self.ws.close()
 
     def receive_message_done_cb(self, task: asyncio.Task, context=None) -> None:
         self.receiving_message = False
+        connection_lost = True
         try:
             # Check if any exceptions are raised
             # If it's CancelledError or InvalidStateError exception then they will be raised
@@ -85,10 +101,70 @@ class JanusTransportWebsocket(JanusTransport):
                 )
         except asyncio.CancelledError:
             logger.info("Receive message task ended")
+            connection_lost = False
         except asyncio.InvalidStateError:
             logger.info("receive_message_done_cb called with invalid state")
 
-        self.connected = False
+        # Nothing will answer pending transactions anymore
+        self.abort_transactions()
+
+        transport = self.__transport
+        if (
+            connection_lost
+            and not self.closed
+            and transport.reconnect
+            and self.__reconnect_task is None
+        ):
+            self.__reconnect_task = asyncio.create_task(self.__reconnect())
+            return
+
+        if self.__reconnect_task is None:
+            self.closed = True
+            transport.connection_closed(self)
+
+    def abort_transactions(self) -> None:
+        exception = TransportDisconnected(
+            f"Connection lost: {self.__transport.base_url} ({self.index})"
+        )
+        for session_id in self.session_ids:
+            self.__transport.abort_transactions(exception, session_id=session_id)
+        self.__transport.abort_transactions(
+            exception, transaction_ids=list(self.pending_transactions)
+        )
+        self.pending_transactions.clear()
+
+    async def __reconnect(self) -> None:
+        """Reconnect with exponential backoff, then claim the sessions"""
+        transport = self.__transport
+        backoff = transport.reconnect_backoff_initial
+        attempt = 0
+
+        try:
+            while (
+                transport.reconnect_max_attempts is None
+                or attempt < transport.reconnect_max_attempts
+            ):
+                attempt += 1
+                await asyncio.sleep(random.uniform(0, backoff))
+                backoff = min(backoff * 2, transport.reconnect_backoff_max)
+
+                try:
+                    await self.open()
+                except Exception as exception:
+                    logger.warning(f"Reconnect attempt {attempt} failed: {exception}")
+                    continue
+
+                logger.info(f"Reconnected after {attempt} attempt(s)")
+                await transport.claim_sessions(session_ids=list(self.session_ids))
+                if self.receiving_message:
+                    return
+
+            logger.error(f"Fail to reconnect after {attempt} attempts. Give up.")
+            self.closed = True
+            transport.connection_closed(self)
+        finally:
+            if self.__reconnect_task is asyncio.current_task():
+                self.__reconnect_task = None
 
     async def receive_message(self) -> None:
         self.receiving_message = True
@@ -98,21 +174,212 @@ class JanusTransportWebsocket(JanusTransport):
             raise Exception("Not connected to server.")
 
         async for message_raw in self.ws:
-            response = json.loads(message_raw)
+            response = self.__transport.codec.loads(message_raw)
+
+            transaction_id = response.get("transaction")
+            if transaction_id in self.pending_transactions:
+                janus = self.pending_transactions.pop(transaction_id)
+                if janus == "create" and response.get("janus") == "success":
+                    # Janus sends events of a session through the connection
+                    # that created it
+                    self.__transport.pin_session(response["data"]["id"], self)
+
+            await self.__transport.receive(response)
+
+    async def send(self, message: dict, message_raw: str) -> None:
+        if not self.receiving_message and self.__reconnect_task is not None:
+            # Wait for the connection to come back
+            await asyncio.shield(self.__reconnect_task)
+
+        if self.closed:
+            raise Exception("Must connect before any communication.")
+
+        if not self.receiving_message:
+            raise Exception("Websocket not receiving message")
+
+        if "session_id" not in message:
+            self.pending_transactions[message["transaction"]] = message["janus"]
+
+        await self.ws.send(message_raw)
+
+
+class JanusTransportWebsocket(JanusTransport):
+    """Janus transport through HTTP
+
+    Manage Sessions and Transactions
+    """
+
+    subprotocol: str
+    connected: bool
+    connections: List[WebsocketConnection]
+    reconnect: bool
+    reconnect_max_attempts: int
+    reconnect_backoff_initial: float
+    reconnect_backoff_max: float
+    connect_kwargs: dict
+    """Keyword arguments passed to websockets.connect"""
+    __session_connection: Dict[int, WebsocketConnection]
+
+    def __init__(
+        self,
+        connection_count: int = 1,
+        reconnect: bool = True,
+        reconnect_max_attempts: int = 10,
+        reconnect_backoff_initial: float = 0.5,
+        reconnect_backoff_max: float = 30,
+        compression: Union[str, Dict, None] = "deflate",
+        max_size: Optional[int] = 1 << 20,
+        max_queue: Optional[int] = 32,
+        read_limit: int = 1 << 16,
+        write_limit: int = 1 << 16,
+        ping_interval: Optional[float] = 20,
+        ping_timeout: Optional[float] = 20,
+        open_timeout: Optional[float] = 10,
+        close_timeout: Optional[float] = None,
+        **kwargs: dict,
+    ):
+        """
+        :param connection_count: (optional) Number of websocket connections to
+            open to the server. Each session is pinned to the connection with
+            the least sessions when it's created, so signaling of busy sessions
+            doesn't hold up the others.
+        :param reconnect: (optional) Reconnect when the connection is lost and
+            claim all sessions on the new connection. Defaults to True.
+        :param reconnect_max_attempts: (optional) Give up reconnecting after this
+            many failed attempts. None to never give up.
+        :param reconnect_backoff_initial: (optional) Max seconds to wait before
+            the first attempt. Doubled after each failed attempt. The actual wait
+            is random up to this, so clients don't reconnect all at once.
+        :param reconnect_backoff_max: (optional) Upper limit of the backoff.
+        :param compression: (optional) "deflate" to negotiate permessage-deflate
+            with default settings, None to disable compression, or a dict of
+            ClientPerMessageDeflateFactory arguments to tune it, e.g.
+            ``{"client_max_window_bits": 11, "compress_settings": {"memLevel": 4}}``.
+            Compression pays off for SDP-heavy signaling over slow links. Disable
+            it on loopback or LAN to save CPU.
+        :param max_size: (optional) Max bytes of a received message. None for
+            no limit.
+        :param max_queue: (optional) Max number of received messages buffered
+            before reading from the socket is paused. None for no limit.
+        :param read_limit: (optional) High-water mark of the read buffer in bytes.
+        :param write_limit: (optional) High-water mark of the write buffer in
+            bytes. Sending waits for the buffer to drain below it.
+        :param ping_interval: (optional) Seconds between websocket pings. None to
+            disable pings.
+        :param ping_timeout: (optional) Close the connection if a ping isn't
+            answered in this many seconds. None to disable.
+        :param open_timeout: (optional) Seconds to wait for the opening handshake.
+        :param close_timeout: (optional) Seconds to wait for the closing handshake.
+        """
+        super().__init__(**kwargs)
+
+        self.connected = False
+        self.connections = [
+            WebsocketConnection(transport=self, index=index)
+            for index in range(max(1, connection_count))
+        ]
+        self.reconnect = reconnect
+        self.reconnect_max_attempts = reconnect_max_attempts
+        self.reconnect_backoff_initial = reconnect_backoff_initial
+        self.reconnect_backoff_max = reconnect_backoff_max
+        self.connect_kwargs = dict(
+            max_size=max_size,
+            max_queue=max_queue,
+            read_limit=read_limit,
+            write_limit=write_limit,
+            ping_interval=ping_interval,
+            ping_timeout=ping_timeout,
+            open_timeout=open_timeout,
+            close_timeout=close_timeout,
+        )
+        if isinstance(compression, dict):
+            self.connect_kwargs["compression"] = None
+            self.connect_kwargs["extensions"] = [
+                ClientPerMessageDeflateFactory(**compression)
+            ]
+        else:
+            self.connect_kwargs["compression"] = compression
+        self.__session_connection = dict()
+
+        if "subprotocol" in kwargs:
+            self.subprotocol = kwargs["subprotocol"]
+        else:
+            self.subprotocol = "janus-protocol"
+
+    @property
+    def reconnecting(self) -> bool:
+        return any(connection.reconnecting for connection in self.connections)
+
+    async def _connect(self, **kwargs: Any) -> None:
+        """Connect to server
+
+        All extra keyword arguments will be passed to websockets.connect,
+        overriding the options given when the transport was created.
+        """
+        self.connect_kwargs = {**self.connect_kwargs, **kwargs}
+
+        try:
+            await asyncio.gather(
+                *[connection.open() for connection in self.connections]
+            )
+        except BaseException:
+            await asyncio.gather(
+                *[connection.close() for connection in self.connections]
+            )
+            raise
+
+        self.connected = True
+        logger.info("Connected")
+
+    async def _disconnect(self) -> None:
+        logger.info("Disconnecting")
+        await asyncio.gather(*[connection.close() for connection in self.connections])
+        self.connected = False
+        logger.info("Disconnected")
+
+    def connection_closed(self, connection: WebsocketConnection) -> None:
+        """Called by a connection that is lost and won't reconnect"""
+        for session_id in connection.session_ids:
+            self.__session_connection.pop(session_id, None)
+        connection.session_ids.clear()
+
+        if all(connection.closed for connection in self.connections):
+            self.connection_lost()
+
+    def pin_session(self, session_id: int, connection: WebsocketConnection) -> None:
+        """Send all messages of the session through the connection"""
+        self.__session_connection[session_id] = connection
+        connection.session_ids.add(session_id)
+
+    def connection_of(self, message: dict) -> WebsocketConnection:
+        """Get the connection to send the message through
 
-            await self.receive(response)
+        Messages of a session go through the connection it's pinned to.
+        Others go through the least loaded connection.
+        """
+        connection = self.__session_connection.get(message.get("session_id"))
+        if connection is not None:
+            return connection
+
+        available = [
+            connection for connection in self.connections if not connection.closed
+        ] or self.connections
+        return min(available, key=lambda connection: connection.load)
+
+    async def dispatch_session_destroyed(self, session_id: int) -> None:
+        connection = self.__session_connection.pop(session_id, None)
+        if connection is not None:
+            connection.session_ids.discard(session_id)
 
     async def _send(
         self,
         message: dict,
+        message_raw: str,
     ) -> None:
         if not self.connected:
             raise Exception("Must connect before any communication.")
 
-        if not self.receiving_message:
-            raise Exception("Websocket not receiving message")
-
-        await self.ws.send(json.dumps(message))
+        await self.connection_of(message).send(message, message_raw)
 
 
 def protocol_matcher(base_url: str):
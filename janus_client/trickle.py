@@ -0,0 +1,117 @@
+import asyncio
+import logging
+import traceback
+from typing import Awaitable, Callable, Dict, List
+
+
+logger = logging.getLogger(__name__)
+
+END_OF_CANDIDATES = {"completed": True}
+"""Trickled candidate telling Janus there are no more candidates"""
+
+
+def sdp_candidates(sdp: str) -> List[Dict]:
+    """Candidates in an SDP, as trickle candidates of their m-line"""
+    candidates = []
+    index = -1
+    mid = None
+    for line in sdp.splitlines():
+        if line.startswith("m="):
+            index += 1
+            mid = None
+        elif line.startswith("a=mid:"):
+            mid = line[len("a=mid:") :]
+        elif line.startswith("a=candidate:") and index >= 0:
+            candidate = {"sdpMLineIndex": index, "candidate": line[len("a=") :]}
+            if mid is not None:
+                candidate["sdpMid"] = mid
+            candidates.append(candidate)
+    return candidates
+
+
+class TrickleBatcher:
+    """Coalesce ICE candidates into array trickle messages
+
+    Candidates added within window seconds of the first one are sent in one
+    ``{"janus": "trickle", "candidates": [...]}`` message. :meth:`end` sends
+    the remaining candidates together with the end-of-candidates marker.
+    """
+
+    window: float
+    sent_messages: int
+    """Number of trickle messages sent"""
+    __send: Callable[[Dict], Awaitable]
+    __pending: List[Dict]
+    __timer: asyncio.Task
+    __lock: asyncio.Lock
+
+    def __init__(self, send: Callable[[Dict], Awaitable], window: float = 0.05):
+        """
+        :param send: Coroutine function sending a trickle message to the handle
+        :param window: (optional) Seconds to wait for more candidates before
+            sending a batch.
+        """
+        self.window = window
+        self.sent_messages = 0
+        self.__send = send
+        self.__pending = []
+        self.__timer = None
+        self.__lock = asyncio.Lock()
+
+    def add(self, candidate: Dict) -> None:
+        """Queue a candidate, e.g. ``{"sdpMLineIndex": 0, "candidate": "..."}``"""
+        self.__pending.append(candidate)
+        if self.__timer is None:
+            self.__timer = asyncio.create_task(self.__flush_later())
+            self.__timer.add_done_callback(self.__flush_later_done_cb)
+
+    async def __flush_later(self) -> None:
+        await asyncio.sleep(self.window)
+        self.__timer = None
+        await self.flush()
+
+    @staticmethod
+    def __flush_later_done_cb(task: asyncio.Task) -> None:
+        # Nobody awaits the timer, so log why sending failed
+        if not task.cancelled() and task.exception():
+            exception = task.exception()
+            logger.error(
+                "".join(
+                    traceback.format_exception(
+                        type(exception),
+                        value=exception,
+                        tb=exception.__traceback__,
+                    )
+                )
+            )
+
+    async def end(self) -> None:
+        """Send queued candidates and end-of-candidates"""
+        self.__pending.append(END_OF_CANDIDATES)
+        await self.flush()
+
+    async def flush(self) -> None:
+        """Send queued candidates now"""
+        self.__cancel_timer()
+
+        async with self.__lock:
+            if not self.__pending:
+                return
+
+            candidates, self.__pending = self.__pending, []
+            if len(candidates) == 1:
+                message = {"janus": "trickle", "candidate": candidates[0]}
+            else:
+                message = {"janus": "trickle", "candidates": candidates}
+            self.sent_messages += 1
+            await self.__send(message)
+
+    def __cancel_timer(self) -> None:
+        if self.__timer is not None and self.__timer is not asyncio.current_task():
+            self.__timer.cancel()
+        self.__timer = None
+
+    def close(self) -> None:
+        """Drop queued candidates"""
+        self.__cancel_timer()
+        self.__pending.clear()
@@ -0,0 +1,77 @@
+"""Microbenchmark of compiled matchers against is_subset
+
+Run with: python -m test.benchmark_matcher
+"""
+
+import timeit
+
+from janus_client.message_transaction import (
+    is_subset,
+    compile_matcher,
+    any_matcher,
+    janus_error_matcher,
+    plugin_error_matcher,
+)
+
+plugin_name = "janus.plugin.videoroom"
+matcher = {
+    "janus": "event",
+    "plugindata": {
+        "plugin": plugin_name,
+        "data": {"videoroom": "joined", "room": 1234},
+    },
+}
+plugin_error = {
+    "plugin": plugin_name,
+    "data": {"videoroom": "event", "error_code": None, "error": None},
+}
+messages = [
+    {"janus": "ack", "transaction": "abc"},
+    {
+        "janus": "event",
+        "plugindata": {
+            "plugin": plugin_name,
+            "data": {"videoroom": "joined", "room": 1234, "id": 1, "publishers": []},
+        },
+    },
+]
+
+
+def is_subset_matcher(message: dict) -> bool:
+    return (
+        is_subset(message, matcher)
+        or is_subset(message, {"janus": "success", "plugindata": plugin_error})
+        or is_subset(message, {"janus": "event", "plugindata": plugin_error})
+        or is_subset(message, {"janus": "error", "error": {}})
+    )
+
+
+def compiled_matcher_factory():
+    return any_matcher(
+        compile_matcher(matcher),
+        plugin_error_matcher(plugin_name, "videoroom"),
+        janus_error_matcher,
+    )
+
+
+def main(number: int = 100000) -> None:
+    compiled = compiled_matcher_factory()
+
+    is_subset_seconds = timeit.timeit(
+        lambda: [is_subset_matcher(m) for m in messages], number=number
+    )
+    compiled_seconds = timeit.timeit(
+        lambda: [compiled(m) for m in messages], number=number
+    )
+    # send_wrapper compiles its matcher once per request (cache hit)
+    compile_seconds = timeit.timeit(compiled_matcher_factory, number=number)
+
+    per_message = number * len(messages) / 1e6
+    print(f"is_subset match: {is_subset_seconds / per_message:.2f} us per message")
+    print(f" compiled match: {compiled_seconds / per_message:.2f} us per message")
+    print(f"cached compile : {compile_seconds / number * 1e6:.2f} us per request")
+    print(f"match speedup  : {is_subset_seconds / compiled_seconds:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
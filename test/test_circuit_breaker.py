@@ -0,0 +1,166 @@
+import unittest
+import logging
+import asyncio
+from typing import Dict
+
+from janus_client import CircuitOpen, CircuitState
+from test.util import async_test, FakeJanusTransport
+
+format = "%(asctime)s: %(message)s"
+logging.basicConfig(format=format, level=logging.INFO, datefmt="%H:%M:%S")
+logger = logging.getLogger()
+
+
+class FailingFakeJanusTransport(FakeJanusTransport):
+    """Fail to send while failing is set, or answer with errors if erroring"""
+
+    failing = False
+    erroring = False
+
+    def respond(self, message: Dict) -> Dict:
+        response = super().respond(message)
+        if self.erroring:
+            response.update(janus="error", error={"code": 490, "reason": "Failing"})
+        return response
+
+    async def _send(self, message: Dict, message_raw: str) -> None:
+        if self.failing and message["janus"] != "ping":
+            raise ConnectionError("Failing")
+        await super()._send(message=message, message_raw=message_raw)
+
+
+class TestClass(unittest.TestCase):
+    @async_test
+    async def test_open_and_recover(self):
+        transport = FailingFakeJanusTransport(
+            base_url="fake://server",
+            circuit_breaker=True,
+            circuit_min_requests=4,
+            circuit_open_duration=0.05,
+        )
+        await transport.connect()
+
+        async def request():
+            async with await transport.send({"janus": "info"}) as message_transaction:
+                return await message_transaction.get(timeout=1)
+
+        await request()
+        transport.failing = True
+        for _ in range(3):
+            with self.assertRaises(ConnectionError):
+                await request()
+        self.assertEqual(transport.circuit_state, CircuitState.OPEN)
+
+        # Fail fast without sending
+        sent_count = len(transport.sent)
+        with self.assertRaises(CircuitOpen):
+            await request()
+        self.assertEqual(len(transport.sent), sent_count)
+
+        # Ping is still allowed
+        await transport.ping()
+
+        # Probe with ping after open duration
+        transport.failing = False
+        await asyncio.sleep(0.05)
+        await request()
+        self.assertEqual(transport.circuit_state, CircuitState.CLOSED)
+        self.assertEqual(transport.sent[-2]["janus"], "ping")
+
+        await transport.disconnect()
+
+    @async_test
+    async def test_probe_timeout(self):
+        transport = FakeJanusTransport(
+            base_url="fake://server",
+            circuit_breaker=True,
+            circuit_min_requests=2,
+            circuit_open_duration=0.01,
+            timeout_ceiling=0.05,
+        )
+        await transport.connect()
+
+        def respond(message: Dict) -> Dict:
+            return None
+
+        transport.respond = respond
+        for _ in range(2):
+            with self.assertRaises(asyncio.TimeoutError):
+                await transport.ping()
+        self.assertEqual(transport.circuit_state, CircuitState.OPEN)
+
+        await asyncio.sleep(0.01)
+        with self.assertRaises(CircuitOpen):
+            await transport.info()
+        self.assertEqual(transport.circuit_state, CircuitState.OPEN)
+        self.assertEqual(transport.circuit_breaker.stats()["failures"], 3)
+
+        await transport.disconnect()
+
+    @async_test
+    async def test_error_responses(self):
+        transport = FailingFakeJanusTransport(
+            base_url="fake://server", circuit_breaker=True, circuit_min_requests=1
+        )
+        transport.erroring = True
+        await transport.connect()
+        for _ in range(3):
+            await transport.info()
+        self.assertEqual(transport.circuit_state, CircuitState.CLOSED)
+        self.assertEqual(transport.circuit_breaker.stats()["failures"], 0)
+        await transport.disconnect()
+
+    @async_test
+    async def test_wait_for_probe(self):
+        transport = FailingFakeJanusTransport(
+            base_url="fake://server",
+            circuit_breaker=True,
+            circuit_min_requests=1,
+            circuit_open_duration=0.01,
+        )
+        await transport.connect()
+
+        transport.failing = True
+        with self.assertRaises(ConnectionError):
+            await transport.info()
+        self.assertEqual(transport.circuit_state, CircuitState.OPEN)
+
+        # Slow pong, so the other requests come while probing
+        respond = transport.respond
+
+        async def pong_later(response: Dict) -> None:
+            await asyncio.sleep(0.05)
+            await transport.receive(response)
+
+        def slow_respond(message: Dict) -> Dict:
+            response = respond(message)
+            if message["janus"] == "ping":
+                asyncio.create_task(pong_later(response))
+                return None
+            return response
+
+        transport.respond = slow_respond
+        transport.failing = False
+        await asyncio.sleep(0.01)
+        responses = await asyncio.gather(*[transport.info() for _ in range(3)])
+        self.assertEqual([response["janus"] for response in responses], ["success"] * 3)
+        self.assertEqual(transport.circuit_state, CircuitState.CLOSED)
+        self.assertEqual(
+            len([message for message in transport.sent if message["janus"] == "ping"]),
+            1,
+        )
+        await transport.disconnect()
+
+    @async_test
+    async def test_disabled(self):
+        transport = FailingFakeJanusTransport(
+            base_url="fake://server", circuit_min_requests=1
+        )
+        transport.failing = True
+        await transport.connect()
+        for _ in range(3):
+            with self.assertRaises(ConnectionError):
+                await transport.info()
+        self.assertIsNone(transport.circuit_breaker)
+        self.assertEqual(transport.circuit_state, CircuitState.CLOSED)
+        await transport.disconnect()
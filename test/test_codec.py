@@ -0,0 +1,60 @@
+import unittest
+import logging
+
+from janus_client import JanusTransport
+from janus_client.codec import (
+    JanusCodec,
+    JanusCodecJSON,
+    JanusCodecOrjson,
+    JanusCodecUjson,
+    get_codec,
+    orjson,
+    ujson,
+)
+
+format = "%(asctime)s: %(message)s"
+logging.basicConfig(format=format, level=logging.INFO, datefmt="%H:%M:%S")
+logger = logging.getLogger()
+
+
+class TestClass(unittest.TestCase):
+    message = {
+        "janus": "message",
+        "transaction": "abc",
+        "session_id": 8429429482340123,
+        "body": {"request": "join", "display": "ñame", "room": 1234},
+        "jsep": {"type": "offer", "sdp": "v=0\r\no=- 0 0 IN IP4 127.0.0.1\r\n"},
+    }
+
+    def roundtrip(self, codec: JanusCodec):
+        message_raw = codec.dumps(self.message)
+        self.assertIsInstance(message_raw, str)
+        self.assertEqual(codec.loads(message_raw), self.message)
+        self.assertEqual(codec.loads(message_raw.encode()), self.message)
+
+    def test_json(self):
+        self.roundtrip(JanusCodecJSON())
+
+    @unittest.skipIf(orjson is None, "orjson not installed")
+    def test_orjson(self):
+        self.roundtrip(JanusCodecOrjson())
+
+    @unittest.skipIf(ujson is None, "ujson not installed")
+    def test_ujson(self):
+        self.roundtrip(JanusCodecUjson())
+
+    def test_get_codec(self):
+        self.assertIsInstance(get_codec("json"), JanusCodecJSON)
+        self.assertIsInstance(get_codec(), JanusCodec)
+
+        codec = JanusCodecJSON()
+        self.assertIs(get_codec(codec), codec)
+
+        with self.assertRaises(Exception):
+            get_codec("dummy")
+
+    def test_transport_codec(self):
+        transport = JanusTransport.create_transport(
+            base_url="ws://127.0.0.1", config={"codec": "json"}
+        )
+        self.assertIsInstance(transport.codec, JanusCodecJSON)
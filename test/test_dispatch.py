@@ -0,0 +1,145 @@
+import unittest
+import logging
+import asyncio
+from typing import Dict, List
+
+from janus_client import JanusSession, JanusPlugin
+from janus_client.dispatch import DispatchQueue
+from test.util import async_test
+
+format = "%(asctime)s: %(message)s"
+logging.basicConfig(format=format, level=logging.INFO, datefmt="%H:%M:%S")
+logger = logging.getLogger()
+
+
+class RecordingPlugin(JanusPlugin):
+    name = "janus.plugin.test"
+
+    def __init__(self, delay: float = 0) -> None:
+        super().__init__()
+        self.delay = delay
+        self.received: List[Dict] = []
+
+    async def on_receive(self, response: dict):
+        await asyncio.sleep(self.delay)
+        self.received.append(response)
+
+
+class TestClass(unittest.TestCase):
+    @async_test
+    async def test_queue_order_and_overflow(self):
+        received = []
+        release = asyncio.Event()
+
+        async def callback(message: Dict):
+            await release.wait()
+            received.append(message["n"])
+
+        dispatch_queue = DispatchQueue(callback=callback, max_size=3)
+        for n in range(5):
+            dispatch_queue.put({"n": n})
+
+        self.assertEqual(dispatch_queue.depth, 3)
+        self.assertEqual(dispatch_queue.dropped, 2)
+
+        # Oldest messages are dropped
+        release.set()
+        await dispatch_queue.join()
+        self.assertEqual(received, [2, 3, 4])
+        self.assertEqual(
+            dispatch_queue.stats(),
+            {"depth": 0, "max_depth": 3, "dispatched": 3, "dropped": 2},
+        )
+
+    @async_test
+    async def test_keep_critical_events(self):
+        received = []
+
+        async def callback(message: Dict):
+            received.append(message["janus"])
+
+        dispatch_queue = DispatchQueue(callback=callback, max_size=2)
+        dispatch_queue.put({"janus": "webrtcup"})
+        dispatch_queue.put({"janus": "event"})
+        dispatch_queue.put({"janus": "hangup"})
+        self.assertEqual(dispatch_queue.dropped, 1)
+
+        # Full of critical events: drop new non-critical ones only
+        self.assertFalse(dispatch_queue.put({"janus": "event"}))
+        self.assertTrue(dispatch_queue.put({"janus": "detached"}))
+        self.assertEqual(dispatch_queue.depth, 3)
+
+        await dispatch_queue.join()
+        self.assertEqual(received, ["webrtcup", "hangup", "detached"])
+        self.assertEqual(dispatch_queue.dropped, 2)
+
+    @async_test
+    async def test_close_in_callback(self):
+        received = []
+
+        async def callback(message: Dict):
+            dispatch_queue.close()
+            await asyncio.sleep(0)
+            received.append(message["n"])
+
+        dispatch_queue = DispatchQueue(callback=callback)
+        dispatch_queue.put({"n": 0})
+        dispatch_queue.put({"n": 1})
+        await dispatch_queue.join()
+
+        # Finishes the current message, drops the rest
+        self.assertEqual(received, [0])
+
+    @async_test
+    async def test_callback_exception(self):
+        received = []
+
+        async def callback(message: Dict):
+            if message["n"] == 0:
+                raise Exception("Fail in callback")
+            received.append(message["n"])
+
+        dispatch_queue = DispatchQueue(callback=callback)
+        dispatch_queue.put({"n": 0})
+        dispatch_queue.put({"n": 1})
+        await dispatch_queue.join()
+
+        self.assertEqual(received, [1])
+
+    @async_test
+    async def test_slow_handle_not_blocking(self):
+        session = JanusSession(base_url="fake://server")
+        slow_plugin = RecordingPlugin(delay=1)
+        fast_plugin = RecordingPlugin()
+        await slow_plugin.attach(session)
+        await fast_plugin.attach(session)
+
+        session_id = session.transport.sent[-1]["session_id"]
+
+        async def receive_event(plugin: JanusPlugin, n: int):
+            await session.transport.receive(
+                {
+                    "janus": "event",
+                    "session_id": session_id,
+                    "sender": plugin.id,
+                    "n": n,
+                }
+            )
+
+        await asyncio.wait_for(receive_event(slow_plugin, 0), timeout=0.1)
+        for n in range(3):
+            await asyncio.wait_for(receive_event(fast_plugin, n), timeout=0.1)
+
+        await asyncio.sleep(0.05)
+        self.assertEqual([event["n"] for event in fast_plugin.received], [0, 1, 2])
+        self.assertEqual(slow_plugin.received, [])
+
+        stats = session.dispatch_stats
+        self.assertEqual(stats[fast_plugin.id]["dispatched"], 3)
+        self.assertEqual(stats[slow_plugin.id]["depth"], 0)
+        self.assertEqual(stats[slow_plugin.id]["dispatched"], 0)
+
+        await fast_plugin.destroy()
+        self.assertNotIn(fast_plugin.id, session.dispatch_stats)
+
+        await session.destroy()
@@ -0,0 +1,116 @@
+import unittest
+import logging
+import asyncio
+from typing import Dict, List
+
+from janus_client import JanusSession, JanusPlugin, OverflowPolicy
+from janus_client.event_stream import EventBroadcaster
+from test.util import async_test
+
+format = "%(asctime)s: %(message)s"
+logging.basicConfig(format=format, level=logging.INFO, datefmt="%H:%M:%S")
+logger = logging.getLogger()
+
+
+class RecordingPlugin(JanusPlugin):
+    name = "janus.plugin.test"
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.received: List[Dict] = []
+
+    async def on_receive(self, response: dict):
+        self.received.append(response)
+
+
+class TestClass(unittest.TestCase):
+    @async_test
+    async def test_filter(self):
+        broadcaster = EventBroadcaster()
+        webrtcup_events = broadcaster.subscribe(filter={"janus": "webrtcup"})
+        room_events = broadcaster.subscribe(
+            filter={"plugindata": {"data": {"room": 1}}}
+        )
+        odd_events = broadcaster.subscribe(filter=lambda event: event["n"] % 2)
+        self.assertEqual(len(broadcaster), 3)
+
+        await broadcaster.publish({"janus": "webrtcup", "n": 1})
+        await broadcaster.publish(
+            {"janus": "event", "n": 2, "plugindata": {"data": {"room": 1}}}
+        )
+        await broadcaster.publish({"janus": "hangup", "n": 3})
+        broadcaster.close()
+        self.assertEqual(len(broadcaster), 0)
+
+        self.assertEqual([event["n"] async for event in webrtcup_events], [1])
+        self.assertEqual([event["n"] async for event in room_events], [2])
+        self.assertEqual([event["n"] async for event in odd_events], [1, 3])
+
+    @async_test
+    async def test_drop_oldest(self):
+        broadcaster = EventBroadcaster()
+        subscription = broadcaster.subscribe(buffer_size=2)
+
+        for n in range(5):
+            await broadcaster.publish({"janus": "event", "n": n})
+        subscription.close()
+
+        self.assertEqual(subscription.dropped, 3)
+        self.assertEqual([event["n"] async for event in subscription], [3, 4])
+
+    @async_test
+    async def test_block(self):
+        broadcaster = EventBroadcaster()
+        subscription = broadcaster.subscribe(buffer_size=2, policy="block")
+        self.assertEqual(subscription.policy, OverflowPolicy.BLOCK)
+
+        async def publish_all():
+            for n in range(5):
+                await broadcaster.publish({"janus": "event", "n": n})
+
+        publish_task = asyncio.create_task(publish_all())
+        await asyncio.sleep(0.01)
+        self.assertFalse(publish_task.done())
+        self.assertEqual(len(subscription), 2)
+
+        received = []
+        async for event in subscription:
+            received.append(event["n"])
+            if len(received) == 5:
+                break
+
+        await publish_task
+        self.assertEqual(received, [0, 1, 2, 3, 4])
+        self.assertEqual(subscription.dropped, 0)
+
+    @async_test
+    async def test_session_and_plugin_events(self):
+        session = JanusSession(base_url="fake://server")
+        plugin = RecordingPlugin()
+        await plugin.attach(session)
+        session_id = session.transport.sent[-1]["session_id"]
+
+        session_events = session.events()
+        plugin_events = plugin.events(filter={"janus": "webrtcup"})
+
+        for janus in ["media", "webrtcup"]:
+            await session.transport.receive(
+                {"janus": janus, "session_id": session_id, "sender": plugin.id}
+            )
+        await session.transport.receive({"janus": "timeout", "session_id": session_id})
+
+        async with plugin_events:
+            event = await asyncio.wait_for(plugin_events.__anext__(), timeout=1)
+            self.assertEqual(event["janus"], "webrtcup")
+
+        received = []
+        async for event in session_events:
+            received.append(event["janus"])
+            if len(received) == 3:
+                break
+        self.assertEqual(sorted(received), ["media", "timeout", "webrtcup"])
+        self.assertEqual(len(plugin.received), 2)
+
+        await plugin.destroy()
+        await session.destroy()
+        self.assertTrue(session_events.closed)
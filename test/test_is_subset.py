@@ -1,7 +1,12 @@
 import unittest
 import logging
 
-from janus_client.message_transaction import is_subset
+from janus_client.message_transaction import (
+    is_subset,
+    compile_matcher,
+    janus_error_matcher,
+    plugin_error_matcher,
+)
 
 format = "%(asctime)s: %(message)s"
 logging.basicConfig(format=format, level=logging.INFO, datefmt="%H:%M:%S")
@@ -65,3 +70,79 @@ class TestClass(unittest.TestCase):
                 dict_2={"a": 1, "b": {"e": {"f": None, "g": None}}},
             )
         )
+
+
+class TestCompileMatcher(unittest.TestCase):
+    messages = [
+        {},
+        {"a": 1},
+        {"a": 1, "b": None},
+        {"a": 1, "b": 2},
+        {"a": True, "b": "2"},
+        {"a": 1, "b": {"c": 2, "d": 3}},
+        {"a": 1, "b": {"c": 2, "d": 3, "e": {"f": 4}}},
+        {"a": 1, "b": {"c": 2, "d": 3, "e": "f"}},
+    ]
+    patterns = [
+        {},
+        {"a": 1},
+        {"b": None},
+        {"b": 3},
+        {"c": None},
+        {"b": "2"},
+        {"a": 1, "b": {}},
+        {"a": 1, "b": {"c": 2}},
+        {"a": 1, "b": {"e": {}}},
+        {"a": 1, "b": {"c": None, "e": {}}},
+        {"a": 1, "b": {"e": {"f": None}}},
+        {"a": 1, "b": {"e": {"f": None, "g": None}}},
+        {"a": 1, "b": {"e": {"f": 4}}},
+    ]
+
+    def test_same_as_is_subset(self):
+        for pattern in self.patterns:
+            matcher = compile_matcher(pattern)
+            for message in self.messages:
+                self.assertEqual(
+                    matcher(message),
+                    is_subset(message, pattern),
+                    f"{pattern} {message}",
+                )
+
+    def test_cached(self):
+        self.assertIs(compile_matcher({"a": 1}), compile_matcher({"a": 1}))
+        self.assertIsNot(compile_matcher({"a": 1}), compile_matcher({"a": "1"}))
+
+    def test_invalid_input(self):
+        self.assertRaises(TypeError, compile_matcher, "")
+
+    def test_error_matchers(self):
+        self.assertTrue(janus_error_matcher({"janus": "error", "error": {"code": 1}}))
+        self.assertFalse(janus_error_matcher({"janus": "success"}))
+
+        matcher = plugin_error_matcher("janus.plugin.videoroom", "videoroom")
+        self.assertIs(
+            matcher, plugin_error_matcher("janus.plugin.videoroom", "videoroom")
+        )
+        self.assertTrue(
+            matcher(
+                {
+                    "janus": "event",
+                    "plugindata": {
+                        "plugin": "janus.plugin.videoroom",
+                        "data": {"videoroom": "event", "error_code": 1, "error": ""},
+                    },
+                }
+            )
+        )
+        self.assertFalse(
+            matcher(
+                {
+                    "janus": "event",
+                    "plugindata": {
+                        "plugin": "janus.plugin.videoroom",
+                        "data": {"videoroom": "joined"},
+                    },
+                }
+            )
+        )
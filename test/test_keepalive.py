@@ -0,0 +1,115 @@
+import unittest
+import logging
+import asyncio
+
+from janus_client import JanusSession, JanusTransport
+from janus_client.keepalive import KeepaliveScheduler
+from test.util import async_test
+
+format = "%(asctime)s: %(message)s"
+logging.basicConfig(format=format, level=logging.INFO, datefmt="%H:%M:%S")
+logger = logging.getLogger()
+
+
+class TestClass(unittest.TestCase):
+    def create_scheduler(self, **kwargs) -> KeepaliveScheduler:
+        self.sent = []
+
+        async def send_keepalive(session_id: int):
+            self.sent.append(session_id)
+
+        return KeepaliveScheduler(
+            send_keepalive=send_keepalive, interval=0.1, resolution=0.01, **kwargs
+        )
+
+    @async_test
+    async def test_send_keepalive(self):
+        scheduler = self.create_scheduler(jitter=0)
+        scheduler.add(1)
+        scheduler.add(2)
+        self.assertEqual(len(scheduler), 2)
+
+        await asyncio.sleep(0.25)
+        self.assertEqual(self.sent.count(1), 2)
+        self.assertEqual(self.sent.count(2), 2)
+
+        scheduler.remove(1)
+        scheduler.remove(2)
+        self.assertEqual(len(scheduler), 0)
+
+        await asyncio.sleep(0.15)
+        self.assertEqual(len(self.sent), 4)
+
+    @async_test
+    async def test_skip_active_session(self):
+        scheduler = self.create_scheduler(jitter=0)
+        scheduler.add(1)
+        scheduler.add(2)
+
+        for _ in range(10):
+            await asyncio.sleep(0.03)
+            scheduler.touch(1)
+
+        self.assertNotIn(1, self.sent)
+        self.assertGreaterEqual(self.sent.count(2), 2)
+
+        scheduler.stop()
+
+    @async_test
+    async def test_jitter(self):
+        scheduler = self.create_scheduler(jitter=0.5)
+        for session_id in range(100):
+            scheduler.add(session_id)
+
+        # Not all sessions are due together
+        await asyncio.sleep(0.08)
+        self.assertGreater(len(self.sent), 0)
+        self.assertLess(len(self.sent), 100)
+
+        scheduler.stop()
+
+    @async_test
+    async def test_events_dont_postpone_keepalive(self):
+        transport = JanusTransport.create_transport(
+            base_url="fake://server",
+            config={"keepalive_interval": 0.2, "keepalive_jitter": 0},
+        )
+        session = JanusSession(transport=transport)
+        session_id = await transport.create_session(session)
+
+        # Session only receives events, it doesn't send anything
+        for _ in range(20):
+            await transport.receive({"janus": "media", "session_id": session_id})
+            await asyncio.sleep(0.03)
+
+        keepalives = [
+            message for message in transport.sent if message["janus"] == "keepalive"
+        ]
+        self.assertGreaterEqual(len(keepalives), 2)
+
+        await transport.destroy_session(session_id)
+        await transport.disconnect()
+
+    @async_test
+    async def test_stop_on_disconnect(self):
+        transport = JanusTransport.create_transport(
+            base_url="fake://server",
+            config={"keepalive_interval": 0.05, "keepalive_jitter": 0},
+        )
+        await transport.connect()
+        session = JanusSession(transport=transport)
+        session_id = await transport.create_session(session)
+
+        # Session outlives the connection, no keepalive is sent meanwhile
+        await transport.disconnect()
+        sent_count = len(transport.sent)
+        await asyncio.sleep(0.15)
+        self.assertEqual(len(transport.sent), sent_count)
+
+        # Resumed on connect
+        await transport.connect()
+        await asyncio.sleep(0.15)
+        self.assertIn("keepalive", [message["janus"] for message in transport.sent])
+
+        await transport.destroy_session(session_id)
+        await transport.disconnect()
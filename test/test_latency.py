@@ -0,0 +1,92 @@
+import unittest
+import logging
+import asyncio
+from typing import Dict
+
+from janus_client.latency import LatencyTracker, request_type
+from janus_client.message_transaction import MessageTransaction
+from test.util import async_test, FakeJanusTransport
+
+format = "%(asctime)s: %(message)s"
+logging.basicConfig(format=format, level=logging.INFO, datefmt="%H:%M:%S")
+logger = logging.getLogger()
+
+
+class TestClass(unittest.TestCase):
+    def test_request_type(self):
+        self.assertEqual(request_type({"janus": "ping"}), "ping")
+        self.assertEqual(
+            request_type({"janus": "message", "body": {"request": "join"}}),
+            "message:join",
+        )
+
+    def test_timeout(self):
+        tracker = LatencyTracker(
+            factor=2, floor=0.1, ceiling=10, percentile=0.9, min_samples=10
+        )
+
+        # Not enough samples
+        self.assertEqual(tracker.timeout("ping"), 10)
+
+        for n in range(1, 11):
+            tracker.record("ping", n / 10)
+        self.assertAlmostEqual(tracker.timeout("ping"), 1.8)
+
+        # Other request types don't use samples of ping
+        self.assertEqual(tracker.timeout("message:join"), 10)
+
+        for _ in range(10):
+            tracker.record("keepalive", 0.001)
+        self.assertEqual(tracker.timeout("keepalive"), 0.1)
+
+        for _ in range(10):
+            tracker.record("message:create", 100)
+        self.assertEqual(tracker.timeout("message:create"), 10)
+
+        stats = tracker.stats()
+        self.assertEqual(stats["ping"]["count"], 10)
+        self.assertAlmostEqual(stats["ping"]["p50"], 0.5)
+
+    @async_test
+    async def test_transport_adaptive_timeout(self):
+        transport = FakeJanusTransport(
+            base_url="fake://server", timeout_floor=0.05, timeout_ceiling=15
+        )
+        await transport.connect()
+
+        for _ in range(transport.latency.min_samples):
+            await transport.ping()
+        self.assertEqual(transport.latency.stats()["ping"]["timeout"], 0.05)
+
+        # Server stops responding
+        def respond(message: Dict) -> Dict:
+            return None
+
+        transport.respond = respond
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        with self.assertRaises(asyncio.TimeoutError):
+            await transport.ping()
+        self.assertLess(loop.time() - start, 1)
+
+        # Callers can still override
+        with self.assertRaises(asyncio.TimeoutError):
+            await transport.ping(timeout=0.01)
+
+        await transport.disconnect()
+
+    @async_test
+    async def test_response_time_until_arrival(self):
+        response_times = []
+        transaction = MessageTransaction()
+        transaction.on_response = lambda message, response_time: (
+            response_times.append(response_time)
+        )
+        transaction.mark_sent()
+        transaction.put_msg({"janus": "ack"})
+
+        # Caller gets the response late
+        await asyncio.sleep(0.2)
+        await transaction.get()
+        self.assertEqual(len(response_times), 1)
+        self.assertLess(response_times[0], 0.1)
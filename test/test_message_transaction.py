@@ -0,0 +1,260 @@
+import unittest
+import logging
+import asyncio
+
+from janus_client.message_transaction import (
+    MessageTransaction,
+    any_matcher,
+    compile_matcher,
+    janus_error_matcher,
+    plugin_error_matcher,
+)
+from test.util import async_test, FakeJanusTransport
+
+format = "%(asctime)s: %(message)s"
+logging.basicConfig(format=format, level=logging.INFO, datefmt="%H:%M:%S")
+logger = logging.getLogger()
+
+
+class TestClass(unittest.TestCase):
+    @async_test
+    async def test_get_first_message(self):
+        message_transaction = MessageTransaction()
+
+        async def put_later():
+            await asyncio.sleep(0.01)
+            message_transaction.put_msg({"janus": "ack"})
+
+        asyncio.create_task(put_later())
+        response = await message_transaction.get(timeout=1)
+        self.assertEqual(response, {"janus": "ack"})
+
+        # Saved messages can be retrieved again
+        response = await message_transaction.get(timeout=1)
+        self.assertEqual(response, {"janus": "ack"})
+
+    @async_test
+    async def test_get_saved_message(self):
+        message_transaction = MessageTransaction()
+        message_transaction.put_msg({"janus": "ack"})
+        message_transaction.put_msg(
+            {
+                "janus": "event",
+                "plugindata": {"plugin": "dummy", "data": {"result": "ok"}},
+            }
+        )
+
+        response = await message_transaction.get(
+            {"janus": "event", "plugindata": {"plugin": "dummy"}}, timeout=1
+        )
+        self.assertEqual(response["plugindata"]["data"]["result"], "ok")
+
+        response = await message_transaction.get(
+            lambda msg: msg["janus"] == "ack", timeout=1
+        )
+        self.assertEqual(response, {"janus": "ack"})
+
+    @async_test
+    async def test_combined_matcher_uses_index(self):
+        matcher = any_matcher(
+            compile_matcher(
+                {"janus": "success", "plugindata": {"plugin": "janus.plugin.dummy"}}
+            ),
+            plugin_error_matcher("janus.plugin.dummy", "dummy"),
+            janus_error_matcher,
+        )
+        self.assertEqual(matcher.index_key, (None, None))
+        self.assertEqual(
+            set(matcher.index_keys),
+            {
+                ("success", "janus.plugin.dummy"),
+                ("event", "janus.plugin.dummy"),
+                ("error", None),
+            },
+        )
+
+        checked = []
+
+        def counting_matcher(message):
+            checked.append(message)
+            return matcher(message)
+
+        counting_matcher.index_keys = matcher.index_keys
+
+        message_transaction = MessageTransaction(max_messages=200)
+        for _ in range(100):
+            message_transaction.put_msg({"janus": "ack"})
+        message_transaction.put_msg({"janus": "error", "error": {"code": 1}})
+        message_transaction.put_msg(
+            {"janus": "success", "plugindata": {"plugin": "janus.plugin.dummy"}}
+        )
+
+        # Only the error and the success are checked, first arrived first
+        response = await message_transaction.get(counting_matcher, timeout=1)
+        self.assertEqual(response["janus"], "error")
+        self.assertEqual(len(checked), 1)
+
+        # Matchers sharing an index key keep it
+        matcher = any_matcher(
+            compile_matcher({"janus": "ack"}), compile_matcher({"janus": "ack", "a": 1})
+        )
+        self.assertEqual(matcher.index_key, ("ack", None))
+
+    @async_test
+    async def test_concurrent_get(self):
+        message_transaction = MessageTransaction()
+
+        task_ack = asyncio.create_task(message_transaction.get({"janus": "ack"}))
+        task_event = asyncio.create_task(message_transaction.get({"janus": "event"}))
+        await asyncio.sleep(0)
+
+        message_transaction.put_msg({"janus": "event"})
+        message_transaction.put_msg({"janus": "ack"})
+
+        self.assertEqual(await task_ack, {"janus": "ack"})
+        self.assertEqual(await task_event, {"janus": "event"})
+
+    @async_test
+    async def test_matcher_raises(self):
+        transport = FakeJanusTransport(base_url="fake://server")
+        transport.respond = lambda message: None
+        await transport.connect()
+
+        transaction_1 = await transport.send({"janus": "message"})
+        transaction_2 = await transport.send({"janus": "message"})
+        task_1 = asyncio.create_task(
+            transaction_1.get(lambda res: res["plugindata"]["data"], timeout=1)
+        )
+        task_2 = asyncio.create_task(transaction_2.get({"janus": "ack"}, timeout=1))
+        await asyncio.sleep(0)
+
+        # Failing matcher doesn't break the receive loop
+        await transport.receive({"janus": "ack", "transaction": transaction_1.id})
+        await transport.receive({"janus": "ack", "transaction": transaction_2.id})
+
+        with self.assertRaises(KeyError):
+            await task_1
+        self.assertEqual((await task_2)["janus"], "ack")
+
+        await transaction_1.done()
+        await transaction_2.done()
+        await transport.disconnect()
+
+    @async_test
+    async def test_timeout(self):
+        message_transaction = MessageTransaction()
+        message_transaction.put_msg({"janus": "ack"})
+
+        with self.assertRaises(asyncio.TimeoutError):
+            await message_transaction.get({"janus": "success"}, timeout=0.01)
+
+        # Waiter is removed after timeout
+        message_transaction.put_msg({"janus": "success"})
+        response = await message_transaction.get({"janus": "success"}, timeout=1)
+        self.assertEqual(response, {"janus": "success"})
+
+    def test_invalid_matcher(self):
+        message_transaction = MessageTransaction()
+
+        with self.assertRaises(TypeError):
+            asyncio.run(message_transaction.get(matcher="ack"))
+
+    @async_test
+    async def test_max_messages(self):
+        message_transaction = MessageTransaction(max_messages=2)
+        for n in range(3):
+            message_transaction.put_msg({"janus": "event", "n": n})
+
+        response = await message_transaction.get({"janus": "event"}, timeout=1)
+        self.assertEqual(response["n"], 1)
+        with self.assertRaises(asyncio.TimeoutError):
+            await message_transaction.get({"n": 0}, timeout=0.01)
+
+    @async_test
+    async def test_context_manager(self):
+        transport = FakeJanusTransport(base_url="fake://server")
+        await transport.connect()
+
+        with self.assertRaises(asyncio.TimeoutError):
+            async with await transport.send({"janus": "ping"}) as message_transaction:
+                self.assertEqual(transport.transaction_count, 1)
+                await message_transaction.get({"janus": "success"}, timeout=0.01)
+
+        self.assertTrue(message_transaction.is_done)
+        self.assertEqual(transport.transaction_count, 0)
+
+        await transport.disconnect()
+
+    def test_send_closed_without_loop(self):
+        loop = asyncio.new_event_loop()
+
+        async def start_send():
+            transport = FakeJanusTransport(
+                base_url="fake://server", rate_limit=1, rate_limit_burst=1
+            )
+            await transport.connect()
+            await (await transport.send({"janus": "info"})).done()
+
+            # Waits for a token
+            coroutine = transport.send({"janus": "info"})
+            coroutine.send(None)
+            return transport, coroutine
+
+        try:
+            transport, coroutine = loop.run_until_complete(start_send())
+
+            # Closed outside the loop, like when garbage collected
+            coroutine.close()
+            self.assertEqual(transport.transaction_count, 1)
+
+            loop.run_until_complete(transport.disconnect())
+            self.assertEqual(transport.transaction_count, 0)
+        finally:
+            loop.close()
+
+    @async_test
+    async def test_reap_expired_transaction(self):
+        transport = FakeJanusTransport(base_url="fake://server", transaction_ttl=0.05)
+        await transport.connect()
+
+        message_transaction = await transport.send({"janus": "ping"})
+        self.assertEqual(transport.transaction_count, 1)
+
+        # Waiting forever is interrupted when the transaction expires
+        with self.assertRaisesRegex(asyncio.TimeoutError, "Transaction expired"):
+            await asyncio.wait_for(
+                message_transaction.get({"janus": "success"}), timeout=1
+            )
+
+        self.assertTrue(message_transaction.is_done)
+        self.assertEqual(transport.transaction_count, 0)
+
+        # Expired transactions can still be read
+        response = await message_transaction.get({"janus": "pong"})
+        self.assertEqual(response["janus"], "pong")
+
+        await transport.disconnect()
+
+    @async_test
+    async def test_reap_by_earliest_deadline(self):
+        transport = FakeJanusTransport(base_url="fake://server", transaction_ttl=None)
+        transport.respond = lambda message: None
+        await transport.connect()
+
+        # Never expires
+        message_transaction_1 = await transport.send({"janus": "ping"})
+
+        transport.transaction_ttl = 10
+        message_transaction_2 = await transport.send({"janus": "ping"})
+
+        # Shorter TTL behind a longer one is still reaped on time
+        transport.transaction_ttl = 0.05
+        message_transaction_3 = await transport.send({"janus": "ping"})
+        with self.assertRaisesRegex(asyncio.TimeoutError, "Transaction expired"):
+            await asyncio.wait_for(message_transaction_3.get(), timeout=1)
+
+        self.assertFalse(message_transaction_1.is_done)
+        self.assertFalse(message_transaction_2.is_done)
+        self.assertEqual(transport.transaction_count, 2)
+
+        await transport.disconnect()
@@ -0,0 +1,154 @@
+import unittest
+import logging
+from typing import Dict
+
+from janus_client import (
+    JanusSession,
+    JanusVideoCallPlugin,
+    JanusVideoRoomPlugin,
+    PeerConnectionConfig,
+    create_peer_connection,
+)
+from janus_client.trickle import sdp_candidates
+from test.util import async_test
+
+format = "%(asctime)s: %(message)s"
+logging.basicConfig(format=format, level=logging.INFO, datefmt="%H:%M:%S")
+logger = logging.getLogger()
+
+
+class TestClass(unittest.TestCase):
+    @async_test
+    async def test_lazy_pc(self):
+        session = JanusSession(base_url="fake://server")
+        plugin = JanusVideoRoomPlugin()
+        await plugin.attach(session)
+
+        # Control-only handles don't get a PC
+        self.assertIsNone(plugin._pc)
+
+        pc = plugin._get_pc()
+        self.assertIs(plugin._get_pc(), pc)
+
+        # Replaced PC is closed
+        new_pc = create_peer_connection()
+        await plugin._set_pc(new_pc)
+        self.assertEqual(pc.signalingState, "closed")
+        self.assertIs(plugin._get_pc(), new_pc)
+
+        # A closed PC is replaced on next use
+        await plugin._close_pc()
+        await plugin._close_pc()
+        self.assertIsNot(plugin._get_pc(), new_pc)
+
+        await plugin._close_pc()
+        await plugin.destroy()
+        await session.destroy()
+
+    @async_test
+    async def test_video_call_replaces_pc(self):
+        session = JanusSession(base_url="fake://server")
+        respond = session.transport.respond
+
+        def accept(message: Dict) -> Dict:
+            response = respond(message)
+            if message["janus"] == "message":
+                response.update(
+                    janus="event",
+                    plugindata={
+                        "plugin": "janus.plugin.videocall",
+                        "data": {"videocall": "event", "result": {"event": "accepted"}},
+                    },
+                )
+            return response
+
+        session.transport.respond = accept
+        plugin = JanusVideoCallPlugin()
+        await plugin.attach(session)
+
+        pc_1 = create_peer_connection()
+        pc_2 = create_peer_connection()
+        jsep = {"type": "answer", "sdp": ""}
+        self.assertTrue(await plugin.accept(jsep=jsep, pc=pc_1, player=None))
+        self.assertIs(plugin._pc, pc_1)
+        self.assertTrue(await plugin.accept(jsep=jsep, pc=pc_2, player=None))
+        self.assertEqual(pc_1.signalingState, "closed")
+        self.assertIs(plugin._pc, pc_2)
+
+        await plugin._close_pc()
+        await plugin.destroy()
+        await session.destroy()
+
+    def test_filter_addresses(self):
+        config = PeerConnectionConfig(
+            interfaces=["10.0.0.0/8"], exclude_interfaces=["10.1.0.0/16"]
+        )
+        self.assertEqual(
+            config.filter_addresses(["10.0.0.1", "10.1.0.1", "192.168.1.1"]),
+            ["10.0.0.1"],
+        )
+
+        # Interface names may have wildcards
+        config = PeerConnectionConfig(exclude_interfaces=["l*"])
+        self.assertEqual(config.filter_addresses(["127.0.0.1"]), [])
+
+        self.assertIsNone(PeerConnectionConfig().rtc_configuration())
+        self.assertEqual(
+            PeerConnectionConfig(host_only=True).rtc_configuration().iceServers, []
+        )
+
+    def test_filter_sdp(self):
+        sdp = (
+            "v=0\r\n"
+            "m=audio 9 UDP/TLS/RTP/SAVPF 96\r\n"
+            "a=candidate:1 1 udp 2130706431 10.0.0.1 5000 typ host\r\n"
+            "a=candidate:2 1 udp 2130706431 172.17.0.1 5001 typ host\r\n"
+            "a=candidate:3 1 udp 1694498815 1.2.3.4 6000 typ srflx"
+            " raddr 172.17.0.1 rport 5001\r\n"
+            "a=candidate:4 1 udp 16777215 5.6.7.8 7000 typ relay"
+            " raddr 1.2.3.4 rport 6000\r\n"
+            "a=end-of-candidates\r\n"
+        )
+        config = PeerConnectionConfig(exclude_interfaces=["172.16.0.0/12"])
+        filtered = config.filter_sdp(sdp)
+        addresses = [
+            candidate["candidate"].split()[4] for candidate in sdp_candidates(filtered)
+        ]
+        self.assertEqual(addresses, ["10.0.0.1", "5.6.7.8"])
+        self.assertTrue(filtered.startswith("v=0\r\nm=audio"))
+        self.assertTrue(filtered.endswith("a=end-of-candidates\r\n"))
+
+        self.assertIs(PeerConnectionConfig().filter_sdp(sdp), sdp)
+
+    @async_test
+    async def test_peer_connection_config(self):
+        session_config = PeerConnectionConfig(host_only=True)
+        session = JanusSession(
+            base_url="fake://server", peer_connection_config=session_config
+        )
+        plugin_config = PeerConnectionConfig(host_only=True, interfaces=[])
+        plugin_1 = JanusVideoRoomPlugin()
+        plugin_2 = JanusVideoRoomPlugin(peer_connection_config=plugin_config)
+        await plugin_1.attach(session)
+        await plugin_2.attach(session)
+        self.assertIs(plugin_1.peer_connection_config, session_config)
+        self.assertIs(plugin_2.peer_connection_config, plugin_config)
+
+        candidate_counts = []
+        for plugin in [plugin_1, plugin_2]:
+            pc = await plugin.create_pc()
+            await plugin._set_pc(pc)
+            pc.addTransceiver("audio")
+            jsep = await plugin.create_local_jsep(
+                pc=pc, description=await pc.createOffer()
+            )
+            candidate_counts.append(len(sdp_candidates(jsep["sdp"])))
+
+        # No interface allowed, no candidate sent
+        self.assertGreater(candidate_counts[0], 0)
+        self.assertEqual(candidate_counts[1], 0)
+
+        for plugin in [plugin_1, plugin_2]:
+            await plugin._close_pc()
+            await plugin.destroy()
+        await session.destroy()
@@ -0,0 +1,83 @@
+import unittest
+import logging
+import asyncio
+from typing import Dict
+
+from janus_client import JanusSession, JanusVideoRoomSubscriberPool
+from test.util import async_test
+
+format = "%(asctime)s: %(message)s"
+logging.basicConfig(format=format, level=logging.INFO, datefmt="%H:%M:%S")
+logger = logging.getLogger()
+
+
+class TestClass(unittest.TestCase):
+    @async_test
+    async def test_subscriber_pool(self):
+        session = JanusSession(base_url="fake://server")
+        pool = JanusVideoRoomSubscriberPool(session=session, size=2)
+        await pool.start()
+        self.assertEqual(pool.available, 2)
+        self.assertEqual(len(session.plugin_handles), 2)
+
+        plugin = await pool.acquire()
+        self.assertIn(plugin.id, session.plugin_handles)
+        self.assertEqual(pool.available, 1)
+
+        # PC is created ahead and used when media is negotiated
+        warm_pc = plugin._pc
+        self.assertIsNotNone(warm_pc)
+        pc = await plugin.create_pc()
+        self.assertIs(pc, warm_pc)
+
+        # Taken handle is replaced in the background
+        await pool.wait_filled()
+        self.assertEqual(pool.available, 2)
+        self.assertEqual(len(session.plugin_handles), 3)
+
+        await pool.close()
+        self.assertEqual(pool.available, 0)
+        self.assertEqual(list(session.plugin_handles), [plugin.id])
+        with self.assertRaises(Exception):
+            await pool.acquire()
+
+        await plugin._close_pc()
+        await plugin.destroy()
+        await session.destroy()
+
+    @async_test
+    async def test_concurrent_fill_and_close(self):
+        session = JanusSession(base_url="fake://server")
+        respond = session.transport.respond
+
+        def delay_attach(message: Dict) -> Dict:
+            response = respond(message)
+            if message["janus"] != "attach":
+                return response
+            asyncio.get_running_loop().call_later(
+                0.01,
+                lambda: asyncio.create_task(session.transport.receive(response)),
+            )
+            return None
+
+        session.transport.respond = delay_attach
+        pool = JanusVideoRoomSubscriberPool(session=session, size=2)
+
+        # Concurrent fills don't grow the pool beyond size
+        await asyncio.gather(pool.start(), pool.start())
+        self.assertEqual(pool.available, 2)
+        plugin = await pool.acquire()
+        await pool.start()
+        self.assertEqual(pool.available, 2)
+        self.assertEqual(len(session.plugin_handles), 3)
+
+        # Closing during a refill leaves no handle behind
+        taken = await pool.acquire()
+        await asyncio.sleep(0.005)
+        await pool.close()
+        self.assertEqual(set(session.plugin_handles), {plugin.id, taken.id})
+
+        for plugin in [plugin, taken]:
+            await plugin._close_pc()
+            await plugin.destroy()
+        await session.destroy()
@@ -0,0 +1,140 @@
+import unittest
+import logging
+import asyncio
+
+from janus_client import TransportDisconnected
+from janus_client.scheduler import OutboundScheduler, SendPriority, message_priority
+from test.util import async_test, FakeJanusTransport
+
+format = "%(asctime)s: %(message)s"
+logging.basicConfig(format=format, level=logging.INFO, datefmt="%H:%M:%S")
+logger = logging.getLogger()
+
+
+class TestClass(unittest.TestCase):
+    def test_message_priority(self):
+        self.assertEqual(message_priority({"janus": "keepalive"}), SendPriority.HIGH)
+        self.assertEqual(message_priority({"janus": "trickle"}), SendPriority.HIGH)
+        self.assertEqual(
+            message_priority({"janus": "message", "body": {"request": "join"}}),
+            SendPriority.NORMAL,
+        )
+        self.assertEqual(
+            message_priority({"janus": "message", "body": {"request": "create"}}),
+            SendPriority.BULK,
+        )
+        self.assertEqual(
+            message_priority({"janus": "list_sessions"}), SendPriority.BULK
+        )
+
+    @async_test
+    async def test_priority_order(self):
+        scheduler = OutboundScheduler(rate=100, burst=1)
+        released = []
+
+        async def send(name: str, priority: SendPriority):
+            await scheduler.acquire(priority)
+            released.append(name)
+
+        # Use the only token
+        await scheduler.acquire()
+
+        tasks = [
+            asyncio.create_task(send("bulk", SendPriority.BULK)),
+            asyncio.create_task(send("normal", SendPriority.NORMAL)),
+            asyncio.create_task(send("high", SendPriority.HIGH)),
+        ]
+        await asyncio.sleep(0)
+        self.assertEqual(scheduler.depth, 3)
+
+        await asyncio.gather(*tasks)
+        self.assertEqual(released, ["high", "normal", "bulk"])
+
+        stats = scheduler.stats()
+        self.assertEqual(stats["depth"], 0)
+        self.assertEqual(stats["sent"], {"HIGH": 1, "NORMAL": 2, "BULK": 1})
+        self.assertGreater(stats["wait_max"]["BULK"], stats["wait_max"]["HIGH"])
+
+    @async_test
+    async def test_rate_limit(self):
+        scheduler = OutboundScheduler(rate=100, burst=5)
+        loop = asyncio.get_running_loop()
+
+        start = loop.time()
+        for _ in range(5):
+            await scheduler.acquire()
+        self.assertLess(loop.time() - start, 0.01)
+
+        # Then 1 message per 10ms
+        start = loop.time()
+        for _ in range(5):
+            await scheduler.acquire()
+        self.assertGreaterEqual(loop.time() - start, 0.04)
+
+    @async_test
+    async def test_cancelled_waiter(self):
+        scheduler = OutboundScheduler(rate=100, burst=1)
+        await scheduler.acquire()
+
+        task = asyncio.create_task(scheduler.acquire())
+        await asyncio.sleep(0)
+        task.cancel()
+
+        await asyncio.wait_for(scheduler.acquire(), timeout=1)
+        self.assertEqual(scheduler.depth, 0)
+
+    @async_test
+    async def test_acquire_while_closing(self):
+        scheduler = OutboundScheduler(rate=10, burst=1)
+        await scheduler.acquire()
+        task_1 = asyncio.create_task(scheduler.acquire())
+        await asyncio.sleep(0.01)
+
+        # Starts a new releaser before the cancelled one unwinds
+        task_2 = asyncio.create_task(scheduler.acquire())
+        scheduler.close()
+        await asyncio.sleep(0.01)
+        self.assertTrue(task_1.cancelled())
+
+        # The new releaser is still known, so it's stopped too
+        scheduler.close()
+        await asyncio.sleep(0)
+        self.assertTrue(task_2.cancelled())
+        self.assertEqual(asyncio.all_tasks(), {asyncio.current_task()})
+
+    @async_test
+    async def test_transport_rate_limit(self):
+        transport = FakeJanusTransport(
+            base_url="fake://server", rate_limit=100, rate_limit_burst=1
+        )
+        await transport.connect()
+
+        message_transactions = await asyncio.gather(
+            *[transport.send({"janus": "info"}) for _ in range(3)]
+        )
+        for message_transaction in message_transactions:
+            await message_transaction.done()
+
+        stats = transport.outbound_stats
+        self.assertEqual(stats["sent"]["NORMAL"], 3)
+        self.assertGreater(stats["wait_max"]["NORMAL"], 0)
+
+        await transport.disconnect()
+
+    @async_test
+    async def test_disconnect_closes_scheduler(self):
+        transport = FakeJanusTransport(
+            base_url="fake://server", rate_limit=1, rate_limit_burst=1
+        )
+        await transport.connect()
+        await (await transport.send({"janus": "info"})).done()
+
+        # Waits for a token, until disconnected
+        task = asyncio.create_task(transport.send({"janus": "info"}))
+        await asyncio.sleep(0.01)
+        self.assertEqual(transport.outbound_stats["depth"], 1)
+
+        await transport.disconnect()
+        with self.assertRaises(TransportDisconnected):
+            await asyncio.wait_for(task, timeout=0.1)
+        self.assertEqual(transport.outbound_stats["depth"], 0)
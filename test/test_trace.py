@@ -0,0 +1,65 @@
+import unittest
+import logging
+
+from janus_client.trace import (
+    configure_trace,
+    format_message,
+    trace_config,
+    trace_logger,
+    trace_message,
+)
+
+format = "%(asctime)s: %(message)s"
+logging.basicConfig(format=format, level=logging.INFO, datefmt="%H:%M:%S")
+logger = logging.getLogger()
+
+
+class NotFormattable(dict):
+    def __repr__(self):
+        raise AssertionError("Should not be formatted")
+
+
+class TestClass(unittest.TestCase):
+    message = {
+        "janus": "event",
+        "transaction": "abc",
+        "jsep": {"type": "answer", "sdp": "v=0\r\n" * 100},
+    }
+
+    def tearDown(self) -> None:
+        configure_trace(sdp_max_length=128, sdp_sample_rate=0.0)
+        trace_logger.setLevel(logging.NOTSET)
+
+    def test_truncate_sdp(self):
+        configure_trace(sdp_max_length=10)
+
+        formatted = format_message(self.message)
+        self.assertIn("...(500 chars)", formatted)
+        self.assertNotIn("v=0\\r\\n" * 3, formatted)
+        # Original message is not modified
+        self.assertEqual(len(self.message["jsep"]["sdp"]), 500)
+
+    def test_no_truncate(self):
+        configure_trace(sdp_max_length=-1)
+        self.assertEqual(format_message(self.message), str(self.message))
+
+        configure_trace(sdp_max_length=10, sdp_sample_rate=1.0)
+        self.assertEqual(format_message(self.message), str(self.message))
+
+        self.assertEqual(format_message({"janus": "ack"}), str({"janus": "ack"}))
+
+    def test_lazy(self):
+        trace_logger.setLevel(logging.INFO)
+        trace_message("Received", NotFormattable(janus="ack"))
+
+        trace_logger.setLevel(logging.DEBUG)
+        with self.assertLogs(trace_logger, level=logging.DEBUG) as logs:
+            trace_message("Received", self.message)
+        self.assertEqual(logs.records[0].janus, "event")
+        self.assertEqual(logs.records[0].transaction, "abc")
+        self.assertTrue(logs.output[0].endswith("chars)'}}"))
+
+    def test_config(self):
+        configure_trace(sdp_max_length=64)
+        self.assertEqual(trace_config.sdp_max_length, 64)
+        self.assertEqual(trace_config.sdp_sample_rate, 0.0)
@@ -0,0 +1,86 @@
+import unittest
+import logging
+import asyncio
+from typing import Dict
+
+import websockets
+
+from janus_client import (
+    JanusSession,
+    JanusTransport,
+    TransportDisconnected,
+    SessionDestroyed,
+)
+from test.util import async_test, FakeJanusTransport
+
+format = "%(asctime)s: %(message)s"
+logging.basicConfig(format=format, level=logging.INFO, datefmt="%H:%M:%S")
+logger = logging.getLogger()
+
+
+class SilentFakeJanusTransport(FakeJanusTransport):
+    """Don't answer plugin messages"""
+
+    def respond(self, message: Dict) -> Dict:
+        if message["janus"] == "message":
+            return None
+        return super().respond(message)
+
+
+class TestClass(unittest.TestCase):
+    @async_test
+    async def test_disconnect(self):
+        transport = SilentFakeJanusTransport(base_url="fake://server")
+        await transport.connect()
+
+        message_transaction = await transport.send({"janus": "message"})
+        get_task = asyncio.create_task(message_transaction.get(timeout=15))
+        await asyncio.sleep(0)
+
+        await transport.disconnect()
+        with self.assertRaises(TransportDisconnected):
+            await asyncio.wait_for(get_task, timeout=1)
+        self.assertEqual(transport.transaction_count, 0)
+
+    @async_test
+    async def test_session_destroy(self):
+        transport = SilentFakeJanusTransport(base_url="fake://server")
+        session_1 = JanusSession(transport=transport)
+        session_2 = JanusSession(transport=transport)
+        await session_1.create()
+        await session_2.create()
+
+        transaction_1 = await session_1.send({"janus": "message"})
+        transaction_2 = await session_2.send({"janus": "message"})
+        get_task = asyncio.create_task(transaction_1.get(timeout=15))
+        await asyncio.sleep(0)
+
+        await session_1.destroy()
+        with self.assertRaises(SessionDestroyed):
+            await asyncio.wait_for(get_task, timeout=1)
+
+        # Other sessions are not affected
+        self.assertEqual(transport.transaction_count, 1)
+        await transaction_2.done()
+        await session_2.destroy()
+
+    @async_test
+    async def test_websocket_connection_lost(self):
+        async def handler(websocket):
+            # Read one request and drop the connection without answering
+            await websocket.recv()
+            await websocket.close()
+
+        async with websockets.serve(handler, "127.0.0.1", 0) as server:
+            port = server.sockets[0].getsockname()[1]
+            transport = JanusTransport.create_transport(
+                base_url=f"ws://127.0.0.1:{port}", config={"reconnect": False}
+            )
+            await transport.connect()
+
+            message_transaction = await transport.send({"janus": "info"})
+            with self.assertRaises(TransportDisconnected):
+                await asyncio.wait_for(message_transaction.get(timeout=15), timeout=1)
+
+            self.assertFalse(transport.connected)
+            self.assertEqual(transport.transaction_count, 0)
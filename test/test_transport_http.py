@@ -0,0 +1,271 @@
+import unittest
+import logging
+import asyncio
+import datetime
+import itertools
+import os
+import ssl
+import tempfile
+
+import aiohttp
+from aiohttp import web
+from cryptography import x509
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import ec
+
+from janus_client import JanusSession, JanusTransportHTTP, TransportDisconnected
+from test.util import async_test
+
+format = "%(asctime)s: %(message)s"
+logging.basicConfig(format=format, level=logging.INFO, datefmt="%H:%M:%S")
+logger = logging.getLogger()
+
+
+def self_signed_ssl_context() -> ssl.SSLContext:
+    """Server SSL context with a certificate no client trusts"""
+    key = ec.generate_private_key(ec.SECP256R1())
+    name = x509.Name([x509.NameAttribute(x509.NameOID.COMMON_NAME, "127.0.0.1")])
+    now = datetime.datetime.now(tz=datetime.timezone.utc)
+    cert = (
+        x509.CertificateBuilder()
+        .subject_name(name)
+        .issuer_name(name)
+        .public_key(key.public_key())
+        .serial_number(x509.random_serial_number())
+        .not_valid_before(now - datetime.timedelta(days=1))
+        .not_valid_after(now + datetime.timedelta(days=1))
+        .sign(key, hashes.SHA256())
+    )
+
+    context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+    with tempfile.TemporaryDirectory() as directory:
+        cert_path = os.path.join(directory, "cert.pem")
+        key_path = os.path.join(directory, "key.pem")
+        with open(cert_path, "wb") as file:
+            file.write(cert.public_bytes(serialization.Encoding.PEM))
+        with open(key_path, "wb") as file:
+            file.write(
+                key.private_bytes(
+                    serialization.Encoding.PEM,
+                    serialization.PrivateFormat.PKCS8,
+                    serialization.NoEncryption(),
+                )
+            )
+        context.load_cert_chain(cert_path, key_path)
+    return context
+
+
+class FakeJanusHTTPServer:
+    """Minimal Janus REST API server on localhost"""
+
+    def __init__(self, long_poll_timeout: float = 0.2) -> None:
+        self.long_poll_timeout = long_poll_timeout
+        self.id_counter = itertools.count(1000)
+        self.peer_ports = set()
+        self.events = dict()
+        self.event_response_count = 0
+        self.long_poll_count = 0
+        self.stopping = asyncio.Event()
+
+    def track_peer(self, request: web.Request) -> None:
+        self.peer_ports.add(request.transport.get_extra_info("peername")[1])
+
+    async def handle_post(self, request: web.Request) -> web.Response:
+        self.track_peer(request)
+        message = await request.json()
+        response = {"transaction": message["transaction"]}
+
+        if message["janus"] in ["create", "attach"]:
+            response.update(janus="success", data={"id": next(self.id_counter)})
+        elif message["janus"] == "ping":
+            response.update(janus="pong")
+        else:
+            response.update(janus="success")
+
+        return web.json_response(response)
+
+    async def handle_long_poll(self, request: web.Request) -> web.Response:
+        self.track_peer(request)
+        self.long_poll_count += 1
+        session_id = int(request.match_info["session_id"])
+        queue = self.event_queue(session_id)
+        get_task = asyncio.ensure_future(queue.get())
+        stop_task = asyncio.ensure_future(self.stopping.wait())
+        await asyncio.wait(
+            [get_task, stop_task],
+            timeout=self.long_poll_timeout,
+            return_when=asyncio.FIRST_COMPLETED,
+        )
+        stop_task.cancel()
+        if not get_task.done():
+            get_task.cancel()
+            return web.json_response({"janus": "keepalive"})
+        events = [get_task.result()]
+
+        self.event_response_count += 1
+        if "maxev" not in request.query:
+            return web.json_response(events[0])
+
+        while len(events) < int(request.query["maxev"]) and not queue.empty():
+            events.append(queue.get_nowait())
+        return web.json_response(events)
+
+    def event_queue(self, session_id: int) -> asyncio.Queue:
+        return self.events.setdefault(session_id, asyncio.Queue())
+
+    async def handle_info(self, request: web.Request) -> web.Response:
+        self.track_peer(request)
+        return web.json_response({"janus": "server_info"})
+
+    async def start(self, ssl_context: ssl.SSLContext = None) -> str:
+        app = web.Application()
+        app.router.add_post("/janus", self.handle_post)
+        app.router.add_post("/janus/{session_id}", self.handle_post)
+        app.router.add_post("/janus/{session_id}/{handle_id}", self.handle_post)
+        app.router.add_get("/janus/info", self.handle_info)
+        app.router.add_get("/janus/{session_id}", self.handle_long_poll)
+        self.runner = web.AppRunner(app)
+        await self.runner.setup()
+        site = web.TCPSite(self.runner, "127.0.0.1", 0, ssl_context=ssl_context)
+        await site.start()
+        port = self.runner.addresses[0][1]
+        scheme = "https" if ssl_context else "http"
+        return f"{scheme}://127.0.0.1:{port}/janus"
+
+    async def stop(self) -> None:
+        self.stopping.set()
+        await self.runner.cleanup()
+
+
+class TestClass(unittest.TestCase):
+    @async_test
+    async def test_connection_reuse(self):
+        server = FakeJanusHTTPServer()
+        base_url = await server.start()
+
+        transport = JanusTransportHTTP(base_url=base_url)
+        session = JanusSession(transport=transport)
+        await session.create()
+
+        for _ in range(10):
+            response = await transport.ping()
+            self.assertEqual(response["janus"], "pong")
+        response = await transport.info()
+        self.assertEqual(response["janus"], "server_info")
+
+        # One connection for requests and one held by the long poll
+        self.assertLessEqual(len(server.peer_ports), 2)
+
+        # Pooled HTTP session is closed on disconnect
+        http_session = transport.http_session
+        await session.destroy()
+        self.assertFalse(transport.connected)
+        self.assertTrue(http_session.closed)
+
+        await server.stop()
+
+    @async_test
+    async def test_disconnect_stops_long_poll(self):
+        server = FakeJanusHTTPServer(long_poll_timeout=0.05)
+        base_url = await server.start()
+
+        transport = JanusTransportHTTP(base_url=base_url)
+        session = JanusSession(transport=transport)
+        await session.create()
+        await asyncio.sleep(0.1)
+
+        # Session is still registered, but its long poll stops
+        http_session = transport.http_session
+        await transport.disconnect()
+        self.assertTrue(http_session.closed)
+        with self.assertRaises(TransportDisconnected):
+            transport.http_session
+        long_poll_count = server.long_poll_count
+        await asyncio.sleep(0.2)
+        self.assertEqual(server.long_poll_count, long_poll_count)
+
+        # Usable again after connecting
+        await transport.connect()
+        response = await transport.ping()
+        self.assertEqual(response["janus"], "pong")
+        await transport.disconnect()
+
+        await server.stop()
+
+    async def batched_long_poll(self, long_poll_max_events: int) -> int:
+        server = FakeJanusHTTPServer(long_poll_timeout=1)
+        base_url = await server.start()
+
+        transport = JanusTransportHTTP(
+            base_url=base_url, long_poll_max_events=long_poll_max_events
+        )
+        session = JanusSession(transport=transport)
+        await session.create()
+
+        received = []
+        all_received = asyncio.Event()
+
+        async def on_receive(response: dict):
+            received.append(response)
+            if len(received) == 5:
+                all_received.set()
+
+        session.on_receive = on_receive
+        # Let the long poll start waiting
+        await asyncio.sleep(0.1)
+
+        session_id = list(server.events.keys())[0]
+        for index in range(5):
+            server.event_queue(session_id).put_nowait(
+                {"janus": "event", "session_id": session_id, "index": index}
+            )
+        await asyncio.wait_for(all_received.wait(), timeout=5)
+        self.assertEqual([response["index"] for response in received], [0, 1, 2, 3, 4])
+
+        await session.destroy()
+        await server.stop()
+
+        return server.event_response_count
+
+    @async_test
+    async def test_batched_long_poll(self):
+        self.assertEqual(await self.batched_long_poll(long_poll_max_events=5), 1)
+        self.assertEqual(await self.batched_long_poll(long_poll_max_events=1), 5)
+
+    @async_test
+    async def test_destroy_without_waiting_long_poll(self):
+        server = FakeJanusHTTPServer(long_poll_timeout=10)
+        base_url = await server.start()
+
+        transport = JanusTransportHTTP(base_url=base_url)
+        sessions = [JanusSession(transport=transport) for _ in range(20)]
+        await asyncio.gather(*[session.create() for session in sessions])
+        # Let the long polls start waiting
+        await asyncio.sleep(0.1)
+
+        start_time = asyncio.get_running_loop().time()
+        await asyncio.gather(*[session.destroy() for session in sessions])
+        self.assertLess(asyncio.get_running_loop().time() - start_time, 1)
+        self.assertFalse(transport.connected)
+
+        await server.stop()
+
+    @async_test
+    async def test_verify_certificate(self):
+        server = FakeJanusHTTPServer()
+        base_url = await server.start(ssl_context=self_signed_ssl_context())
+
+        # Certificates are verified by default
+        transport = JanusTransportHTTP(base_url=base_url)
+        await transport.connect()
+        with self.assertRaises(aiohttp.ClientSSLError):
+            await transport.ping()
+        await transport.disconnect()
+
+        transport = JanusTransportHTTP(base_url=base_url, ssl_context=False)
+        await transport.connect()
+        response = await transport.ping()
+        self.assertEqual(response["janus"], "pong")
+        await transport.disconnect()
+
+        await server.stop()
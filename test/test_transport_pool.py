@@ -0,0 +1,167 @@
+import unittest
+import logging
+import asyncio
+from typing import Dict
+
+from janus_client import JanusSession, JanusTransportPool
+from janus_client.transport_pool import default_transport_pool
+from test.util import async_test, FakeJanusTransport
+
+format = "%(asctime)s: %(message)s"
+logging.basicConfig(format=format, level=logging.INFO, datefmt="%H:%M:%S")
+logger = logging.getLogger()
+
+
+class TestClass(unittest.TestCase):
+    @async_test
+    async def test_share_transport(self):
+        pool = JanusTransportPool()
+
+        transport_1 = pool.acquire(base_url="fake://server/", api_secret="a")
+        transport_2 = pool.acquire(base_url="fake://server", api_secret="a")
+        transport_3 = pool.acquire(base_url="fake://server", api_secret="b")
+        transport_4 = pool.acquire(
+            base_url="fake://server",
+            api_secret="a",
+            config={"subprotocol": "janus-admin-protocol"},
+        )
+
+        self.assertIsInstance(transport_1, FakeJanusTransport)
+        self.assertIs(transport_1, transport_2)
+        self.assertIsNot(transport_1, transport_3)
+        self.assertIsNot(transport_1, transport_4)
+        self.assertEqual(pool.ref_count(transport_1), 2)
+
+        # Any difference of config gets its own transport
+        transport_6 = pool.acquire(
+            base_url="fake://server", api_secret="a", config={"timeout_factor": 2}
+        )
+        self.assertIsNot(transport_1, transport_6)
+        await pool.release(transport_6)
+
+        await transport_1.connect()
+        await pool.release(transport_1)
+        self.assertTrue(transport_1.connected)
+        await pool.release(transport_2)
+        self.assertEqual(pool.ref_count(transport_1), 0)
+
+        # Disconnected and forgotten when not held anymore
+        self.assertFalse(transport_1.connected)
+        transport_5 = pool.acquire(base_url="fake://server", api_secret="a")
+        self.assertIsNot(transport_1, transport_5)
+
+        await pool.close()
+
+    @async_test
+    async def test_session_share_transport(self):
+        session_1 = JanusSession(base_url="fake://server", shared_transport=True)
+        session_2 = JanusSession(base_url="fake://server", shared_transport=True)
+        session_3 = JanusSession(base_url="fake://server")
+        self.assertIs(session_1.transport, session_2.transport)
+        self.assertIsNot(session_1.transport, session_3.transport)
+
+        await session_1.create()
+        await session_2.create()
+        await session_1.destroy()
+        self.assertTrue(session_2.transport.connected)
+        await session_2.destroy()
+        await session_3.transport.disconnect()
+
+        # Default pool keeps the connection for the next session
+        transport = session_1.transport
+        self.assertTrue(transport.connected)
+        self.assertEqual(default_transport_pool.ref_count(transport), 0)
+
+        # Context manager releases the transport without creating a session
+        async with JanusSession(
+            base_url="fake://server", shared_transport=True
+        ) as session_4:
+            self.assertIs(session_4.transport, transport)
+            self.assertTrue(transport.connected)
+        self.assertEqual(default_transport_pool.ref_count(transport), 0)
+        self.assertEqual(transport.connect_count, 1)
+
+        await default_transport_pool.close()
+        self.assertFalse(transport.connected)
+
+    @async_test
+    async def test_destroy_while_creating(self):
+        pool = JanusTransportPool()
+        transport = pool.acquire(base_url="fake://server")
+        self.assertIs(pool.acquire(base_url="fake://server"), transport)
+        self.assertTrue(transport.pooled)
+
+        session_a = JanusSession(transport=transport)
+        session_b = JanusSession(transport=transport)
+        await session_a.create()
+
+        # Session B is being created when session A is destroyed
+        respond = transport.respond
+
+        def delay_create(message: Dict) -> Dict:
+            response = respond(message)
+            if message["janus"] != "create":
+                return response
+            asyncio.get_running_loop().call_later(
+                0.05, lambda: asyncio.create_task(transport.receive(response))
+            )
+            return None
+
+        transport.respond = delay_create
+        create_b = asyncio.create_task(session_b.create())
+        await asyncio.sleep(0.01)
+        await session_a.destroy()
+        await pool.release(transport)
+        self.assertTrue(transport.connected)
+
+        await create_b
+        self.assertTrue(session_b.created)
+        self.assertTrue(transport.connected)
+
+        await session_b.destroy()
+        await pool.release(transport)
+        self.assertFalse(transport.connected)
+
+    @async_test
+    async def test_idle_linger(self):
+        pool = JanusTransportPool(idle_linger=0.05)
+        transport = pool.acquire(base_url="fake://server")
+        session = JanusSession(transport=transport)
+
+        await session.create()
+        await session.destroy()
+        await pool.release(transport)
+        self.assertTrue(transport.connected)
+
+        # Connection lingers for the next session
+        self.assertIs(pool.acquire(base_url="fake://server"), transport)
+        session = JanusSession(transport=transport)
+        await session.create()
+        self.assertEqual(transport.connect_count, 1)
+
+        # Not disconnected while held
+        await asyncio.sleep(0.1)
+        self.assertTrue(transport.connected)
+        await session.destroy()
+        await pool.release(transport)
+        self.assertTrue(transport.connected)
+
+        await asyncio.sleep(0.1)
+        self.assertFalse(transport.connected)
+        self.assertIsNot(pool.acquire(base_url="fake://server"), transport)
+        await pool.close()
+
+    @async_test
+    async def test_close(self):
+        pool = JanusTransportPool(idle_linger=10)
+        transport = pool.acquire(base_url="fake://server")
+        session = JanusSession(transport=transport)
+
+        await session.create()
+        await session.destroy()
+        await pool.release(transport)
+        self.assertTrue(transport.connected)
+
+        await pool.close()
+        self.assertFalse(transport.connected)
+        self.assertIsNot(pool.acquire(base_url="fake://server"), transport)
@@ -0,0 +1,139 @@
+import unittest
+import logging
+import asyncio
+import json
+import os
+import socket
+import tempfile
+from typing import Dict
+
+from janus_client import JanusSession, JanusTransport, TransportDisconnected
+from janus_client.transport_unix import JanusTransportUnix
+from test.util import async_test
+
+format = "%(asctime)s: %(message)s"
+logging.basicConfig(format=format, level=logging.INFO, datefmt="%H:%M:%S")
+logger = logging.getLogger()
+
+
+def respond(message: Dict) -> Dict:
+    response = {"transaction": message["transaction"]}
+    if "session_id" in message:
+        response["session_id"] = message["session_id"]
+
+    if message["janus"] == "create":
+        response.update(janus="success", data={"id": 1234})
+    elif message["janus"] == "ping":
+        response.update(janus="pong")
+    else:
+        response.update(janus="success")
+    return response
+
+
+class FakeJanusUnixServer:
+    """Answer Janus core requests like janus.transport.pfunix"""
+
+    def __init__(self, socket_type: int) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "janus.sock")
+        self.socket_type = socket_type
+        self.sock = socket.socket(socket.AF_UNIX, socket_type)
+        self.sock.setblocking(False)
+        self.sock.bind(self.path)
+        if socket_type == socket.SOCK_SEQPACKET:
+            self.sock.listen()
+        self.connections = []
+        self.task = None
+
+    @property
+    def base_url(self) -> str:
+        return f"unix://{self.path}"
+
+    async def serve_seqpacket(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            connection, _ = await loop.sock_accept(self.sock)
+            self.connections.append(connection)
+            while True:
+                data = await loop.sock_recv(connection, 65536)
+                if not data:
+                    break
+                response = respond(json.loads(data))
+                await loop.sock_sendall(connection, json.dumps(response).encode())
+
+    async def serve_dgram(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            data, address = await loop.sock_recvfrom(self.sock, 65536)
+            response = respond(json.loads(data))
+            await loop.sock_sendto(self.sock, json.dumps(response).encode(), address)
+
+    def start(self) -> None:
+        if self.socket_type == socket.SOCK_SEQPACKET:
+            self.task = asyncio.create_task(self.serve_seqpacket())
+        else:
+            self.task = asyncio.create_task(self.serve_dgram())
+
+    async def stop(self) -> None:
+        self.task.cancel()
+        await asyncio.wait([self.task])
+        for connection in self.connections:
+            connection.close()
+        self.sock.close()
+        self.directory.cleanup()
+
+
+class TestClass(unittest.TestCase):
+    async def check_session(self, base_url: str, config: Dict = {}) -> None:
+        transport = JanusTransport.create_transport(base_url=base_url, config=config)
+        self.assertIsInstance(transport, JanusTransportUnix)
+
+        session = JanusSession(transport=transport)
+        await session.create()
+
+        response = await transport.ping()
+        self.assertEqual(response["janus"], "pong")
+
+        await session.destroy()
+        self.assertFalse(transport.connected)
+
+    @async_test
+    async def test_seqpacket(self):
+        server = FakeJanusUnixServer(socket.SOCK_SEQPACKET)
+        server.start()
+        await self.check_session(server.base_url)
+        await server.stop()
+
+    @async_test
+    async def test_dgram(self):
+        server = FakeJanusUnixServer(socket.SOCK_DGRAM)
+        server.start()
+        await self.check_session(server.base_url, config={"socket_type": "dgram"})
+        await server.stop()
+
+    @async_test
+    async def test_connection_lost(self):
+        server_sock, client_sock = socket.socketpair(
+            socket.AF_UNIX, socket.SOCK_SEQPACKET
+        )
+        transport = JanusTransportUnix(base_url="unix:///nowhere")
+        client_sock.setblocking(False)
+
+        # Use one end of the socket pair as an already connected socket
+        transport.sock = client_sock
+        transport.connected = True
+        transport.receive_message_task = asyncio.create_task(
+            transport.receive_message()
+        )
+        transport.receive_message_task.add_done_callback(
+            transport.receive_message_done_cb
+        )
+
+        message_transaction = await transport.send({"janus": "ping"})
+        request = json.loads(server_sock.recv(65536))
+        self.assertEqual(request["janus"], "ping")
+
+        server_sock.close()
+        with self.assertRaises(TransportDisconnected):
+            await asyncio.wait_for(message_transaction.get(timeout=5), timeout=1)
+        self.assertFalse(transport.connected)
@@ -0,0 +1,233 @@
+import unittest
+import logging
+import asyncio
+import itertools
+import json
+from typing import Dict, List, Set
+
+import websockets
+
+from janus_client import JanusSession, JanusTransport
+from test.util import async_test
+
+format = "%(asctime)s: %(message)s"
+logging.basicConfig(format=format, level=logging.INFO, datefmt="%H:%M:%S")
+logger = logging.getLogger()
+
+
+class FakeJanusWebsocketServer:
+    """Answer Janus core requests through websocket
+
+    Sessions live as long as the server, like Janus keeps sessions for a while
+    after their connection is lost.
+    """
+
+    id_counter = itertools.count(1000)
+
+    def __init__(self) -> None:
+        self.server = None
+        self.connections: Set[websockets.WebSocketServerProtocol] = set()
+        self.connection_count = 0
+        self.sessions: Set[int] = set()
+        self.received: List[Dict] = []
+        self.received_on: List[int] = []
+        """Index of the connection each message in received came through"""
+
+    @property
+    def base_url(self) -> str:
+        port = self.server.sockets[0].getsockname()[1]
+        return f"ws://127.0.0.1:{port}"
+
+    async def start(self) -> None:
+        self.server = await websockets.serve(self.handler, "127.0.0.1", 0)
+
+    async def stop(self) -> None:
+        self.server.close()
+        await self.server.wait_closed()
+
+    async def drop_connections(self) -> None:
+        for connection in list(self.connections):
+            await connection.close()
+
+    def respond(self, message: Dict) -> Dict:
+        janus = message["janus"]
+        response = {"transaction": message["transaction"]}
+        if "session_id" in message:
+            response["session_id"] = message["session_id"]
+
+        if janus == "create":
+            session_id = next(self.id_counter)
+            self.sessions.add(session_id)
+            response.update(janus="success", data={"id": session_id})
+        elif janus == "claim" and message["session_id"] not in self.sessions:
+            response.update(janus="error", error={"code": 458, "reason": "No such"})
+        elif janus == "ping":
+            response.update(janus="pong")
+        elif janus == "keepalive":
+            response.update(janus="ack")
+        else:
+            response.update(janus="success")
+        return response
+
+    async def handler(self, websocket: websockets.WebSocketServerProtocol) -> None:
+        self.connections.add(websocket)
+        connection_index = self.connection_count
+        self.connection_count += 1
+        try:
+            async for message_raw in websocket:
+                message = json.loads(message_raw)
+                self.received.append(message)
+                self.received_on.append(connection_index)
+                await websocket.send(json.dumps(self.respond(message)))
+        except websockets.ConnectionClosed:
+            pass
+        finally:
+            self.connections.discard(websocket)
+
+
+class TestClass(unittest.TestCase):
+    @async_test
+    async def test_reconnect_and_claim(self):
+        server = FakeJanusWebsocketServer()
+        await server.start()
+
+        transport = JanusTransport.create_transport(
+            base_url=server.base_url,
+            config={"reconnect_backoff_initial": 0.01},
+        )
+        session_1 = JanusSession(transport=transport)
+        session_2 = JanusSession(transport=transport)
+        await session_1.create()
+        await session_2.create()
+
+        await server.drop_connections()
+        await asyncio.sleep(0.01)
+        self.assertTrue(transport.connected)
+
+        # Sending waits until reconnected
+        response = await asyncio.wait_for(transport.ping(), timeout=5)
+        self.assertEqual(response["janus"], "pong")
+        self.assertFalse(transport.reconnecting)
+        self.assertEqual(server.connection_count, 2)
+
+        claimed = [
+            message["session_id"]
+            for message in server.received
+            if message["janus"] == "claim"
+        ]
+        self.assertEqual(sorted(claimed), sorted(server.sessions))
+
+        await session_1.destroy()
+        await session_2.destroy()
+        await server.stop()
+
+    @async_test
+    async def test_give_up_reconnect(self):
+        server = FakeJanusWebsocketServer()
+        await server.start()
+
+        transport = JanusTransport.create_transport(
+            base_url=server.base_url,
+            config={"reconnect_backoff_initial": 0.01, "reconnect_max_attempts": 2},
+        )
+        session = JanusSession(transport=transport)
+        await session.create()
+
+        await server.stop()
+        await server.drop_connections()
+
+        for _ in range(100):
+            if not transport.connected:
+                break
+            await asyncio.sleep(0.01)
+
+        self.assertFalse(transport.connected)
+        self.assertFalse(transport.reconnecting)
+        self.assertEqual(server.connection_count, 1)
+
+    @async_test
+    async def test_striping(self):
+        server = FakeJanusWebsocketServer()
+        await server.start()
+
+        transport = JanusTransport.create_transport(
+            base_url=server.base_url, config={"connection_count": 3}
+        )
+        sessions = [JanusSession(transport=transport) for _ in range(6)]
+        for session in sessions:
+            await session.create()
+        self.assertEqual(server.connection_count, 3)
+
+        # Sessions are spread evenly
+        self.assertEqual(
+            [len(connection.session_ids) for connection in transport.connections],
+            [2, 2, 2],
+        )
+
+        for _ in range(3):
+            for session in sessions:
+                async with await session.send(
+                    {"janus": "keepalive"}
+                ) as message_transaction:
+                    await message_transaction.get(timeout=5)
+
+        # Each session always uses the same connection
+        connections_of_session: Dict[int, Set[int]] = dict()
+        for message, connection_index in zip(server.received, server.received_on):
+            if "session_id" in message:
+                connections_of_session.setdefault(message["session_id"], set()).add(
+                    connection_index
+                )
+        self.assertEqual(len(connections_of_session), 6)
+        for connection_indexes in connections_of_session.values():
+            self.assertEqual(len(connection_indexes), 1)
+
+        for session in sessions:
+            await session.destroy()
+        self.assertFalse(transport.connected)
+        await server.stop()
+
+    @async_test
+    async def test_connection_options(self):
+        server = FakeJanusWebsocketServer()
+        await server.start()
+
+        # Server accepts permessage-deflate, so it's negotiated by default
+        session_1 = JanusSession(base_url=server.base_url, shared_transport=False)
+        await session_1.create()
+        ws = session_1.transport.connections[0].ws
+        self.assertEqual(
+            [extension.name for extension in ws.extensions], ["permessage-deflate"]
+        )
+        self.assertEqual(ws.max_size, 1 << 20)
+
+        session_2 = JanusSession(
+            base_url=server.base_url,
+            shared_transport=False,
+            transport_config={
+                "compression": None,
+                "max_size": 4 << 20,
+                "write_limit": 1 << 18,
+                "ping_interval": None,
+            },
+        )
+        await session_2.create()
+        ws = session_2.transport.connections[0].ws
+        self.assertEqual(ws.extensions, [])
+        self.assertEqual(ws.max_size, 4 << 20)
+        self.assertIsNone(ws.ping_interval)
+        _, high_water = ws.transport.get_write_buffer_limits()
+        self.assertEqual(high_water, 1 << 18)
+
+        session_3 = JanusSession(
+            base_url=server.base_url,
+            shared_transport=False,
+            transport_config={"compression": {"client_max_window_bits": 10}},
+        )
+        await session_3.create()
+        ws = session_3.transport.connections[0].ws
+        self.assertEqual(ws.extensions[0].local_max_window_bits, 10)
+
+        for session in [session_1, session_2, session_3]:
+            await session.destroy()
+        await server.stop()
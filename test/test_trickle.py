@@ -0,0 +1,118 @@
+import unittest
+import logging
+import asyncio
+from typing import Dict, List
+
+from janus_client import JanusSession, JanusPlugin
+from janus_client.trickle import END_OF_CANDIDATES, TrickleBatcher, sdp_candidates
+from test.util import async_test
+
+format = "%(asctime)s: %(message)s"
+logging.basicConfig(format=format, level=logging.INFO, datefmt="%H:%M:%S")
+logger = logging.getLogger()
+
+
+class DummyPlugin(JanusPlugin):
+    name = "janus.plugin.test"
+
+    async def on_receive(self, response: dict):
+        pass
+
+
+class TestClass(unittest.TestCase):
+    @async_test
+    async def test_batch(self):
+        sent: List[Dict] = []
+
+        async def send(message: Dict) -> None:
+            sent.append(message)
+
+        batcher = TrickleBatcher(send=send, window=0.01)
+        for index in range(3):
+            batcher.add({"sdpMLineIndex": 0, "candidate": f"candidate:{index}"})
+        self.assertEqual(sent, [])
+
+        await asyncio.sleep(0.05)
+        self.assertEqual(len(sent), 1)
+        self.assertEqual(len(sent[0]["candidates"]), 3)
+
+        await batcher.end()
+        self.assertEqual(sent[1], {"janus": "trickle", "candidate": END_OF_CANDIDATES})
+
+        # Remaining candidates go with end-of-candidates
+        batcher.add({"sdpMLineIndex": 1, "candidate": "candidate:3"})
+        await batcher.end()
+        self.assertEqual(len(sent), 3)
+        self.assertEqual(sent[2]["candidates"][-1], END_OF_CANDIDATES)
+        self.assertEqual(batcher.sent_messages, 3)
+
+    @async_test
+    async def test_batch_send_fail(self):
+        async def send(message: Dict) -> None:
+            raise Exception("Fail to send")
+
+        batcher = TrickleBatcher(send=send, window=0.01)
+        batcher.add({"sdpMLineIndex": 0, "candidate": "candidate:0"})
+        with self.assertLogs("janus_client.trickle", level="ERROR") as logs:
+            await asyncio.sleep(0.05)
+        self.assertIn("Fail to send", logs.output[0])
+
+    def test_sdp_candidates(self):
+        sdp = "\r\n".join(
+            [
+                "v=0",
+                "m=audio 9 UDP/TLS/RTP/SAVPF 96",
+                "a=mid:0",
+                "a=candidate:1 1 udp 2130706431 192.0.2.2 36402 typ host",
+                "m=video 9 UDP/TLS/RTP/SAVPF 97",
+                "a=mid:1",
+                "a=candidate:2 1 udp 2130706431 192.0.2.2 52387 typ host",
+                "a=end-of-candidates",
+            ]
+        )
+        self.assertEqual(
+            sdp_candidates(sdp),
+            [
+                {
+                    "sdpMLineIndex": 0,
+                    "sdpMid": "0",
+                    "candidate": "candidate:1 1 udp 2130706431 192.0.2.2 36402 typ host",
+                },
+                {
+                    "sdpMLineIndex": 1,
+                    "sdpMid": "1",
+                    "candidate": "candidate:2 1 udp 2130706431 192.0.2.2 52387 typ host",
+                },
+            ],
+        )
+
+    @async_test
+    async def test_trickle_local_description(self):
+        session = JanusSession(base_url="fake://server")
+        plugin = DummyPlugin()
+        await plugin.attach(session)
+
+        pc = plugin._get_pc()
+        pc.addTransceiver("audio")
+        jsep = await plugin.create_local_jsep(
+            pc=pc, description=await pc.createOffer(), trickle=True
+        )
+
+        # Offer is ready before gathering
+        self.assertTrue(jsep["trickle"])
+        self.assertNotIn("a=candidate:", jsep["sdp"])
+
+        await plugin.wait_gathering()
+        trickles = [
+            message
+            for message in session.transport.sent
+            if message["janus"] == "trickle"
+        ]
+        self.assertEqual(len(trickles), 1)
+        candidates = trickles[0]["candidates"]
+        self.assertEqual(candidates[-1], END_OF_CANDIDATES)
+        self.assertEqual(candidates[:-1], sdp_candidates(pc.localDescription.sdp))
+
+        await plugin._close_pc()
+        await plugin.destroy()
+        await session.destroy()
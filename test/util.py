@@ -1,4 +1,8 @@
 import asyncio
+import itertools
+from typing import Dict, List
+
+from janus_client import JanusTransport
 
 
 def async_test(coro):
@@ -10,3 +14,52 @@ def async_test(coro):
             loop.close()
 
     return wrapper
+
+
+class FakeJanusTransport(JanusTransport):
+    """Transport answering Janus core requests without a server
+
+    Use "fake://" as base_url.
+    """
+
+    id_counter = itertools.count(1000)
+
+    def __init__(self, **kwargs: dict):
+        super().__init__(**kwargs)
+        self.sent: List[Dict] = []
+        self.connect_count = 0
+
+    async def _connect(self) -> None:
+        self.connect_count += 1
+
+    async def _disconnect(self) -> None:
+        pass
+
+    def respond(self, message: Dict) -> Dict:
+        """Override to customize responses. Return None to not respond."""
+        janus = message["janus"]
+        response = {"transaction": message["transaction"]}
+        if "session_id" in message:
+            response["session_id"] = message["session_id"]
+
+        if janus in ["create", "attach"]:
+            response.update(janus="success", data={"id": next(self.id_counter)})
+        elif janus == "ping":
+            response.update(janus="pong")
+        elif janus in ["keepalive", "trickle"]:
+            response.update(janus="ack")
+        else:
+            response.update(janus="success")
+        return response
+
+    async def _send(self, message: Dict, message_raw: str) -> None:
+        self.sent.append(self.codec.loads(message_raw))
+        response = self.respond(message)
+        if response is not None:
+            await self.receive(response)
+
+
+JanusTransport.register_transport(
+    protocol_matcher=lambda base_url: base_url.startswith("fake://"),
+    transport_cls=FakeJanusTransport,
+)